@@ -0,0 +1,52 @@
+"""
+Structured product attributes and the names derived from them. display_name and search_key are
+stored on products and kept current by triggers (see DatabaseManager), so screens read one column
+instead of gluing brand and model together; normalize() is the Python twin of the key's SQL.
+"""
+import re
+
+TECHNOLOGIES = ["Flooded", "Tubular", "SMF / VRLA", "Gel", "Lithium-ion"]
+
+# Words in a model name that give the technology away, checked in order
+_TECHNOLOGY_HINTS = [
+    ("lithium", "Lithium-ion"), ("li-ion", "Lithium-ion"), ("lifepo", "Lithium-ion"),
+    ("tubular", "Tubular"), ("smf", "SMF / VRLA"), ("vrla", "SMF / VRLA"), ("gel", "Gel"),
+]
+_CAPACITY = re.compile(r"(\d+(?:\.\d+)?)\s*ah\b", re.IGNORECASE)
+_VOLTAGE = re.compile(r"(\d+(?:\.\d+)?)\s*v\b", re.IGNORECASE)
+# Dropped from search keys so "hi life", "Hi-Life" and "HILIFE" all match
+_STRIP = " -./_"
+
+def normalize(text):
+    return "".join(ch for ch in str(text or "").lower() if ch not in _STRIP)
+
+def parse_attributes(text):
+    """(capacity_ah, voltage, technology) read from a model name; None where it says nothing."""
+    text = text or ""
+    capacity = _CAPACITY.search(text)
+    voltage = _VOLTAGE.search(text)
+    lowered = text.lower()
+    technology = next((tech for hint, tech in _TECHNOLOGY_HINTS if hint in lowered), None)
+    return (float(capacity.group(1)) if capacity else None,
+            float(voltage.group(1)) if voltage else None,
+            technology)
+
+def _normalize_sql(expr):
+    sql = f"LOWER(COALESCE({expr}, ''))"
+    for ch in _STRIP:
+        sql = f"REPLACE({sql}, '{ch}', '')"
+    return sql
+
+def display_name_sql(row=""):
+    """'Brand Model 150Ah 12V': capacity and voltage are appended unless the model already says them."""
+    model = f"LOWER(REPLACE(COALESCE({row}model_name, ''), ' ', ''))"
+    return f"""TRIM(COALESCE({row}brand_name, '') || ' ' || COALESCE({row}model_name, '')
+        || CASE WHEN {row}capacity_ah > 0 AND INSTR({model}, printf('%gah', {row}capacity_ah)) = 0
+                THEN printf(' %gAh', {row}capacity_ah) ELSE '' END
+        || CASE WHEN {row}voltage > 0 AND INSTR({model}, printf('%gv', {row}voltage)) = 0
+                THEN printf(' %gV', {row}voltage) ELSE '' END)"""
+
+def search_key_sql(row=""):
+    """Normalized display name, QR code, category and technology, '|'-separated so terms never span fields."""
+    return " || '|' || ".join(_normalize_sql(part) for part in
+                              (display_name_sql(row), f"{row}qr_code", f"{row}category", f"{row}technology"))
@@ -3,7 +3,8 @@ import os
 class Config:
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DATA_DIR = os.path.join(BASE_DIR, 'data')
-    DB_PATH = os.path.join(DATA_DIR, 'app.db')
+    # SMART_BILLING_DB points a process (benchmarks, their worker processes) at another database
+    DB_PATH = os.environ.get('SMART_BILLING_DB') or os.path.join(DATA_DIR, 'app.db')
     BACKUP_DIR = os.path.join(DATA_DIR, 'backups')
     INVOICE_DIR = os.path.join(BASE_DIR, 'invoices')
     ASSETS_DIR = os.path.join(BASE_DIR, 'assets')
@@ -14,6 +15,10 @@ class Config:
     # Theme Configuration
     THEME = "dark"  # "light" or "dark"
 
+    # Multi-terminal billing (shared app.db)
+    DB_BUSY_TIMEOUT = 15  # seconds to wait for another terminal's write lock
+    RESERVATION_TTL_SECONDS = 15 * 60
+
     @staticmethod
     def load_settings(path=None):
         import json
@@ -45,6 +50,29 @@ class Config:
         except: pass
     
     INVOICE_DIR = _init_settings.get('invoice_path', os.path.join(BASE_DIR, 'invoices'))
+    import socket as _socket
+    TERMINAL_ID = _init_settings.get('terminal_id', _socket.gethostname())
+    # Thermal receipt printer: a device / share path (e.g. /dev/usb/lp0 or a shared printer) or a plain file
+    RECEIPT_PRINTER = _init_settings.get('receipt_printer', '')
+    RECEIPT_WIDTH_MM = int(_init_settings.get('receipt_width_mm', 80))  # 58 or 80
+    # WhatsApp sharing: 'browser' opens wa.me links; 'file:<path>' appends JSON lines instead (testing)
+    SHARE_TRANSPORT = _init_settings.get('share_transport', 'browser')
+    SHARE_MIN_INTERVAL = float(_init_settings.get('share_min_interval', 5))  # seconds between sends
+    SHARE_TEMPLATES = _init_settings.get('share_templates', {})
+    # GST: shop's state code (first two digits of the GSTIN) decides CGST+SGST vs IGST; prices are GST-inclusive
+    GSTIN = _init_settings.get('gstin', '')
+    GST_STATE_CODE = _init_settings.get('gst_state_code', GSTIN[:2])
+    DEFAULT_GST_RATE = float(_init_settings.get('default_gst_rate', 18))
+    # Reorder points: supplier lead time when receipts don't record one, and the floor for any product
+    DEFAULT_LEAD_TIME_DAYS = float(_init_settings.get('default_lead_time_days', 7))
+    MIN_STOCK = int(_init_settings.get('min_stock', 1))
+    # Branch sync: batch files are written here; `sync_branches.py serve` listens on this port (trusted LAN/VPN only)
+    SYNC_DIR = _init_settings.get('sync_path', os.path.join(DATA_DIR, 'sync'))
+    SYNC_PORT = int(_init_settings.get('sync_port', 8765))
+    # Catalog packages are HMAC-signed with this shared secret; terminals refuse packages signed otherwise
+    CATALOG_KEY = _init_settings.get('catalog_key', '')
+    # Live branch sync frames are HMAC-tagged with this shared secret (the catalog key unless set separately)
+    SYNC_KEY = _init_settings.get('sync_key', CATALOG_KEY)
     
     PALETTES = {
         "light": {
@@ -1,14 +1,38 @@
 import sqlite3
 import logging
 from app.config import Config
+from app.instrumentation import profiler, ProfiledConnection
+from app.attributes import parse_attributes, display_name_sql, search_key_sql
+
+class _LocalCommits:
+    """Runs every commit of this process inside DatabaseManager.commit_hook, when one is set."""
+
+    def commit(self):
+        hook = DatabaseManager.commit_hook
+        if hook is None:
+            return super().commit()
+        with hook():
+            return super().commit()
+
+class _Connection(_LocalCommits, sqlite3.Connection):
+    pass
+
+class _ProfiledConnection(_LocalCommits, ProfiledConnection):
+    pass
 
 class DatabaseManager:
-    def __init__(self, db_path=Config.DB_PATH):
-        self.db_path = db_path
+    # Context manager factory wrapped around each of this process's commits; the UI's
+    # EventBridge uses it to tell our own writes from other terminals'
+    commit_hook = None
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Config.DB_PATH
         self._init_db()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        if profiler.enabled:
+            return sqlite3.connect(self.db_path, timeout=Config.DB_BUSY_TIMEOUT, factory=_ProfiledConnection)
+        return sqlite3.connect(self.db_path, timeout=Config.DB_BUSY_TIMEOUT, factory=_Connection)
 
     def _init_db(self):
         """Initialize database with tables if they don't exist."""
@@ -112,6 +136,474 @@ class DatabaseManager:
                     )
                 ''')
                 
+                # Stock Reservations (short-lived holds from open carts on any terminal)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS stock_reservations (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        cart_id TEXT NOT NULL,
+                        terminal_id TEXT,
+                        product_id INTEGER NOT NULL,
+                        quantity INTEGER NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        expires_at REAL NOT NULL, -- epoch seconds
+                        FOREIGN KEY (product_id) REFERENCES products (id)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_product ON stock_reservations (product_id, expires_at)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_cart ON stock_reservations (cart_id)")
+                
+                # Archive Partitions (closed fiscal years moved to data/archive_YYYY.db)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS archive_partitions (
+                        fiscal_year INTEGER PRIMARY KEY, -- starting year, e.g. 2023 for FY 2023-24
+                        file_name TEXT NOT NULL,
+                        date_from TEXT NOT NULL,
+                        date_to TEXT NOT NULL,
+                        invoice_count INTEGER DEFAULT 0,
+                        item_count INTEGER DEFAULT 0,
+                        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+
+                # Customer Rollups (maintained at checkout)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS customer_stats (
+                        customer_id INTEGER PRIMARY KEY,
+                        invoice_count INTEGER DEFAULT 0,
+                        lifetime_spend REAL DEFAULT 0,
+                        first_purchase TIMESTAMP,
+                        last_purchase TIMESTAMP,
+                        FOREIGN KEY (customer_id) REFERENCES customers (id)
+                    )
+                ''')
+
+                # Customer Purchase History (one row per invoice line, with warranty expiry)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS customer_purchases (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        customer_id INTEGER NOT NULL,
+                        invoice_no TEXT NOT NULL,
+                        invoice_item_id INTEGER,
+                        product_id INTEGER,
+                        product_name TEXT,
+                        quantity INTEGER,
+                        total_price REAL,
+                        sale_date TIMESTAMP,
+                        warranty_expiry DATE,
+                        returned_quantity INTEGER DEFAULT 0,
+                        FOREIGN KEY (customer_id) REFERENCES customers (id),
+                        FOREIGN KEY (product_id) REFERENCES products (id)
+                    )
+                ''')
+
+                # Migration: Add returned_quantity if it doesn't exist
+                try:
+                    cursor.execute("ALTER TABLE customer_purchases ADD COLUMN returned_quantity INTEGER DEFAULT 0")
+                except sqlite3.OperationalError:
+                    pass # Column already exists
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer_purchases_customer ON customer_purchases (customer_id, sale_date DESC)")
+
+                # Warranty Registrations (one row per serial/QR captured at sale)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS warranty_registrations (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        serial_no TEXT NOT NULL,
+                        invoice_no TEXT NOT NULL,
+                        invoice_item_id INTEGER,
+                        customer_id INTEGER,
+                        product_id INTEGER,
+                        sale_date TIMESTAMP,
+                        expiry_date DATE,
+                        status TEXT DEFAULT 'active', -- active / void
+                        FOREIGN KEY (customer_id) REFERENCES customers (id),
+                        FOREIGN KEY (product_id) REFERENCES products (id)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_warranty_serial ON warranty_registrations (serial_no, sale_date DESC)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_warranty_invoice ON warranty_registrations (invoice_no)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer_purchases_invoice ON customer_purchases (invoice_no)")
+
+                # Serialized Units (one row per physical battery)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS stock_units (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        product_id INTEGER NOT NULL,
+                        serial_no TEXT UNIQUE NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'received', -- received / sold / returned / replaced
+                        purchase_id INTEGER,
+                        invoice_no TEXT,
+                        received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (product_id) REFERENCES products (id),
+                        FOREIGN KEY (purchase_id) REFERENCES purchases (id)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_units_product_status ON stock_units (product_id, status, received_at)")
+
+                # Credit Notes (returns and exchanges against an original invoice)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS credit_notes (
+                        credit_note_no TEXT PRIMARY KEY,
+                        invoice_no TEXT NOT NULL,
+                        date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        customer_id INTEGER,
+                        total_amount REAL,
+                        kind TEXT DEFAULT 'return', -- return (restocked) / replacement (defective, not restocked)
+                        reason TEXT,
+                        FOREIGN KEY (customer_id) REFERENCES customers (id)
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS credit_note_items (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        credit_note_no TEXT NOT NULL,
+                        invoice_item_id INTEGER NOT NULL,
+                        product_id INTEGER,
+                        quantity INTEGER,
+                        unit_price REAL,
+                        total_price REAL,
+                        serial_no TEXT,
+                        FOREIGN KEY (credit_note_no) REFERENCES credit_notes (credit_note_no),
+                        FOREIGN KEY (product_id) REFERENCES products (id)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_credit_notes_invoice ON credit_notes (invoice_no)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_credit_note_items_item ON credit_note_items (invoice_item_id)")
+
+                # Daily Sales Aggregate (dashboard totals without scanning invoices)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sales_daily (
+                        day TEXT PRIMARY KEY, -- YYYY-MM-DD
+                        invoice_count INTEGER DEFAULT 0,
+                        sales_amount REAL DEFAULT 0,
+                        return_count INTEGER DEFAULT 0,
+                        return_amount REAL DEFAULT 0
+                    )
+                ''')
+
+                # Scrap Stock (old batteries taken in on exchange, one row per unit)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS scrap_stock (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        invoice_no TEXT,
+                        battery_type TEXT, -- Automotive / Inverter / Two-Wheeler / SMF-VRLA / Other
+                        grade TEXT, -- A (intact) / B (damaged) / C (cracked/leaking)
+                        weight_kg REAL DEFAULT 0,
+                        value REAL DEFAULT 0,
+                        received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        status TEXT DEFAULT 'in_yard', -- in_yard / disposed
+                        batch_id INTEGER,
+                        FOREIGN KEY (batch_id) REFERENCES scrap_batches (id)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrap_stock_status ON scrap_stock (status, battery_type, grade)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrap_stock_batch ON scrap_stock (batch_id)")
+
+                # Scrap Disposal Batches (bulk sales to recyclers)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS scrap_batches (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        batch_no TEXT UNIQUE NOT NULL,
+                        date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        recycler_name TEXT,
+                        unit_count INTEGER,
+                        total_weight_kg REAL,
+                        rate_per_kg REAL,
+                        amount REAL,
+                        notes TEXT
+                    )
+                ''')
+
+                # Scrap Running Totals (per type and grade; kept in step with scrap_stock)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS scrap_totals (
+                        battery_type TEXT NOT NULL,
+                        grade TEXT NOT NULL,
+                        units_in_yard INTEGER DEFAULT 0,
+                        weight_in_yard REAL DEFAULT 0,
+                        value_in_yard REAL DEFAULT 0,
+                        units_disposed INTEGER DEFAULT 0,
+                        weight_disposed REAL DEFAULT 0,
+                        PRIMARY KEY (battery_type, grade)
+                    )
+                ''')
+
+                # Invoice Documents (rendered PDFs by number, loose or packed into a monthly zip)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS invoice_documents (
+                        doc_no TEXT PRIMARY KEY, -- invoice_no or credit_note_no
+                        doc_type TEXT DEFAULT 'invoice', -- invoice / credit_note
+                        path TEXT,
+                        sha256 TEXT,
+                        size_bytes INTEGER,
+                        render_version INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        archive_path TEXT, -- set once packed into invoices/archive/YYYY-MM.zip
+                        archive_member TEXT
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_documents_sha ON invoice_documents (sha256)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_documents_created ON invoice_documents (archive_path, created_at)")
+
+                # Share Outbox (WhatsApp messages sent in the background, never on the checkout path)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS share_outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        invoice_no TEXT,
+                        mobile TEXT NOT NULL,
+                        template TEXT,
+                        message TEXT NOT NULL,
+                        status TEXT DEFAULT 'pending', -- pending / sending / sent / opened (browser: shown, not confirmed) / failed
+                        attempts INTEGER DEFAULT 0,
+                        last_error TEXT,
+                        claimed_by TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        sent_at TIMESTAMP
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_share_outbox_pending ON share_outbox (status, next_attempt_at)")
+
+                # Tax Rates (GST % per HSN code; the category column marks the default for that product category)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tax_rates (
+                        hsn_code TEXT PRIMARY KEY,
+                        description TEXT,
+                        category TEXT,
+                        gst_rate REAL NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                cursor.executemany("INSERT OR IGNORE INTO tax_rates (hsn_code, description, category, gst_rate) VALUES (?, ?, ?, ?)", [
+                    ('8507', "Electric accumulators (batteries)", 'Battery', 18),
+                    ('8504', "Static converters (inverters, UPS)", 'Inverter', 18),
+                    ('8541', "Photovoltaic modules", 'Solar Panel', 5),
+                    ('8544', "Insulated wire and cable", 'Cable', 18),
+                ])
+
+                # Migration: per-line GST breakup (prices are GST-inclusive; taxable + tax = total_price)
+                for table, column in [("products", "hsn_code TEXT"),
+                                      ("invoices", "place_of_supply TEXT"),
+                                      ("invoices", "taxable_amount REAL"),
+                                      ("invoices", "tax_amount REAL"),
+                                      ("invoice_items", "hsn_code TEXT"),
+                                      ("invoice_items", "gst_rate REAL"),
+                                      ("invoice_items", "taxable_value REAL"),
+                                      ("invoice_items", "cgst REAL DEFAULT 0"),
+                                      ("invoice_items", "sgst REAL DEFAULT 0"),
+                                      ("invoice_items", "igst REAL DEFAULT 0")]:
+                    try:
+                        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+                    except sqlite3.OperationalError:
+                        pass # Column already exists
+
+                # Reorder Levels (forecast from recent sales velocity; stale = sold since last computed)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS reorder_levels (
+                        product_id INTEGER PRIMARY KEY,
+                        daily_velocity REAL DEFAULT 0,
+                        velocity_std REAL DEFAULT 0,
+                        lead_time_days REAL,
+                        reorder_point INTEGER DEFAULT 0,
+                        reorder_qty INTEGER DEFAULT 0,
+                        stale INTEGER DEFAULT 1,
+                        updated_at TIMESTAMP,
+                        FOREIGN KEY (product_id) REFERENCES products (id)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_reorder_levels_stale ON reorder_levels (stale) WHERE stale = 1")
+
+                # Migration: supplier lead time per receipt (days from order to delivery)
+                try:
+                    cursor.execute("ALTER TABLE purchases ADD COLUMN lead_time_days REAL")
+                except sqlite3.OperationalError:
+                    pass # Column already exists
+
+                # Analytics cubes: month grain totals and the category/brand mix, maintained at checkout
+                for column in ("gross_amount REAL DEFAULT 0", "exchange_count INTEGER DEFAULT 0", "exchange_amount REAL DEFAULT 0"):
+                    try:
+                        cursor.execute(f"ALTER TABLE sales_daily ADD COLUMN {column}")
+                    except sqlite3.OperationalError:
+                        pass # Column already exists
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sales_monthly (
+                        month TEXT PRIMARY KEY, -- YYYY-MM
+                        invoice_count INTEGER DEFAULT 0,
+                        gross_amount REAL DEFAULT 0,
+                        sales_amount REAL DEFAULT 0,
+                        exchange_count INTEGER DEFAULT 0,
+                        exchange_amount REAL DEFAULT 0,
+                        return_count INTEGER DEFAULT 0,
+                        return_amount REAL DEFAULT 0
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sales_monthly_mix (
+                        month TEXT NOT NULL,
+                        category TEXT NOT NULL,
+                        brand TEXT NOT NULL,
+                        units INTEGER DEFAULT 0,
+                        revenue REAL DEFAULT 0,
+                        PRIMARY KEY (month, category, brand)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer_stats_spend ON customer_stats (lifetime_spend)")
+
+                # Migration: weighted-average cost snapshotted on each invoice line at sale time
+                try:
+                    cursor.execute("ALTER TABLE invoice_items ADD COLUMN unit_cost REAL")
+                except sqlite3.OperationalError:
+                    pass # Column already exists
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_credit_notes_date ON credit_notes (date)")
+
+                # Migration: structured product attributes; display_name / search_key are derived from them on write
+                added = False
+                for column in ("capacity_ah REAL", "voltage REAL", "technology TEXT", "display_name TEXT", "search_key TEXT"):
+                    try:
+                        cursor.execute(f"ALTER TABLE products ADD COLUMN {column}")
+                        added = True
+                    except sqlite3.OperationalError:
+                        pass # Column already exists
+                if added:
+                    # One-off: existing products get what their model names say
+                    cursor.execute("SELECT id, model_name FROM products")
+                    cursor.executemany("UPDATE products SET capacity_ah = ?, voltage = ?, technology = ? WHERE id = ?",
+                                       [(*parse_attributes(model), pid) for pid, model in cursor.fetchall()])
+                    cursor.execute(f"UPDATE products SET display_name = {display_name_sql()}, search_key = {search_key_sql()}")
+                for name, event in [("insert", "INSERT"),
+                                    ("update", "UPDATE OF qr_code, category, brand_name, model_name, capacity_ah, voltage, technology")]:
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_products_names_{name} AFTER {event} ON products
+                        BEGIN
+                            UPDATE products SET display_name = {display_name_sql('NEW.')}, search_key = {search_key_sql('NEW.')}
+                            WHERE id = NEW.id;
+                        END
+                    """)
+                # Facets for the billing filters: partial (sellable products only) and each covering all three
+                # facet columns, so value counts never touch the table
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_brand_capacity ON products (brand_name, capacity_ah, technology) WHERE is_active = 1")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_capacity ON products (capacity_ah, brand_name, technology) WHERE is_active = 1")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_technology ON products (technology, brand_name, capacity_ah) WHERE is_active = 1")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_display ON products (display_name) WHERE is_active = 1")
+
+                # Branch Sync: change log (outbox + everything received), peers and other branches' stock
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sync_state (
+                        key TEXT PRIMARY KEY,
+                        value TEXT
+                    )
+                ''')
+                cursor.execute("INSERT OR IGNORE INTO sync_state (key, value) VALUES ('branch_id', lower(hex(randomblob(4))))")
+                # A crash mid-apply must not leave change capture switched off
+                cursor.execute("DELETE FROM sync_state WHERE key = 'applying'")
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS change_log (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        origin TEXT NOT NULL, -- branch that made the change
+                        origin_seq INTEGER, -- its seq there; NULL for our own (= seq)
+                        lamport INTEGER NOT NULL,
+                        entity TEXT NOT NULL, -- product / customer / stock
+                        entity_key TEXT NOT NULL, -- qr_code / mobile_number / qr_code
+                        payload TEXT NOT NULL, -- JSON; stock carries a delta
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_origin ON change_log (origin, origin_seq)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_lamport ON change_log (lamport)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_entity ON change_log (entity, entity_key, lamport)")
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sync_peers (
+                        peer_id TEXT PRIMARY KEY,
+                        sent_seq INTEGER DEFAULT 0, -- our change_log seq the peer has acknowledged
+                        received_seq INTEGER DEFAULT 0, -- the peer's change_log seq we have applied
+                        last_sync TIMESTAMP
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS branch_stock (
+                        qr_code TEXT NOT NULL,
+                        branch_id TEXT NOT NULL,
+                        quantity INTEGER DEFAULT 0,
+                        updated_at TIMESTAMP,
+                        PRIMARY KEY (qr_code, branch_id)
+                    )
+                ''')
+                # Change capture: every local write to the catalog, customers or stock lands in change_log,
+                # stamped with the next Lamport time. Skipped while a peer's batch is being applied.
+                capture = "NOT EXISTS (SELECT 1 FROM sync_state WHERE key = 'applying')"
+                product_payload = """json_object('category', NEW.category, 'brand_name', NEW.brand_name, 'model_name', NEW.model_name,
+                                                 'warranty_months', NEW.warranty_months, 'current_price', NEW.current_price,
+                                                 'hsn_code', NEW.hsn_code, 'is_active', NEW.is_active,
+                                                 'capacity_ah', NEW.capacity_ah, 'voltage', NEW.voltage, 'technology', NEW.technology)"""
+                product_changed = """(OLD.category, OLD.brand_name, OLD.model_name, OLD.warranty_months, OLD.current_price, OLD.hsn_code, OLD.is_active,
+                                      OLD.capacity_ah, OLD.voltage, OLD.technology)
+                                     IS NOT (NEW.category, NEW.brand_name, NEW.model_name, NEW.warranty_months, NEW.current_price, NEW.hsn_code, NEW.is_active,
+                                             NEW.capacity_ah, NEW.voltage, NEW.technology)"""
+                # Recreated each start so databases from before the attribute columns capture them too
+                cursor.execute("DROP TRIGGER IF EXISTS trg_sync_products_insert")
+                cursor.execute("DROP TRIGGER IF EXISTS trg_sync_products_update")
+                customer_payload = "json_object('full_name', NEW.full_name, 'address', NEW.address)"
+                stock_key = "COALESCE((SELECT qr_code FROM products WHERE id = NEW.product_id), '#' || NEW.product_id)"
+                for name, event, table, when, entity, key, payload in [
+                    ("products_insert", "INSERT", "products", "1", "product", "NEW.qr_code", product_payload),
+                    ("products_update", "UPDATE", "products", product_changed, "product", "NEW.qr_code", product_payload),
+                    ("customers_insert", "INSERT", "customers", "1", "customer", "NEW.mobile_number", customer_payload),
+                    ("customers_update", "UPDATE", "customers", "(OLD.full_name, OLD.address) IS NOT (NEW.full_name, NEW.address)",
+                     "customer", "NEW.mobile_number", customer_payload),
+                    ("stock_insert", "INSERT", "stock", "COALESCE(NEW.quantity_available, 0) != 0", "stock", stock_key,
+                     "json_object('delta', NEW.quantity_available)"),
+                    ("stock_update", "UPDATE", "stock", "NEW.quantity_available IS NOT OLD.quantity_available", "stock", stock_key,
+                     "json_object('delta', COALESCE(NEW.quantity_available, 0) - COALESCE(OLD.quantity_available, 0))"),
+                ]:
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_sync_{name} AFTER {event} ON {table}
+                        WHEN {capture} AND {when}
+                        BEGIN
+                            INSERT INTO change_log (origin, lamport, entity, entity_key, payload)
+                            VALUES ((SELECT value FROM sync_state WHERE key = 'branch_id'),
+                                    (SELECT COALESCE(MAX(lamport), 0) + 1 FROM change_log),
+                                    '{entity}', {key}, {payload});
+                        END
+                    """)
+
+                # Held Carts (autosaved open cart per terminal, and carts parked while the customer steps out)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS held_carts (
+                        cart_id TEXT PRIMARY KEY, -- same id as the cart's stock reservations
+                        terminal_id TEXT,
+                        status TEXT NOT NULL DEFAULT 'open', -- open / held
+                        customer_name TEXT,
+                        mobile TEXT,
+                        item_count INTEGER DEFAULT 0,
+                        total REAL DEFAULT 0,
+                        payload TEXT NOT NULL, -- JSON: customer fields, items, exchange fields
+                        updated_at TIMESTAMP
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_held_carts_status ON held_carts (status, terminal_id, updated_at)")
+
+                # Invoice Journal (PDF render state per invoice; rows left 'committed' are re-rendered at startup)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS invoice_journal (
+                        invoice_no TEXT PRIMARY KEY,
+                        status TEXT NOT NULL DEFAULT 'committed', -- committed / rendered / shared
+                        payload TEXT, -- JSON render input; cleared once rendered
+                        attempts INTEGER DEFAULT 0,
+                        last_error TEXT,
+                        terminal_id TEXT, -- the till that made the sale; only it re-renders the row
+                        updated_at TIMESTAMP
+                    )
+                ''')
+                try:
+                    cursor.execute("ALTER TABLE invoice_journal ADD COLUMN terminal_id TEXT")
+                except sqlite3.OperationalError:
+                    pass # Column already exists
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_journal_status ON invoice_journal (status, updated_at)")
+
+                # Indexes for date-range scans and per-invoice item lookups
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_date ON invoices (date)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice ON invoice_items (invoice_no)")
+                
                 conn.commit()
                 logging.info("Database initialized successfully.")
         except Exception as e:
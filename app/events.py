@@ -0,0 +1,41 @@
+"""
+In-process change notifications. Services publish after they commit; screens subscribe
+instead of re-running every query. Handlers run on the publishing thread, so UI code
+should subscribe through app.ui.event_bridge rather than here.
+
+Topics and payloads:
+    invoice.created   invoice_no, date, customer_name, final_amount, product_ids
+    invoice.returned  credit_note_no, invoice_no, date, amount, product_ids
+    stock.changed     product_ids
+    product.changed   product_ids
+    db.changed        (another terminal committed; no detail available)
+"""
+import logging
+import threading
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers = {}
+
+    def subscribe(self, topic, handler):
+        """topic '*' receives every event as handler(topic, payload)."""
+        with self._lock:
+            self._handlers.setdefault(topic, []).append(handler)
+
+    def unsubscribe(self, topic, handler):
+        with self._lock:
+            if handler in self._handlers.get(topic, []):
+                self._handlers[topic].remove(handler)
+
+    def publish(self, topic, **payload):
+        with self._lock:
+            handlers = list(self._handlers.get(topic, ())) + list(self._handlers.get('*', ()))
+        for handler in handlers:
+            try:
+                handler(topic, payload)
+            except Exception as e:
+                # A broken subscriber must never fail the sale that published the event
+                logging.error(f"Event handler for {topic} failed: {e}")
+
+bus = EventBus()
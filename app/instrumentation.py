@@ -0,0 +1,245 @@
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from app.config import Config
+
+SQL_LOGGER = "smartbill.sql"
+SLOW_LOGGER = "smartbill.slowquery"
+
+_NULL_PHASE = nullcontext()
+_WS = re.compile(r"\s+")
+_THIS_FILE = os.path.abspath(__file__)
+
+
+class Histogram:
+    """Rolling window of the most recent samples (ms) plus lifetime count/total. Fed from any thread."""
+
+    def __init__(self, maxlen=1024):
+        self.samples = deque(maxlen=maxlen)
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def add(self, ms, rows=0):
+        with self._lock:
+            self.samples.append(ms)
+            self.count += 1
+            self.total_ms += ms
+            if rows > 0:
+                self.rows += rows
+
+    def summary(self):
+        with self._lock:
+            values = sorted(self.samples)
+            count, total_ms, rows = self.count, self.total_ms, self.rows
+        if not values:
+            return {'count': count, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0,
+                    'total_ms': total_ms, 'rows': rows}
+        last = len(values) - 1
+        return {
+            'count': count,
+            'p50': values[int(last * 0.50)],
+            'p95': values[int(last * 0.95)],
+            'p99': values[int(last * 0.99)],
+            'max': values[-1],
+            'total_ms': total_ms,
+            'rows': rows,
+        }
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record("phase", self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class Profiler:
+    """
+    Opt-in timing for SQL statements, service phases and screen loads.
+    When disabled, `phase()` hands back a shared no-op context and connections are plain sqlite3 ones.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_ms = 50.0
+        self.window = 1024
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.slow_log_path = os.path.join(Config.DATA_DIR, "slow_queries.log")
+
+    def configure(self, settings=None):
+        """Enables from settings.json ("diagnostics": {"enabled": true, "slow_query_ms": 50}) or SMARTBILL_PROFILE=1."""
+        opts = (settings or {}).get('diagnostics', {})
+        self.slow_query_ms = float(opts.get('slow_query_ms', self.slow_query_ms))
+        if opts.get('enabled') or os.environ.get("SMARTBILL_PROFILE") == "1":
+            self.enable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        slow = logging.getLogger(SLOW_LOGGER)
+        if not slow.handlers:
+            handler = logging.FileHandler(self.slow_log_path, encoding="utf-8")
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+            slow.addHandler(handler)
+            slow.setLevel(logging.WARNING)
+            slow.propagate = False
+        self.enabled = True
+        logging.info(f"Profiling enabled (slow query threshold {self.slow_query_ms:.0f} ms)")
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, kind, name, ms, rows=0):
+        key = (kind, name)
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram(self.window))
+        hist.add(ms, rows)
+
+    def record_statement(self, sql, ms, rows, site):
+        text = _WS.sub(" ", sql).strip()
+        self.record("sql", text[:160], ms, rows)
+        logging.getLogger(SQL_LOGGER).debug(f"{ms:8.2f} ms  rows={rows:<6} {site}  {text}")
+        if ms >= self.slow_query_ms:
+            logging.getLogger(SLOW_LOGGER).warning(f"{ms:.2f} ms rows={rows} at {site}: {text}")
+
+    def snapshot(self):
+        """Rows of (kind, name, summary dict), slowest total first."""
+        with self._lock:
+            items = list(self._histograms.items())
+        rows = [(kind, name, hist.summary()) for (kind, name), hist in items]
+        rows.sort(key=lambda r: r[2]['total_ms'], reverse=True)
+        return rows
+
+
+profiler = Profiler()
+
+
+def _call_site():
+    """First frame outside this module and the stdlib, as 'path:line function'."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != _THIS_FILE and filename.startswith(Config.BASE_DIR) and "site-packages" not in filename:
+            rel = os.path.relpath(filename, Config.BASE_DIR)
+            return f"{rel}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Times each statement from execute until its rows are fetched (SQLite does most work while stepping)."""
+
+    _pending = None
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            sql, site, ms, rows = pending
+            if rows == 0 and self.rowcount > 0:
+                rows = self.rowcount
+            profiler.record_statement(sql, ms, rows, site)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        if not profiler.enabled:
+            return super().execute(sql, parameters)
+        site = _call_site()
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, site, (time.perf_counter() - t0) * 1000, 0]
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        if not profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        site = _call_site()
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._pending = [sql, site, (time.perf_counter() - t0) * 1000, 0]
+            self._finish()
+
+    def _timed_fetch(self, fetch, *args):
+        t0 = time.perf_counter()
+        result = fetch(*args)
+        if self._pending is not None:
+            self._pending[2] += (time.perf_counter() - t0) * 1000
+            if isinstance(result, list):
+                self._pending[3] += len(result)
+            elif result is not None:
+                self._pending[3] += 1
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed_fetch(super().fetchmany, *args)
+
+    def fetchall(self):
+        result = self._timed_fetch(super().fetchall)
+        self._finish()
+        return result
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        if not profiler.enabled:
+            return super().commit()
+        t0 = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            profiler.record("sql", "COMMIT", (time.perf_counter() - t0) * 1000)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, NamedTuple
 from datetime import datetime
+from app.money import format_amount
 
 @dataclass
 class Product:
@@ -12,6 +13,10 @@ class Product:
     warranty_months: int
     current_price: float
     current_purchase_price: float = 0.0
+    capacity_ah: Optional[float] = None
+    voltage: Optional[float] = None
+    technology: Optional[str] = None
+    display_name: Optional[str] = None  # maintained by the database
     last_updated: Optional[datetime] = None
 
 @dataclass
@@ -55,3 +60,36 @@ class Stock:
     product_id: int
     quantity_available: int
     last_updated: Optional[datetime] = None
+
+class CatalogRow(NamedTuple):
+    """One PRODUCT_LIST row, as the billing screen keeps it for the product picker."""
+    id: int
+    brand_name: str
+    model_name: str
+    price: float
+    stock: int
+    display_name: str
+
+    @property
+    def label(self):
+        return f"{self.display_name} ({format_amount(self.price)})"
+
+class CartLine:
+    """
+    One billing cart line. key is the line's CartTotals key; total is kept in rupees as the
+    services expect. as_item() is the dict create_invoice and the saved cart take.
+    """
+    __slots__ = ("key", "product_id", "product_name", "qty", "selling_price", "total", "serials")
+
+    def __init__(self, key, product_id, product_name, qty, selling_price, total, serials=None):
+        self.key = key
+        self.product_id = product_id
+        self.product_name = product_name
+        self.qty = qty
+        self.selling_price = selling_price
+        self.total = total
+        self.serials = list(serials or [])
+
+    def as_item(self):
+        return {'product_id': self.product_id, 'product_name': self.product_name, 'qty': self.qty,
+                'selling_price': self.selling_price, 'total': self.total, 'serials': list(self.serials)}
@@ -0,0 +1,109 @@
+"""
+Money as integer paise. Amounts enter through to_paise (Decimal, half-up to the paisa), are
+added and subtracted as ints, and leave through from_paise (REAL columns) or format_inr.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+_PAISA = Decimal("0.01")
+
+def to_paise(amount):
+    """int / float / str / Decimal rupees -> int paise, rounded half-up. Floats go via repr, not binary value."""
+    if isinstance(amount, int):
+        return amount * 100
+    if isinstance(amount, float):
+        amount = repr(amount)
+    return int(Decimal(amount).quantize(_PAISA, rounding=ROUND_HALF_UP) * 100)
+
+def from_paise(paise):
+    """int paise -> float rupees for storage in the existing REAL columns (exact to 2 dp)."""
+    return paise / 100
+
+def line_total(qty, unit_price):
+    """Paise for qty x unit price; the unit price is rounded to the paisa first, as printed."""
+    return qty * to_paise(unit_price)
+
+def split(paise, parts):
+    """Splits an amount into `parts` paise values that add back up exactly (remainder to the first ones)."""
+    base, rem = divmod(paise, parts)
+    return [base + (1 if i < rem else 0) for i in range(parts)]
+
+def allocate(paise, weights):
+    """Splits an amount in proportion to `weights` (paise); the parts add back up exactly (largest remainders first)."""
+    total = sum(weights)
+    if total <= 0:
+        return split(paise, len(weights))
+    shares = [divmod(paise * w, total) for w in weights]
+    parts = [q for q, _ in shares]
+    for i in sorted(range(len(weights)), key=lambda i: -shares[i][1])[:paise - sum(parts)]:
+        parts[i] += 1
+    return parts
+
+def _group_indian(rupees):
+    s = str(rupees)
+    if len(s) <= 3:
+        return s
+    head, tail = s[:-3], s[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return ",".join(groups) + "," + tail
+
+@lru_cache(maxsize=8192)
+def format_inr(paise, symbol=True):
+    """12345678 paise -> '₹1,23,456.78' (lakh/crore grouping). Cached: screens redraw the same figures."""
+    sign = "-" if paise < 0 else ""
+    rupees, p = divmod(abs(paise), 100)
+    return f"{sign}{'₹' if symbol else ''}{_group_indian(rupees)}.{p:02d}"
+
+@lru_cache(maxsize=8192)
+def format_amount(amount, symbol=True):
+    """format_inr for a rupee value (float / str / Decimal) as read from the database. Cached like format_inr."""
+    return format_inr(to_paise(amount or 0), symbol)
+
+class CartTotals:
+    """Running cart totals: each line change adjusts the sums instead of re-adding the whole cart."""
+
+    __slots__ = ("_lines", "_next_key", "subtotal", "deduction")
+
+    def __init__(self):
+        self._lines = {}
+        self._next_key = 0
+        self.subtotal = 0
+        self.deduction = 0
+
+    def add(self, qty, unit_price):
+        """Adds a line; returns (key, line paise)."""
+        key = self._next_key
+        self._next_key += 1
+        paise = line_total(qty, unit_price)
+        self._lines[key] = paise
+        self.subtotal += paise
+        return key, paise
+
+    def update(self, key, qty, unit_price):
+        paise = line_total(qty, unit_price)
+        self.subtotal += paise - self._lines[key]
+        self._lines[key] = paise
+        return paise
+
+    def remove(self, key):
+        self.subtotal -= self._lines.pop(key)
+
+    def set_deduction(self, amount):
+        self.deduction = to_paise(amount or 0)
+
+    def clear(self):
+        self._lines.clear()
+        self.subtotal = 0
+        self.deduction = 0
+
+    @property
+    def grand_total(self):
+        return self.subtotal - self.deduction
+
+    def __len__(self):
+        return len(self._lines)
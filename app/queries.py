@@ -0,0 +1,83 @@
+"""SQL used by the screens, kept in one place so the benchmarks replay exactly what the UI runs."""
+
+# Billing Screen
+PRODUCT_LIST = """
+    SELECT id, brand_name, model_name, current_price, quantity_available, display_name
+    FROM products JOIN stock ON products.id = stock.product_id
+    WHERE products.is_active = 1
+"""
+# Facet values with product counts; each is a scan of one partial index (see ProductService.facets)
+PRODUCT_FACET = """
+    SELECT {column}, COUNT(*) FROM products
+    WHERE is_active = 1 AND {column} IS NOT NULL {where}
+    GROUP BY {column} ORDER BY {column}
+"""
+
+CUSTOMER_BY_MOBILE = "SELECT full_name, address FROM customers WHERE mobile_number = ?"
+
+# Dashboard
+DASHBOARD_TOTAL_INVOICES = """
+    SELECT (SELECT COUNT(*) FROM invoices)
+         + (SELECT COALESCE(SUM(invoice_count), 0) FROM archive_partitions)
+"""
+# Net of credit notes; one primary-key lookup on the daily aggregate
+DASHBOARD_TODAY_SALES = """
+    SELECT COALESCE(SUM(sales_amount - return_amount), 0) FROM sales_daily
+    WHERE day = DATE('now', 'localtime')
+"""
+DASHBOARD_TODAY_COUNT = """
+    SELECT COALESCE(SUM(invoice_count), 0) FROM sales_daily
+    WHERE day = DATE('now', 'localtime')
+"""
+# At or below the forecast reorder point (see ForecastService)
+DASHBOARD_LOW_STOCK = """
+    SELECT COUNT(*) FROM stock JOIN products ON stock.product_id = products.id
+    LEFT JOIN reorder_levels r ON r.product_id = stock.product_id
+    WHERE products.is_active = 1 AND stock.quantity_available <= COALESCE(r.reorder_point, 0)
+"""
+DASHBOARD_TOTAL_PRODUCTS = "SELECT COUNT(*) FROM products WHERE is_active = 1"
+DASHBOARD_RECENT_INVOICES = """
+    SELECT i.invoice_no, c.full_name, i.final_amount, i.date
+    FROM invoices i
+    JOIN customers c ON i.customer_id = c.id
+    ORDER BY i.date DESC LIMIT 10
+"""
+# Live dashboard: the newest of what another terminal added since the newest row shown (newest first)
+DASHBOARD_INVOICES_SINCE = """
+    SELECT i.invoice_no, c.full_name, i.final_amount, i.date
+    FROM invoices i
+    JOIN customers c ON i.customer_id = c.id
+    WHERE i.date >= ?
+    ORDER BY i.date DESC LIMIT 10
+"""
+
+# Stock Screen
+STOCK_LEDGER = """
+    SELECT p.id, p.display_name, p.category, p.qr_code, s.quantity_available,
+           COALESCE(r.reorder_point, 0),
+           COALESCE((SELECT SUM(b.quantity) FROM branch_stock b WHERE b.qr_code = p.qr_code), 0)
+    FROM products p
+    JOIN stock s ON p.id = s.product_id
+    LEFT JOIN reorder_levels r ON r.product_id = p.id
+    WHERE p.is_active = 1
+    ORDER BY s.quantity_available ASC
+"""
+# Bind f"%{normalize(term)}%": search_key is the normalized name, QR code, category and technology
+STOCK_SEARCH = """
+    SELECT p.id, p.display_name, p.category, p.qr_code, s.quantity_available,
+           COALESCE(r.reorder_point, 0),
+           COALESCE((SELECT SUM(b.quantity) FROM branch_stock b WHERE b.qr_code = p.qr_code), 0)
+    FROM products p
+    JOIN stock s ON p.id = s.product_id
+    LEFT JOIN reorder_levels r ON r.product_id = p.id
+    WHERE p.is_active = 1 AND p.search_key LIKE ?
+    ORDER BY s.quantity_available ASC
+"""
+
+# Customer Screen
+CUSTOMER_LIST = "SELECT id, full_name, mobile_number, address FROM customers ORDER BY full_name ASC"
+CUSTOMER_SEARCH = """
+    SELECT id, full_name, mobile_number, address FROM customers
+    WHERE full_name LIKE ? OR mobile_number LIKE ?
+    ORDER BY full_name ASC
+"""
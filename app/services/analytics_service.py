@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from app.database import db
+
+GRAINS = {
+    'day': "Daily",
+    'week': "Weekly",
+    'month': "Monthly",
+}
+# How far back each grain looks; each chart reads at most a few hundred cube rows
+PERIODS = {'day': 60, 'week': 26, 'month': 24}
+
+def _month_back(today, months):
+    index = today.year * 12 + today.month - 1 - months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def _months(start, today):
+    """Every YYYY-MM from start to today's month, so empty months still get a bar."""
+    y, m = int(start[:4]), int(start[5:7])
+    out = []
+    while (y, m) <= (today.year, today.month):
+        out.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+class AnalyticsService:
+    """Time series for the analytics screen, read only from the pre-aggregated cubes."""
+
+    @staticmethod
+    def revenue(grain='day', periods=None, today=None):
+        """[(label, net_sales, returns)] oldest first; net_sales is after exchange deductions and credit notes."""
+        today = today or date.today()
+        periods = periods or PERIODS[grain]
+        cursor = db.get_connection().cursor()
+        if grain == 'month':
+            start = _month_back(today, periods - 1)
+            cursor.execute("""
+                SELECT month, sales_amount - return_amount, return_amount
+                FROM sales_monthly WHERE month >= ?
+            """, (start,))
+            found = {row[0]: row[1:] for row in cursor.fetchall()}
+            return [(m, *found.get(m, (0.0, 0.0))) for m in _months(start, today)]
+
+        if grain == 'week':
+            # Weeks start on Monday; labelled by their first day
+            first = today - timedelta(days=today.weekday() + 7 * (periods - 1))
+            cursor.execute("""
+                SELECT DATE(day, '-' || ((CAST(strftime('%w', day) AS INTEGER) + 6) % 7) || ' days'),
+                       SUM(sales_amount - return_amount), SUM(return_amount)
+                FROM sales_daily WHERE day >= ? GROUP BY 1
+            """, (first.isoformat(),))
+            found = {row[0]: row[1:] for row in cursor.fetchall()}
+            weeks = [(first + timedelta(weeks=i)).isoformat() for i in range(periods)]
+            return [(w, *found.get(w, (0.0, 0.0))) for w in weeks]
+
+        first = today - timedelta(days=periods - 1)
+        cursor.execute("""
+            SELECT day, sales_amount - return_amount, return_amount
+            FROM sales_daily WHERE day >= ?
+        """, (first.isoformat(),))
+        found = {row[0]: row[1:] for row in cursor.fetchall()}
+        days = [(first + timedelta(days=i)).isoformat() for i in range(periods)]
+        return [(d, *found.get(d, (0.0, 0.0))) for d in days]
+
+    @staticmethod
+    def mix(dimension='brand', months=12, limit=12, today=None):
+        """[(brand or category, units, revenue)] over the last `months`, best sellers first."""
+        if dimension not in ('brand', 'category'):
+            raise Exception(f"Unknown dimension: {dimension}")
+        start = _month_back(today or date.today(), months - 1)
+        cursor = db.get_connection().cursor()
+        cursor.execute(f"""
+            SELECT {dimension}, SUM(units), SUM(revenue)
+            FROM sales_monthly_mix WHERE month >= ?
+            GROUP BY {dimension} HAVING SUM(units) > 0
+            ORDER BY SUM(revenue) DESC LIMIT ?
+        """, (start, limit))
+        return [(name or "(none)", units, revenue) for name, units, revenue in cursor.fetchall()]
+
+    @staticmethod
+    def exchange_trend(months=12, today=None):
+        """[(month, exchange_count, exchange_amount, share of gross sales %)] oldest first."""
+        today = today or date.today()
+        start = _month_back(today, months - 1)
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT month, exchange_count, exchange_amount,
+                   CASE WHEN gross_amount > 0 THEN 100.0 * exchange_amount / gross_amount ELSE 0 END
+            FROM sales_monthly WHERE month >= ?
+        """, (start,))
+        found = {row[0]: row[1:] for row in cursor.fetchall()}
+        return [(m, *found.get(m, (0, 0.0, 0.0))) for m in _months(start, today)]
+
+    @staticmethod
+    def top_customers(limit=10):
+        """[(name, mobile, invoice_count, lifetime_spend, last_purchase)] by lifetime spend."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT c.full_name, c.mobile_number, s.invoice_count, s.lifetime_spend, s.last_purchase
+            FROM customer_stats s JOIN customers c ON c.id = s.customer_id
+            ORDER BY s.lifetime_spend DESC LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
@@ -0,0 +1,242 @@
+import os
+import re
+import sqlite3
+import time
+import logging
+from datetime import date
+from app.config import Config
+from app.database import db
+
+ARCHIVED_TABLES = ("invoices", "invoice_items")
+# SQLite's default SQLITE_MAX_ATTACHED
+MAX_ATTACHED = 10
+
+
+def fiscal_year_of(day):
+    """Indian fiscal year (April-March) a date falls in, named by its starting year."""
+    if isinstance(day, str):
+        day = date(int(day[:4]), int(day[5:7]), int(day[8:10]))
+    return day.year if day.month >= 4 else day.year - 1
+
+
+def fiscal_year_bounds(fy):
+    """[start, end) as 'YYYY-MM-DD' strings, comparable against invoices.date."""
+    return f"{fy}-04-01", f"{fy + 1}-04-01"
+
+
+class ArchiveService:
+    """
+    Moves closed fiscal years out of app.db into data/archive_YYYY.db files and
+    stitches them back together on demand with ATTACH + UNION ALL temp views.
+    """
+
+    @staticmethod
+    def archive_path(fy):
+        return os.path.join(Config.DATA_DIR, f"archive_{fy}.db")
+
+    @staticmethod
+    def list_partitions():
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT fiscal_year, file_name, date_from, date_to, invoice_count, item_count, archived_at
+            FROM archive_partitions ORDER BY fiscal_year
+        """)
+        return cursor.fetchall()
+
+    @staticmethod
+    def closed_fiscal_years():
+        """Fiscal years that have ended and still have invoices in app.db."""
+        current = fiscal_year_of(date.today())
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT MIN(date) FROM invoices")
+        oldest = cursor.fetchone()[0]
+        if not oldest:
+            return []
+        return list(range(fiscal_year_of(oldest[:10]), current))
+
+    @staticmethod
+    def _columns(cursor, schema, table):
+        cursor.execute(f"PRAGMA {schema}.table_info({table})")
+        return [row[1] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _prepare_partition(cursor, alias):
+        """Creates/upgrades the archive copy of each table so its columns match app.db."""
+        for table in ARCHIVED_TABLES:
+            cursor.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            ddl = cursor.fetchone()[0]
+            arch_cols = ArchiveService._columns(cursor, alias, table)
+            if not arch_cols:
+                ddl = re.sub(r"CREATE TABLE (IF NOT EXISTS )?", f"CREATE TABLE IF NOT EXISTS {alias}.", ddl, count=1)
+                cursor.execute(ddl)
+                continue
+            cursor.execute(f"PRAGMA main.table_info({table})")
+            for _, name, col_type, _, default, _ in cursor.fetchall():
+                if name not in arch_cols:
+                    default_sql = f" DEFAULT {default}" if default is not None else ""
+                    cursor.execute(f"ALTER TABLE {alias}.{table} ADD COLUMN {name} {col_type}{default_sql}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {alias}.idx_invoices_date ON invoices (date)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {alias}.idx_invoices_customer ON invoices (customer_id)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {alias}.idx_invoice_items_invoice ON invoice_items (invoice_no)")
+
+    @staticmethod
+    def archive_fiscal_year(fy, compact=True):
+        """
+        Moves every invoice (and its items) dated inside fiscal year `fy` into archive_{fy}.db
+        in one transaction spanning both files, then VACUUMs. Only closed years are accepted.
+        """
+        if fy >= fiscal_year_of(date.today()):
+            raise Exception(f"Fiscal year {fy}-{(fy + 1) % 100:02d} is not closed yet.")
+
+        date_from, date_to = fiscal_year_bounds(fy)
+        path = ArchiveService.archive_path(fy)
+        started = time.perf_counter()
+
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("ATTACH DATABASE ? AS arch", (path,))
+        try:
+            ArchiveService._prepare_partition(cursor, "arch")
+            cursor.execute("BEGIN IMMEDIATE")
+
+            for table in ARCHIVED_TABLES:
+                cols = ", ".join(ArchiveService._columns(cursor, "main", table))
+                if table == "invoices":
+                    where = "date >= ? AND date < ?"
+                else:
+                    where = "invoice_no IN (SELECT invoice_no FROM main.invoices WHERE date >= ? AND date < ?)"
+                # OR IGNORE keeps a re-run after an interrupted archive idempotent
+                cursor.execute(f"INSERT OR IGNORE INTO arch.{table} ({cols}) SELECT {cols} FROM main.{table} WHERE {where}",
+                               (date_from, date_to))
+
+            cursor.execute("""
+                DELETE FROM main.invoice_items
+                WHERE invoice_no IN (SELECT invoice_no FROM main.invoices WHERE date >= ? AND date < ?)
+            """, (date_from, date_to))
+            cursor.execute("DELETE FROM main.invoices WHERE date >= ? AND date < ?", (date_from, date_to))
+
+            cursor.execute("SELECT COUNT(*) FROM arch.invoices")
+            invoice_count = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM arch.invoice_items")
+            item_count = cursor.fetchone()[0]
+            cursor.execute("""
+                INSERT OR REPLACE INTO archive_partitions
+                    (fiscal_year, file_name, date_from, date_to, invoice_count, item_count, archived_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (fy, os.path.basename(path), date_from, date_to, invoice_count, item_count,
+                  time.strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("DETACH DATABASE arch")
+
+        if compact:
+            ArchiveService.compact(path)
+            ArchiveService.compact(db.db_path)
+
+        logging.info(f"Archived FY {fy}: {invoice_count} invoices, {item_count} items to {path} "
+                     f"in {time.perf_counter() - started:.1f}s")
+        return invoice_count, item_count
+
+    @staticmethod
+    def compact(path):
+        conn = sqlite3.connect(path, timeout=Config.DB_BUSY_TIMEOUT)
+        conn.execute("VACUUM")
+        conn.close()
+
+    @staticmethod
+    def partitions_for_range(date_from=None, date_to=None):
+        """Archived fiscal years overlapping [date_from, date_to] (either end open)."""
+        lo = fiscal_year_of(date_from) if date_from else None
+        hi = fiscal_year_of(date_to) if date_to else None
+        return [row[0] for row in ArchiveService.list_partitions()
+                if (lo is None or row[0] >= lo) and (hi is None or row[0] <= hi)]
+
+    @staticmethod
+    def reporting_connection(date_from=None, date_to=None):
+        """
+        A connection where TEMP views all_invoices / all_invoice_items span app.db plus
+        only the archives the date range needs. Queries should still filter on date.
+        """
+        years = ArchiveService.partitions_for_range(date_from, date_to)
+        if len(years) > MAX_ATTACHED:
+            raise Exception(f"Date range spans {len(years)} archived years; narrow it to {MAX_ATTACHED} or fewer.")
+
+        conn = db.get_connection()
+        ArchiveService._span(conn.cursor(), ArchiveService._attach(conn.cursor(), years))
+        return conn
+
+    @staticmethod
+    def for_each_batch(conn, work, date_from=None, date_to=None):
+        """
+        For jobs over the whole history, which may span more archived years than SQLite can
+        attach at once: calls work(cursor) once per batch of at most MAX_ATTACHED archives,
+        with all_invoices / all_invoice_items covering only that batch (app.db's own rows are
+        in the first). Batches never share an invoice, so the caller adds up what work() staged.
+        `conn` must not be inside a transaction (ATTACH is not allowed there).
+        """
+        years = ArchiveService.partitions_for_range(date_from, date_to)
+        cursor = conn.cursor()
+        for start in range(0, max(len(years), 1), MAX_ATTACHED):
+            aliases = ArchiveService._attach(cursor, years[start:start + MAX_ATTACHED])
+            ArchiveService._span(cursor, aliases, with_main=start == 0)
+            try:
+                work(cursor)
+                conn.commit() # Ends the implicit transaction so the next batch can ATTACH
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                for table in ARCHIVED_TABLES:
+                    cursor.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+                for alias in aliases:
+                    cursor.execute(f"DETACH DATABASE {alias}")
+
+    @staticmethod
+    def _attach(cursor, years):
+        aliases = []
+        for fy in years:
+            path = ArchiveService.archive_path(fy)
+            if not os.path.exists(path):
+                logging.warning(f"Archive for FY {fy} is missing: {path}")
+                continue
+            alias = f"fy_{fy}"
+            cursor.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+            aliases.append(alias)
+        return aliases
+
+    @staticmethod
+    def _span(cursor, aliases, with_main=True):
+        """TEMP views all_<table>: app.db's rows (unless with_main=False) UNION ALL the attached archives."""
+        for table in ARCHIVED_TABLES:
+            cols = ArchiveService._columns(cursor, "main", table)
+            selects = [f"SELECT {', '.join(cols)} FROM main.{table}"] if with_main else []
+            for alias in aliases:
+                present = set(ArchiveService._columns(cursor, alias, table))
+                # Columns added to app.db after the year was archived read as NULL
+                picked = ", ".join(c if c in present else f"NULL AS {c}" for c in cols)
+                selects.append(f"SELECT {picked} FROM {alias}.{table}")
+            if not selects:
+                selects = [f"SELECT {', '.join(cols)} FROM main.{table} WHERE 0"]
+            cursor.execute(f"CREATE TEMP VIEW all_{table} AS {' UNION ALL '.join(selects)}")
+
+    @staticmethod
+    def find_invoice(invoice_no):
+        """Header row for an invoice wherever it lives; the number's date picks the one partition to open."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT * FROM invoices WHERE invoice_no = ?", (invoice_no,))
+        row = cursor.fetchone()
+        if row:
+            return row
+        m = re.match(r"INV-(\d{4})(\d{2})(\d{2})-", invoice_no)
+        if not m:
+            return None
+        path = ArchiveService.archive_path(fiscal_year_of(f"{m.group(1)}-{m.group(2)}-{m.group(3)}"))
+        if not os.path.exists(path):
+            return None
+        arch = sqlite3.connect(path)
+        row = arch.execute("SELECT * FROM invoices WHERE invoice_no = ?", (invoice_no,)).fetchone()
+        arch.close()
+        return row
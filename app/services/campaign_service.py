@@ -0,0 +1,133 @@
+import os
+import csv
+import time
+import logging
+from datetime import date
+from app.config import Config
+from app.database import db
+from app.utils import month_bounds
+from app.services.archive_service import ArchiveService
+from app.services.share_service import ShareService, get_transport
+from app.services.whatsapp_service import WhatsAppService
+
+# Free service check every N months while the battery is under warranty
+SERVICE_INTERVAL_MONTHS = 6
+
+COHORTS = {
+    'warranty_expiry': "Warranty expiring",
+    'service_due': "Service check due",
+}
+
+# Lines still held by the customer (not fully credited back)
+_NOT_RETURNED = """
+    ii.quantity > COALESCE((SELECT SUM(c.quantity) FROM credit_note_items c WHERE c.invoice_item_id = ii.id), 0)
+"""
+
+def next_month(today=None):
+    today = today or date.today()
+    return (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+
+class CampaignService:
+    """Reminder campaigns: one set-based pass picks the cohort, then one message per customer."""
+
+    @staticmethod
+    def _cohort_sql(cohort):
+        """
+        One row per customer: (customer_id, name, mobile, products, due_date, invoice_nos).
+        Named parameters: since (oldest sale date worth scanning), month_start, month_end, target (year * 12 + month).
+        """
+        if cohort == 'warranty_expiry':
+            due = "DATE(i.date, '+' || p.warranty_months || ' months')"
+            where = f"p.warranty_months > 0 AND {due} >= :month_start AND {due} < :month_end"
+        elif cohort == 'service_due':
+            # Whole months from sale to the target month: due on every interval, within warranty
+            months = "(:target - (CAST(strftime('%Y', i.date) AS INTEGER) * 12 + CAST(strftime('%m', i.date) AS INTEGER)))"
+            due = "DATE(:month_start, '+' || (CAST(strftime('%d', i.date) AS INTEGER) - 1) || ' days')"
+            where = (f"p.warranty_months > 0 AND {months} > 0 AND {months} % {SERVICE_INTERVAL_MONTHS} = 0 "
+                     f"AND {months} <= p.warranty_months")
+        else:
+            raise Exception(f"Unknown campaign cohort: {cohort}")
+        return f"""
+            SELECT c.id, c.full_name, c.mobile_number,
+                   GROUP_CONCAT(DISTINCT p.display_name),
+                   MIN({due}), GROUP_CONCAT(DISTINCT i.invoice_no)
+            FROM all_invoices i
+            JOIN all_invoice_items ii ON ii.invoice_no = i.invoice_no
+            JOIN products p ON p.id = ii.product_id
+            JOIN customers c ON c.id = i.customer_id
+            WHERE i.date >= :since AND {where} AND {_NOT_RETURNED}
+            GROUP BY c.id
+            ORDER BY c.id
+        """
+
+    @staticmethod
+    def cohort(cohort, year=None, month=None):
+        """Customers in the cohort for the target month (default: next month)."""
+        if year is None:
+            year, month = next_month()
+        month_start, month_end = month_bounds(year, month)
+
+        # Oldest sale that can still be in the cohort: bounds the scan to the date index and
+        # the archives attached to the years that can hold such a sale
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT DATE(?, '-' || (COALESCE(MAX(warranty_months), 0) + 1) || ' months') FROM products",
+                       (month_start,))
+        since = cursor.fetchone()[0]
+
+        conn = ArchiveService.reporting_connection(since, month_end)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(CampaignService._cohort_sql(cohort), {
+                'since': since, 'month_start': month_start, 'month_end': month_end, 'target': year * 12 + month,
+            })
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def can_queue():
+        """Whether the configured share transport can send a whole campaign unattended."""
+        return not get_transport().interactive
+
+    @staticmethod
+    def export(cohort, file_path=None, year=None, month=None, queue=False):
+        """
+        Renders one personalised message per customer and writes name, mobile, products,
+        due date, message and wa.me link to a CSV batch file. queue=True also puts the
+        messages in the share outbox, which needs a non-interactive share_transport.
+        Returns (file_path, customer_count).
+        """
+        if queue and not CampaignService.can_queue():
+            raise Exception("The browser share transport opens a tab per message, so campaigns cannot be queued with it. "
+                            "Export the batch file, or set a non-interactive share_transport in data/settings.json.")
+        if year is None:
+            year, month = next_month()
+        rows = CampaignService.cohort(cohort, year, month)
+        file_path = file_path or os.path.join(Config.INVOICE_DIR, "campaigns", f"{cohort}_{year}-{month:02d}.csv")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        outbox = []
+        t0 = time.perf_counter()
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["customer_name", "mobile", "products", "due_date", "invoices", "message", "link"])
+            for _, name, mobile, products, due_date, invoices in rows:
+                context = {'customer_name': name or "Customer", 'products': products.replace(",", ", "),
+                           'due_date': due_date, 'invoice_no': invoices.split(",")[0]}
+                message = ShareService.render(cohort, context)
+                writer.writerow([name, mobile, context['products'], due_date, invoices, message,
+                                 WhatsAppService.generate_whatsapp_link(mobile, message)])
+                if queue:
+                    outbox.append((mobile, cohort, message))
+
+        if queue and outbox:
+            conn = db.get_connection()
+            # Not tied to an invoice: a reminder must never mark a sale's journal entry shared
+            conn.executemany("INSERT INTO share_outbox (mobile, template, message) VALUES (?, ?, ?)", outbox)
+            conn.commit()
+            conn.close()
+            ShareService.wake()
+
+        logging.info(f"Campaign {cohort} {year}-{month:02d}: {len(rows)} customers -> {file_path} "
+                     f"({time.perf_counter() - t0:.2f}s render)")
+        return file_path, len(rows)
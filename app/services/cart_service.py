@@ -0,0 +1,104 @@
+import json
+import time
+from app.config import Config
+from app.database import db
+
+# Parked carts nobody came back for are dropped after this long
+STALE_DAYS = 7
+
+class CartService:
+    """
+    Carts persisted outside the billing screen: 'open' is the autosaved cart a terminal is
+    working on (restored after a restart), 'held' is a cart parked while the customer steps out.
+    The cart is stored as one compact JSON document; checkout deletes it in the same transaction.
+    """
+
+    @staticmethod
+    def save(cart_id, state, status='open'):
+        """Upserts the cart; an empty state (no customer, no items) removes it instead."""
+        conn = db.get_connection()
+        try:
+            if not state.get('items') and not state.get('mobile') and not state.get('name'):
+                conn.execute("DELETE FROM held_carts WHERE cart_id = ? AND status = 'open'", (cart_id,))
+            else:
+                total = sum(item['qty'] * item['selling_price'] for item in state.get('items', []))
+                conn.execute("""
+                    INSERT INTO held_carts (cart_id, terminal_id, status, customer_name, mobile, item_count, total, payload, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (cart_id) DO UPDATE SET
+                        terminal_id = excluded.terminal_id,
+                        status = excluded.status,
+                        customer_name = excluded.customer_name,
+                        mobile = excluded.mobile,
+                        item_count = excluded.item_count,
+                        total = excluded.total,
+                        payload = excluded.payload,
+                        updated_at = excluded.updated_at
+                """, (cart_id, Config.TERMINAL_ID, status, state.get('name'), state.get('mobile'),
+                      sum(item['qty'] for item in state.get('items', [])), total,
+                      json.dumps(state, separators=(",", ":")), time.strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def load(cart_id):
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT payload FROM held_carts WHERE cart_id = ?", (cart_id,))
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def list_held():
+        """[(cart_id, customer_name, mobile, item_count, total, updated_at, terminal_id)] from every terminal, newest first."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT cart_id, customer_name, mobile, item_count, total, updated_at, terminal_id
+            FROM held_carts WHERE status = 'held'
+            ORDER BY updated_at DESC
+        """)
+        return cursor.fetchall()
+
+    @staticmethod
+    def latest_open(terminal_id=None):
+        """The cart this terminal was working on when it closed, if any."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT cart_id FROM held_carts WHERE status = 'open' AND terminal_id = ?
+            ORDER BY updated_at DESC LIMIT 1
+        """, (terminal_id or Config.TERMINAL_ID,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def claim(cart_id):
+        """Marks a held cart as this terminal's open cart; False if another terminal resumed it first."""
+        conn = db.get_connection()
+        cursor = conn.execute("""
+            UPDATE held_carts SET status = 'open', terminal_id = ?, updated_at = ?
+            WHERE cart_id = ? AND status = 'held'
+        """, (Config.TERMINAL_ID, time.strftime("%Y-%m-%d %H:%M:%S"), cart_id))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def discard(cart_id):
+        conn = db.get_connection()
+        conn.execute("DELETE FROM held_carts WHERE cart_id = ?", (cart_id,))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def close(cursor, cart_id):
+        """Runs inside the create_invoice transaction: the cart became an invoice."""
+        if cart_id:
+            cursor.execute("DELETE FROM held_carts WHERE cart_id = ?", (cart_id,))
+
+    @staticmethod
+    def purge_stale(days=STALE_DAYS):
+        conn = db.get_connection()
+        cursor = conn.execute("DELETE FROM held_carts WHERE updated_at < DATETIME('now', 'localtime', ?)", (f"-{days} days",))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount
@@ -0,0 +1,178 @@
+import os
+import gzip
+import hmac
+import json
+import time
+import hashlib
+import logging
+from app.config import Config
+from app.database import db
+from app.events import bus
+
+PACKAGE_FORMAT = 2
+# First line of a package file; the JSON header and the gzipped body follow on their own lines
+MAGIC = b"SBCATALOG"
+
+CATALOG_COLUMNS = ("category", "brand_name", "model_name", "warranty_months", "current_price", "hsn_code", "is_active",
+                   "capacity_ah", "voltage", "technology")
+_PRICE = CATALOG_COLUMNS.index("current_price")
+
+
+def _signature(key, body):
+    return hmac.new(key.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def _key(key):
+    key = key or Config.CATALOG_KEY
+    if not key:
+        raise Exception("Set catalog_key in data/settings.json (the same on every terminal) to sign catalog packages.")
+    return key
+
+
+def _same(local, incoming):
+    """Row equality with prices compared to the paisa."""
+    for i, (a, b) in enumerate(zip(local, incoming)):
+        if i == _PRICE:
+            if round(a or 0, 2) != round(b or 0, 2):
+                return False
+        elif a != b:
+            return False
+    return True
+
+
+class CatalogService:
+    """
+    Catalog packages: the whole product list and prices in one signed, versioned, gzipped file,
+    built once at head office and applied on every terminal as a diff in a single transaction.
+    """
+
+    @staticmethod
+    def local_version():
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT value FROM sync_state WHERE key = 'catalog_version'")
+        row = cursor.fetchone()
+        return int(row[0]) if row else 0
+
+    @staticmethod
+    def build_package(out_path=None, version=None, key=None):
+        """Writes the active catalog (and archived products, so removals travel too). Returns (path, version, count)."""
+        key = _key(key)
+        version = version or max(CatalogService.local_version() + 1, int(time.strftime("%Y%m%d%H%M")))
+        cursor = db.get_connection().cursor()
+        cursor.execute(f"SELECT qr_code, {', '.join(CATALOG_COLUMNS)} FROM products ORDER BY qr_code")
+        products = cursor.fetchall()
+
+        body = gzip.compress(json.dumps({
+            'format': PACKAGE_FORMAT,
+            'version': version,
+            'columns': ["qr_code", *CATALOG_COLUMNS],
+            'products': products,
+        }, separators=(",", ":")).encode("utf-8"), compresslevel=9)
+        header = {
+            'format': PACKAGE_FORMAT,
+            'version': version,
+            'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'count': len(products),
+            'signature': _signature(key, body),
+        }
+
+        out_path = out_path or os.path.join(Config.SYNC_DIR, f"catalog_v{version}.sbc")
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        with open(out_path, "wb") as f:
+            f.write(MAGIC + b"\n" + json.dumps(header).encode("utf-8") + b"\n" + body)
+        logging.info(f"Catalog package v{version}: {len(products)} products -> {out_path}")
+        return out_path, version, len(products)
+
+    @staticmethod
+    def read_package(path, key=None):
+        """Verifies the signature before anything is parsed; returns the package document."""
+        key = _key(key)
+        with open(path, "rb") as f:
+            data = f.read()
+        parts = data.split(b"\n", 2)
+        if len(parts) != 3 or parts[0] != MAGIC:
+            raise Exception(f"{os.path.basename(path)} is not a catalog package.")
+        header = json.loads(parts[1])
+        body = parts[2]
+        if not hmac.compare_digest(header.get('signature', ''), _signature(key, body)):
+            raise Exception("Catalog package signature does not match; it was altered or signed with another key.")
+        doc = json.loads(gzip.decompress(body))
+        if doc.get('format') != PACKAGE_FORMAT or doc.get('version') != header.get('version'):
+            raise Exception("Unsupported or inconsistent catalog package.")
+        if doc.get('columns') != ["qr_code", *CATALOG_COLUMNS]:
+            raise Exception("Catalog package columns do not match this version of the app.")
+        return doc
+
+    @staticmethod
+    def diff(cursor, products):
+        """(new rows, changed rows as (product_id, row), price changes as (product_id, old, new))."""
+        cursor.execute(f"SELECT qr_code, id, {', '.join(CATALOG_COLUMNS)} FROM products")
+        local = {row[0]: (row[1], row[2:]) for row in cursor.fetchall()}
+        new, changed, prices = [], [], []
+        for row in products:
+            qr, values = row[0], tuple(row[1:])
+            found = local.get(qr)
+            if found is None:
+                new.append((qr, *values))
+                continue
+            pid, current = found
+            if _same(current, values):
+                continue
+            changed.append((*values, pid))
+            if round(current[_PRICE] or 0, 2) != round(values[_PRICE] or 0, 2):
+                prices.append((pid, current[_PRICE], values[_PRICE]))
+        return new, changed, prices
+
+    @staticmethod
+    def apply_package(path, key=None, force=False, dry_run=False):
+        """
+        Applies only what differs from the local products table, in one transaction, and records
+        every price change in price_history. Older or already-applied versions are refused
+        unless force. Returns {'version', 'new', 'changed', 'prices', 'unchanged'}.
+        """
+        doc = CatalogService.read_package(path, key)
+        version = doc['version']
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT value FROM sync_state WHERE key = 'catalog_version'")
+            row = cursor.fetchone()
+            current = int(row[0]) if row else 0
+            if version <= current and not force:
+                raise Exception(f"Catalog v{version} is not newer than the applied v{current}.")
+
+            new, changed, prices = CatalogService.diff(cursor, doc['products'])
+            result = {'version': version, 'new': len(new), 'changed': len(changed), 'prices': len(prices),
+                      'unchanged': len(doc['products']) - len(new) - len(changed)}
+            if dry_run:
+                conn.rollback()
+                return result
+
+            cursor.executemany(f"""
+                INSERT INTO products (qr_code, {', '.join(CATALOG_COLUMNS)})
+                VALUES (?, {', '.join('?' * len(CATALOG_COLUMNS))})
+            """, new)
+            cursor.execute("""
+                INSERT INTO stock (product_id, quantity_available)
+                SELECT p.id, 0 FROM products p WHERE NOT EXISTS (SELECT 1 FROM stock s WHERE s.product_id = p.id)
+            """)
+            cursor.executemany(f"""
+                UPDATE products SET {', '.join(f'{c} = ?' for c in CATALOG_COLUMNS)}, last_updated = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, changed)
+            cursor.executemany("""
+                INSERT INTO price_history (product_id, old_price, new_price, reason) VALUES (?, ?, ?, ?)
+            """, ((pid, old, new_price, f"Catalog v{version}") for pid, old, new_price in prices))
+            cursor.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('catalog_version', ?)", (str(version),))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        logging.info(f"Catalog v{version} applied: {result}")
+        if new or changed:
+            bus.publish('product.changed', product_ids=[])
+        return result
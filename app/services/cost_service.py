@@ -0,0 +1,118 @@
+import logging
+from app.services.archive_service import ArchiveService
+
+GROUPS = {
+    'product': "Product",
+    'brand': "Brand",
+    'month': "Month",
+}
+
+# Sold lines, then credited lines as negatives; revenue is the taxable value (GST is not ours to keep).
+# A return puts its cost back on the shelf; a defective unit taken back for replacement does not.
+_MARGIN_LINES = """
+    SELECT ii.product_id, p.display_name, COALESCE(p.brand_name, ''),
+           strftime('%Y-%m', i.date), ii.quantity, COALESCE(ii.taxable_value, ii.total_price), ii.unit_cost
+    FROM all_invoices i
+    JOIN all_invoice_items ii ON ii.invoice_no = i.invoice_no
+    LEFT JOIN products p ON p.id = ii.product_id
+    WHERE i.date >= ? AND i.date < DATE(?, '+1 day')
+    UNION ALL
+    SELECT ii.product_id, p.display_name, COALESCE(p.brand_name, ''),
+           strftime('%Y-%m', cn.date), -cni.quantity,
+           -COALESCE(ii.taxable_value * cni.quantity / ii.quantity, cni.total_price),
+           CASE WHEN ii.unit_cost IS NULL THEN NULL WHEN cn.kind = 'return' THEN ii.unit_cost ELSE 0 END
+    FROM credit_notes cn
+    JOIN credit_note_items cni ON cni.credit_note_no = cn.credit_note_no
+    JOIN all_invoice_items ii ON ii.id = cni.invoice_item_id
+    LEFT JOIN products p ON p.id = ii.product_id
+    WHERE cn.date >= ? AND cn.date < DATE(?, '+1 day')
+"""
+
+class CostService:
+    """
+    Weighted-average purchase cost per product, snapshotted onto each invoice line at sale
+    time so margins stay right after later purchases change the average.
+    """
+
+    @staticmethod
+    def receive(cursor, product_id, qty, unit_cost):
+        """
+        Folds a receipt into the product's average cost. Runs inside the receiving transaction,
+        before the stock increment. A product with no known cost takes the new cost outright.
+        """
+        if not unit_cost or unit_cost <= 0 or qty <= 0:
+            return
+        cursor.execute("""
+            SELECT COALESCE(p.current_purchase_price, 0), MAX(COALESCE(s.quantity_available, 0), 0)
+            FROM products p LEFT JOIN stock s ON s.product_id = p.id
+            WHERE p.id = ?
+        """, (product_id,))
+        row = cursor.fetchone()
+        if not row:
+            return
+        old_cost, on_hand = row
+        if old_cost <= 0:
+            on_hand = 0
+        average = (on_hand * old_cost + qty * unit_cost) / (on_hand + qty)
+        cursor.execute("UPDATE products SET current_purchase_price = ? WHERE id = ?",
+                       (round(average, 2), product_id))
+
+    @staticmethod
+    def snapshot(cursor, invoice_no):
+        """Runs inside the create_invoice transaction: stamps today's average cost on each line."""
+        cursor.execute("""
+            UPDATE invoice_items SET unit_cost = (
+                SELECT NULLIF(current_purchase_price, 0) FROM products WHERE id = invoice_items.product_id
+            )
+            WHERE invoice_no = ?
+        """, (invoice_no,))
+
+    @staticmethod
+    def restock(cursor, invoice_item_id, qty):
+        """A returned unit goes back on the shelf at what it cost when sold."""
+        cursor.execute("SELECT product_id, unit_cost FROM all_invoice_items WHERE id = ?", (invoice_item_id,))
+        row = cursor.fetchone()
+        if row and row[1]:
+            CostService.receive(cursor, row[0], qty, row[1])
+
+    @staticmethod
+    def margins(date_from, date_to):
+        """
+        {'product' | 'brand' | 'month': [(name, units, revenue, cost, profit, margin %, uncosted units)]}
+        for sales in [date_from, date_to], net of returns, best profit first. All three groupings
+        come from a single pass over the lines. Lines sold before costs were tracked count as
+        uncosted and are left out of revenue and cost alike.
+        """
+        conn = ArchiveService.reporting_connection(date_from, date_to)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(_MARGIN_LINES, (date_from, date_to, date_from, date_to))
+            totals = {group: {} for group in GROUPS}
+            for pid, name, brand, month, qty, revenue, unit_cost in cursor:
+                for group, key in (('product', name or f"#{pid}"), ('brand', brand or "(none)"), ('month', month)):
+                    acc = totals[group].setdefault(key, [0, 0.0, 0.0, 0])
+                    if unit_cost is None:
+                        acc[3] += qty
+                        continue
+                    acc[0] += qty
+                    acc[1] += revenue
+                    acc[2] += qty * unit_cost
+        finally:
+            conn.close()
+
+        report = {}
+        for group, rows in totals.items():
+            out = []
+            for key, (units, revenue, cost, uncosted) in rows.items():
+                if not (units or uncosted or revenue):
+                    continue # Sold and fully returned within the period
+                profit = revenue - cost
+                margin = 100.0 * profit / revenue if revenue else 0.0
+                out.append((key, units, round(revenue, 2), round(cost, 2), round(profit, 2), round(margin, 1), uncosted))
+            if group == 'month':
+                out.sort(key=lambda r: r[0])
+            else:
+                out.sort(key=lambda r: r[4], reverse=True)
+            report[group] = out
+        logging.info(f"Margin report {date_from}..{date_to}: {len(report['product'])} products")
+        return report
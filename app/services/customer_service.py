@@ -0,0 +1,119 @@
+import logging
+from app.database import db
+
+_PURCHASE_COLUMNS = """
+    customer_id, invoice_no, invoice_item_id, product_id, product_name,
+    quantity, total_price, sale_date, warranty_expiry
+"""
+
+class CustomerService:
+    """Per-customer rollup and purchase history, kept current at checkout so lookups never scan invoices."""
+
+    @staticmethod
+    def record_sale(cursor, customer_id, invoice_no, sale_date, final_amount):
+        """Runs inside the create_invoice transaction, after the invoice items are inserted."""
+        cursor.execute("""
+            INSERT INTO customer_stats (customer_id, invoice_count, lifetime_spend, first_purchase, last_purchase)
+            VALUES (?, 1, ?, ?, ?)
+            ON CONFLICT (customer_id) DO UPDATE SET
+                invoice_count = invoice_count + 1,
+                lifetime_spend = lifetime_spend + excluded.lifetime_spend,
+                last_purchase = MAX(COALESCE(last_purchase, ''), excluded.last_purchase)
+        """, (customer_id, final_amount, sale_date, sale_date))
+        cursor.execute(f"""
+            INSERT INTO customer_purchases ({_PURCHASE_COLUMNS})
+            SELECT ?, ii.invoice_no, ii.id, ii.product_id, p.display_name,
+                   ii.quantity, ii.total_price, ?,
+                   CASE WHEN p.warranty_months > 0 THEN DATE(?, '+' || p.warranty_months || ' months') END
+            FROM invoice_items ii JOIN products p ON p.id = ii.product_id
+            WHERE ii.invoice_no = ?
+        """, (customer_id, sale_date, sale_date, invoice_no))
+
+    @staticmethod
+    def get_summary(customer_id):
+        """(invoice_count, lifetime_spend, first_purchase, last_purchase) or None."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT invoice_count, lifetime_spend, first_purchase, last_purchase
+            FROM customer_stats WHERE customer_id = ?
+        """, (customer_id,))
+        return cursor.fetchone()
+
+    @staticmethod
+    def get_recent_purchases(customer_id, limit=50):
+        """Newest first: (product_name, invoice_no, sale_date, quantity, total_price, warranty_expiry)."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT product_name, invoice_no, sale_date, quantity, total_price, warranty_expiry
+            FROM customer_purchases WHERE customer_id = ?
+            ORDER BY sale_date DESC LIMIT ?
+        """, (customer_id, limit))
+        return cursor.fetchall()
+
+    @staticmethod
+    def needs_rebuild():
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM invoices) AND NOT EXISTS (SELECT 1 FROM customer_stats)")
+        return bool(cursor.fetchone()[0])
+
+    @staticmethod
+    def _stage(cursor):
+        """One ArchiveService batch: per-customer totals and purchase rows into TEMP staging tables."""
+        cursor.execute("""
+            INSERT INTO temp.stage_stats (customer_id, invoice_count, lifetime_spend, first_purchase, last_purchase)
+            SELECT customer_id, COUNT(*), SUM(final_amount), MIN(date), MAX(date)
+            FROM all_invoices WHERE customer_id IS NOT NULL
+            GROUP BY customer_id
+        """)
+        cursor.execute(f"""
+            INSERT INTO temp.stage_purchases ({_PURCHASE_COLUMNS})
+            SELECT i.customer_id, ii.invoice_no, ii.id, ii.product_id, p.display_name,
+                   ii.quantity, ii.total_price, i.date,
+                   CASE WHEN p.warranty_months > 0 THEN DATE(i.date, '+' || p.warranty_months || ' months') END
+            FROM all_invoice_items ii
+            JOIN all_invoices i ON i.invoice_no = ii.invoice_no
+            LEFT JOIN products p ON p.id = ii.product_id
+            WHERE i.customer_id IS NOT NULL
+        """)
+
+    @staticmethod
+    def rebuild_history():
+        """
+        Recomputes both tables from every invoice, archived years included. One-off backfill:
+        archives are read in batches (see ArchiveService.for_each_batch), then both tables are
+        replaced in one transaction, net of credit notes as return_service keeps them.
+        """
+        from app.services.archive_service import ArchiveService
+
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("CREATE TEMP TABLE stage_stats AS SELECT * FROM customer_stats WHERE 0")
+            cursor.execute("CREATE TEMP TABLE stage_purchases AS SELECT * FROM customer_purchases WHERE 0")
+            ArchiveService.for_each_batch(conn, CustomerService._stage)
+
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM customer_stats")
+            cursor.execute("DELETE FROM customer_purchases")
+            cursor.execute("""
+                INSERT INTO customer_stats (customer_id, invoice_count, lifetime_spend, first_purchase, last_purchase)
+                SELECT s.customer_id, SUM(s.invoice_count), SUM(s.lifetime_spend) - COALESCE(MAX(cn.credited), 0),
+                       MIN(s.first_purchase), MAX(s.last_purchase)
+                FROM temp.stage_stats s
+                LEFT JOIN (SELECT customer_id, SUM(total_amount) AS credited FROM credit_notes GROUP BY customer_id) cn
+                       ON cn.customer_id = s.customer_id
+                GROUP BY s.customer_id
+            """)
+            cursor.execute(f"""
+                INSERT INTO customer_purchases ({_PURCHASE_COLUMNS}, returned_quantity)
+                SELECT {_PURCHASE_COLUMNS},
+                       COALESCE((SELECT SUM(c.quantity) FROM credit_note_items c WHERE c.invoice_item_id = s.invoice_item_id), 0)
+                FROM temp.stage_purchases s
+            """)
+            conn.commit()
+            logging.info("Customer purchase history rebuilt.")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
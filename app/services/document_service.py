@@ -0,0 +1,168 @@
+import os
+import csv
+import io
+import time
+import shutil
+import hashlib
+import logging
+import zipfile
+from app.config import Config
+from app.database import db
+
+# Bump when the PDF layout changes so old documents can be told apart (and re-rendered if needed)
+RENDER_VERSION = 2
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            h.update(block)
+    return h.hexdigest()
+
+class DocumentService:
+    """Index of rendered invoice / credit-note PDFs by number, with monthly zip packing of old days."""
+
+    @staticmethod
+    def archive_dir():
+        return os.path.join(Config.INVOICE_DIR, "archive")
+
+    @staticmethod
+    def register(doc_no, doc_type, path, cursor=None):
+        """Records path, hash and size. Pass the create_invoice cursor to register in the same transaction."""
+        row = (doc_no, doc_type, path, _sha256(path), os.path.getsize(path), RENDER_VERSION,
+               time.strftime("%Y-%m-%d %H:%M:%S"))
+        sql = """
+            INSERT INTO invoice_documents (doc_no, doc_type, path, sha256, size_bytes, render_version, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (doc_no) DO UPDATE SET
+                path = excluded.path, sha256 = excluded.sha256, size_bytes = excluded.size_bytes,
+                render_version = excluded.render_version, created_at = excluded.created_at,
+                archive_path = NULL, archive_member = NULL
+        """
+        if cursor is not None:
+            cursor.execute(sql, row)
+            return
+        conn = db.get_connection()
+        conn.execute(sql, row)
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def render_and_register(doc_no, doc_type, render, *args):
+        """For PDFService.render_async: renders on the background thread, then indexes the file."""
+        path = render(*args)
+        DocumentService.register(doc_no, doc_type, path)
+        return path
+
+    @staticmethod
+    def find(doc_no):
+        """
+        Path to the PDF for an invoice / credit-note number, or None. Packed documents are
+        extracted once into data/doc_cache and verified against the recorded hash.
+        """
+        doc_no = doc_no.strip().upper()
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT path, sha256, archive_path, archive_member FROM invoice_documents WHERE doc_no = ?",
+                       (doc_no,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        path, sha, archive_path, member = row
+        if not archive_path:
+            return path if os.path.exists(path) else None
+
+        cached = os.path.join(Config.DATA_DIR, "doc_cache", f"{doc_no}.pdf")
+        if not os.path.exists(cached):
+            if not os.path.exists(archive_path):
+                return None
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            with zipfile.ZipFile(archive_path) as zf, zf.open(member) as src, open(cached, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        if _sha256(cached) != sha:
+            os.remove(cached)
+            raise Exception(f"Archived PDF for {doc_no} does not match its recorded hash.")
+        return cached
+
+    @staticmethod
+    def pack_older_than(days=90):
+        """
+        Moves loose PDFs older than `days` into invoices/archive/YYYY-MM.zip. Members are named
+        by content hash, so identical renders are stored once; index.csv inside each zip maps
+        numbers to members. Returns {month: documents packed}.
+        """
+        cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - days * 86400))
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT doc_no, doc_type, path, sha256, created_at FROM invoice_documents
+            WHERE archive_path IS NULL AND created_at < ?
+            ORDER BY created_at
+        """, (cutoff,))
+        by_month = {}
+        for row in cursor.fetchall():
+            by_month.setdefault(row[4][:7], []).append(row)
+
+        packed = {}
+        for month, docs in by_month.items():
+            docs = [d for d in docs if os.path.exists(d[2])]
+            if docs:
+                packed[month] = DocumentService._pack_month(month, docs)
+        return packed
+
+    @staticmethod
+    def _pack_month(month, docs):
+        os.makedirs(DocumentService.archive_dir(), exist_ok=True)
+        archive_path = os.path.join(DocumentService.archive_dir(), f"{month}.zip")
+        tmp_path = archive_path + ".tmp"
+
+        # Build the new zip beside the old one and swap it in only when complete
+        index_rows = []
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+            names = set()
+            if os.path.exists(archive_path):
+                with zipfile.ZipFile(archive_path) as old:
+                    for info in old.infolist():
+                        if info.filename == "index.csv":
+                            index_rows = list(csv.reader(io.StringIO(old.read(info).decode())))[1:]
+                        else:
+                            zf.writestr(info, old.read(info))
+                            names.add(info.filename)
+            for doc_no, doc_type, path, sha, created_at in docs:
+                member = f"{sha}.pdf"
+                if member not in names:
+                    zf.write(path, member)
+                    names.add(member)
+                index_rows.append([doc_no, doc_type, member, created_at])
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(["doc_no", "doc_type", "member", "created_at"])
+            writer.writerows(index_rows)
+            zf.writestr("index.csv", out.getvalue())
+        os.replace(tmp_path, archive_path)
+
+        conn = db.get_connection()
+        conn.executemany("UPDATE invoice_documents SET archive_path = ?, archive_member = ? WHERE doc_no = ?",
+                         [(archive_path, f"{d[3]}.pdf", d[0]) for d in docs])
+        conn.commit()
+        conn.close()
+
+        for _, _, path, _, _ in docs:
+            if not os.path.exists(path):
+                continue
+            os.remove(path)
+            folder = os.path.dirname(path)
+            if not os.listdir(folder):
+                os.rmdir(folder)
+        logging.info(f"Packed {len(docs)} documents into {archive_path}")
+        return len(docs)
+
+    @staticmethod
+    def usage():
+        """(loose_count, loose_bytes, packed_count, packed_bytes on disk)"""
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM invoice_documents WHERE archive_path IS NULL")
+        loose_count, loose_bytes = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM invoice_documents WHERE archive_path IS NOT NULL")
+        packed_count = cursor.fetchone()[0]
+        cursor.execute("SELECT DISTINCT archive_path FROM invoice_documents WHERE archive_path IS NOT NULL")
+        packed_bytes = sum(os.path.getsize(p) for (p,) in cursor.fetchall() if os.path.exists(p))
+        return loose_count, loose_bytes, packed_count, packed_bytes
@@ -0,0 +1,198 @@
+import os
+import csv
+import time
+import logging
+from datetime import date, timedelta
+import numpy as np
+from app.config import Config
+from app.database import db
+from app.services.archive_service import ArchiveService
+
+# Sales history the velocity is computed from, and the rolling window inside it
+HISTORY_DAYS = 84
+WINDOW_DAYS = 7
+# Recent weeks count more: a window's weight halves every HALF_LIFE_DAYS back
+HALF_LIFE_DAYS = 28
+# Safety stock covers demand up to this z-score of lead-time variation (~95% service level)
+SERVICE_Z = 1.65
+# Reorder quantity covers this many days of demand
+COVER_DAYS = 30
+# Lead time is the mean of the last N receipts that recorded one
+LEAD_TIME_SAMPLES = 5
+# Longer id lists scan every product instead (keeps IN (...) under SQLite's host-parameter limit)
+_CHUNK = 500
+
+def _in_clause(column, ids):
+    if len(ids) > _CHUNK:
+        return "", []
+    return f"AND {column} IN ({','.join('?' * len(ids))})", [int(i) for i in ids]
+
+class ForecastService:
+    """Per-product reorder points from recent sales velocity and supplier lead time."""
+
+    @staticmethod
+    def mark_sold(cursor, product_ids):
+        """Runs inside the create_invoice transaction: flags the products for recomputation."""
+        cursor.executemany("""
+            INSERT INTO reorder_levels (product_id, stale) VALUES (?, 1)
+            ON CONFLICT (product_id) DO UPDATE SET stale = 1
+        """, [(pid,) for pid in set(product_ids)])
+
+    @staticmethod
+    def reorder_point(product_id):
+        """The product's forecast reorder point; 0 until one has been computed, as DASHBOARD_LOW_STOCK reads it."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT COALESCE(MAX(reorder_point), 0) FROM reorder_levels WHERE product_id = ?", (product_id,))
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def needs_rebuild():
+        """Levels missing for an active product, or last computed before today (velocity decays daily)."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT EXISTS (SELECT 1 FROM products p LEFT JOIN reorder_levels r ON r.product_id = p.id
+                           WHERE p.is_active = 1 AND r.product_id IS NULL)
+                OR COALESCE((SELECT MIN(updated_at) FROM reorder_levels), '') < DATE('now', 'localtime')
+        """)
+        return bool(cursor.fetchone()[0])
+
+    @staticmethod
+    def _demand(conn, product_ids, today):
+        """Units sold per day over HISTORY_DAYS for sorted product_ids: (ids array, matrix [products x days])."""
+        start = (today - timedelta(days=HISTORY_DAYS - 1)).isoformat()
+        where, params = _in_clause("ii.product_id", product_ids)
+        rows = conn.execute(f"""
+            SELECT ii.product_id, CAST(julianday(DATE(i.date)) - julianday(?) AS INTEGER), SUM(ii.quantity)
+            FROM all_invoices i JOIN all_invoice_items ii ON ii.invoice_no = i.invoice_no
+            WHERE i.date >= ? AND i.date < ? {where}
+            GROUP BY ii.product_id, DATE(i.date)
+        """, [start, start, (today + timedelta(days=1)).isoformat()] + params).fetchall()
+
+        ids = np.array(product_ids, dtype=np.int64)
+        matrix = np.zeros((len(ids), HISTORY_DAYS))
+        if rows:
+            data = np.array(rows, dtype=np.float64)
+            keep = np.isin(data[:, 0].astype(np.int64), ids)
+            data = data[keep]
+            np.add.at(matrix, (np.searchsorted(ids, data[:, 0].astype(np.int64)), data[:, 1].astype(np.int64)), data[:, 2])
+        return ids, matrix
+
+    @staticmethod
+    def velocity(matrix):
+        """
+        Vectorized over all products: rolling WINDOW_DAYS sums via a cumulative sum, then a
+        recency-weighted mean (units/day) and the day-level standard deviation implied by the windows.
+        """
+        if matrix.shape[0] == 0:
+            return np.zeros(0), np.zeros(0)
+        cum = np.cumsum(np.pad(matrix, ((0, 0), (1, 0))), axis=1)
+        windows = cum[:, WINDOW_DAYS:] - cum[:, :-WINDOW_DAYS]          # [products x (days - window + 1)]
+        age = np.arange(windows.shape[1])[::-1]
+        weights = 0.5 ** (age / HALF_LIFE_DAYS)
+        mean = windows @ weights / weights.sum()
+        var = ((windows - mean[:, None]) ** 2) @ weights / weights.sum()
+        return mean / WINDOW_DAYS, np.sqrt(var / WINDOW_DAYS)
+
+    @staticmethod
+    def _lead_times(cursor, product_ids):
+        where, params = _in_clause("product_id", product_ids)
+        cursor.execute(f"""
+            SELECT product_id, AVG(lead_time_days) FROM (
+                SELECT product_id, lead_time_days,
+                       ROW_NUMBER() OVER (PARTITION BY product_id ORDER BY date DESC) AS n
+                FROM purchases WHERE lead_time_days IS NOT NULL {where}
+            ) WHERE n <= ? GROUP BY product_id
+        """, params + [LEAD_TIME_SAMPLES])
+        found = dict(cursor.fetchall())
+        return np.array([found.get(int(pid), Config.DEFAULT_LEAD_TIME_DAYS) for pid in product_ids], dtype=np.float64)
+
+    @staticmethod
+    def refresh(product_ids=None, today=None):
+        """
+        Recomputes reorder levels for the given products (default: every active product) in one
+        vectorized pass. Returns the number of products updated.
+        """
+        today = today or date.today()
+        conn = ArchiveService.reporting_connection((today - timedelta(days=HISTORY_DAYS)).isoformat(), today.isoformat())
+        cursor = conn.cursor()
+        try:
+            if product_ids is None:
+                cursor.execute("SELECT id FROM products WHERE is_active = 1")
+                product_ids = [r[0] for r in cursor.fetchall()]
+            if not product_ids:
+                return 0
+            t0 = time.perf_counter()
+            ids, matrix = ForecastService._demand(conn, sorted(set(product_ids)), today)
+            rate, sigma = ForecastService.velocity(matrix)
+            lead = ForecastService._lead_times(cursor, ids)
+
+            safety = SERVICE_Z * sigma * np.sqrt(lead)
+            reorder_point = np.maximum(np.ceil(rate * lead + safety), Config.MIN_STOCK).astype(np.int64)
+            reorder_qty = np.maximum(np.ceil(rate * COVER_DAYS), 1).astype(np.int64)
+
+            now = time.strftime("%Y-%m-%d %H:%M:%S")
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany("""
+                INSERT INTO reorder_levels (product_id, daily_velocity, velocity_std, lead_time_days,
+                                            reorder_point, reorder_qty, stale, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+                ON CONFLICT (product_id) DO UPDATE SET
+                    daily_velocity = excluded.daily_velocity, velocity_std = excluded.velocity_std,
+                    lead_time_days = excluded.lead_time_days, reorder_point = excluded.reorder_point,
+                    reorder_qty = excluded.reorder_qty, stale = 0, updated_at = excluded.updated_at
+            """, zip(ids.tolist(), np.round(rate, 4).tolist(), np.round(sigma, 4).tolist(), lead.tolist(),
+                     reorder_point.tolist(), reorder_qty.tolist(), [now] * len(ids)))
+            conn.commit()
+            logging.info(f"Reorder levels refreshed for {len(ids)} products in {time.perf_counter() - t0:.2f}s")
+            return len(ids)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def refresh_stale():
+        """Recomputes only the products sold since their last refresh; cheap enough for every screen load."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT product_id FROM reorder_levels WHERE stale = 1")
+        ids = [r[0] for r in cursor.fetchall()]
+        return ForecastService.refresh(ids) if ids else 0
+
+    @staticmethod
+    def suggested_order():
+        """
+        Products at or below their reorder point, with the quantity that brings them back to
+        reorder point + reorder quantity. Rows: (distributor, product_id, product, qr_code,
+        available, reorder_point, daily_velocity, suggested_qty, last_purchase_price).
+        """
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT COALESCE(lp.distributor_name, ''), p.id, p.display_name, p.qr_code,
+                   s.quantity_available, r.reorder_point, r.daily_velocity,
+                   r.reorder_point + r.reorder_qty - s.quantity_available,
+                   COALESCE(lp.purchase_price, p.current_purchase_price, 0)
+            FROM products p
+            JOIN stock s ON s.product_id = p.id
+            JOIN reorder_levels r ON r.product_id = p.id
+            LEFT JOIN purchases lp ON lp.id = (SELECT MAX(id) FROM purchases WHERE product_id = p.id)
+            WHERE p.is_active = 1 AND s.quantity_available <= r.reorder_point
+            ORDER BY 1, r.daily_velocity DESC
+        """)
+        return cursor.fetchall()
+
+    @staticmethod
+    def export_purchase_order(file_path=None):
+        """Writes the suggested purchase order as CSV, grouped by last distributor. Returns (path, line count)."""
+        ForecastService.refresh_stale()
+        rows = ForecastService.suggested_order()
+        file_path = file_path or os.path.join(Config.INVOICE_DIR, "purchase_orders", f"PO_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["distributor", "product_id", "product", "qr_code", "available", "reorder_point",
+                             "units_per_day", "order_qty", "unit_cost", "line_cost"])
+            for distributor, pid, name, qr, available, rop, rate, qty, cost in rows:
+                writer.writerow([distributor, pid, name, qr, available, rop, f"{rate:.2f}", qty, cost,
+                                 round(qty * (cost or 0), 2)])
+        return file_path, len(rows)
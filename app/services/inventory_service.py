@@ -0,0 +1,134 @@
+import time
+import logging
+from app.database import db
+from app.events import bus
+from app.services.cost_service import CostService
+
+# Unit states a unit can be sold from
+SELLABLE = ('received', 'returned')
+# Keeps IN (...) lists under SQLite's default host-parameter limit
+_CHUNK = 500
+
+class InventoryService:
+    """Serialized stock: every battery tracked by serial through received, sold, returned and replaced."""
+
+    @staticmethod
+    def receive_units(product_id, serials, distributor_name="", purchase_price=0.0, lead_time_days=None):
+        """
+        Bulk-receives scanned serials in one transaction: a purchases row, one stock_units
+        row per serial and the matching stock increment. Rejects the whole batch on any duplicate.
+        lead_time_days: days from order to delivery, used for the product's reorder point.
+        purchase_price: pre-GST unit cost, folded into the product's weighted-average cost.
+        """
+        serials = list(dict.fromkeys(s.strip() for s in serials if s and s.strip()))
+        if not serials:
+            raise Exception("No serial numbers scanned.")
+
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            existing = []
+            for i in range(0, len(serials), _CHUNK):
+                chunk = serials[i:i + _CHUNK]
+                cursor.execute(f"SELECT serial_no FROM stock_units WHERE serial_no IN ({','.join('?' * len(chunk))})", chunk)
+                existing.extend(row[0] for row in cursor.fetchall())
+            if existing:
+                shown = ", ".join(existing[:5]) + (" ..." if len(existing) > 5 else "")
+                raise Exception(f"{len(existing)} serial(s) already registered: {shown}")
+
+            now = time.strftime("%Y-%m-%d %H:%M:%S")
+            cursor.execute("""
+                INSERT INTO purchases (date, distributor_name, product_id, quantity, purchase_price, lead_time_days)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (now, distributor_name, product_id, len(serials), purchase_price, lead_time_days))
+            purchase_id = cursor.lastrowid
+            CostService.receive(cursor, product_id, len(serials), purchase_price)
+            cursor.executemany("""
+                INSERT INTO stock_units (product_id, serial_no, status, purchase_id, received_at, updated_at)
+                VALUES (?, ?, 'received', ?, ?, ?)
+            """, ((product_id, s, purchase_id, now, now) for s in serials))
+            cursor.execute("""
+                INSERT INTO stock (product_id, quantity_available) VALUES (?, ?)
+                ON CONFLICT (product_id) DO UPDATE SET
+                    quantity_available = quantity_available + excluded.quantity_available,
+                    last_updated = CURRENT_TIMESTAMP
+            """, (product_id, len(serials)))
+            conn.commit()
+            bus.publish('stock.changed', product_ids=[product_id])
+            logging.info(f"Received {len(serials)} units of product {product_id} (purchase {purchase_id})")
+            return len(serials)
+        except Exception:
+            conn.rollback()
+            raise
+
+    @staticmethod
+    def serials_required(cursor, product_id, qty):
+        """
+        How many of `qty` units must be scanned: one per unit still tracked in stock_units.
+        Stock counted before serial tracking began (or restocked untracked) has no serial, so
+        units beyond the tracked ones are sold untracked.
+        """
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM stock_units WHERE product_id = ? AND status IN ({','.join('?' * len(SELLABLE))})
+        """, (product_id, *SELLABLE))
+        return min(qty, cursor.fetchone()[0])
+
+    @staticmethod
+    def allocate_units(cursor, invoice_no, cart_items):
+        """
+        Runs inside the create_invoice transaction. A product needs a scanned serial for every
+        unit serials_required counts across its cart lines (a line never more than its qty);
+        each scanned unit is moved from a sellable state to 'sold' against this invoice.
+        """
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        products = {}
+        for item in cart_items:
+            serials = item.get('serials') or []
+            if len(serials) > item['qty']:
+                raise Exception(f"{len(serials)} serials scanned for {item['qty']} unit(s) of {item['product_name']}.")
+            qty, scanned = products.get(item['product_id'], (0, 0))
+            products[item['product_id']] = (qty + item['qty'], scanned + len(serials))
+        for item in cart_items:
+            if item['product_id'] not in products:
+                continue  # already checked with an earlier line of the same product
+            qty, scanned = products.pop(item['product_id'])
+            required = InventoryService.serials_required(cursor, item['product_id'], qty)
+            if scanned < required:
+                raise Exception(f"Scan {required} serial number(s) for {item['product_name']} ({scanned} scanned).")
+
+        for item in cart_items:
+            for serial in item.get('serials') or []:
+                cursor.execute(f"""
+                    UPDATE stock_units SET status = 'sold', invoice_no = ?, updated_at = ?
+                    WHERE serial_no = ? AND product_id = ? AND status IN ({','.join('?' * len(SELLABLE))})
+                """, (invoice_no, now, serial, item['product_id'], *SELLABLE))
+                if cursor.rowcount != 1:
+                    raise Exception(f"Serial {serial} is not in stock for {item['product_name']}.")
+
+    @staticmethod
+    def set_status(cursor, serial_no, status, invoice_no=None):
+        """Moves a unit to returned / replaced (used by credit notes)."""
+        cursor.execute("""
+            UPDATE stock_units SET status = ?, invoice_no = COALESCE(?, invoice_no), updated_at = ?
+            WHERE serial_no = ?
+        """, (status, invoice_no, time.strftime("%Y-%m-%d %H:%M:%S"), serial_no))
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def get_unit(serial_no):
+        """(serial_no, product_id, status, invoice_no, received_at, product name) or None."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT u.serial_no, u.product_id, u.status, u.invoice_no, u.received_at, p.display_name
+            FROM stock_units u LEFT JOIN products p ON p.id = u.product_id
+            WHERE u.serial_no = ?
+        """, (serial_no,))
+        return cursor.fetchone()
+
+    @staticmethod
+    def count_units(product_id):
+        """{status: count} for one product, straight from the composite index."""
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM stock_units WHERE product_id = ? GROUP BY status", (product_id,))
+        return dict(cursor.fetchall())
@@ -1,16 +1,40 @@
 import random
 import time
 import os
+import logging
+from app.config import Config
 from app.database import db
-from app.models import Invoice, InvoiceItem
+from app.events import bus
+from app.instrumentation import profiler
+from app.services.reservation_service import ReservationService
+from app.services.customer_service import CustomerService
+from app.services.warranty_service import WarrantyService
+from app.services.inventory_service import InventoryService
+from app.services.stats_service import StatsService
+from app.services.scrap_service import ScrapService
+from app.services.receipt_service import ReceiptService
+from app.services.share_service import ShareService
+from app.services.tax_service import TaxService
+from app.services.forecast_service import ForecastService
+from app.services.cost_service import CostService
+from app.services.cart_service import CartService
+from app.services.journal_service import JournalService
+from app.money import to_paise, from_paise, line_total, format_amount
 
 class InvoiceService:
     @staticmethod
-    def generate_invoice_number():
+    def generate_invoice_number(cursor=None):
         # Format: INV-YYYYMMDD-XXXX
         date_str = time.strftime("%Y%m%d")
-        rand_str = str(random.randint(1000, 9999))
-        return f"INV-{date_str}-{rand_str}"
+        while True:
+            rand_str = str(random.randint(1000, 9999))
+            invoice_no = f"INV-{date_str}-{rand_str}"
+            if cursor is None:
+                return invoice_no
+            # Re-roll on collision so busy days don't hit the primary key
+            cursor.execute("SELECT 1 FROM invoices WHERE invoice_no = ?", (invoice_no,))
+            if not cursor.fetchone():
+                return invoice_no
 
     @staticmethod
     def get_or_create_customer(full_name, mobile, address):
@@ -23,71 +47,113 @@ class InvoiceService:
         if res:
             return res[0]
         else:
-            cursor.execute("INSERT INTO customers (full_name, mobile_number, address) VALUES (?, ?, ?)", 
+            # OR IGNORE: another terminal may register the same mobile at the same moment
+            cursor.execute("INSERT OR IGNORE INTO customers (full_name, mobile_number, address) VALUES (?, ?, ?)", 
                            (full_name, mobile, address))
             conn.commit()
-            return cursor.lastrowid
+            if cursor.rowcount == 1:
+                return cursor.lastrowid
+            cursor.execute("SELECT id FROM customers WHERE mobile_number = ?", (mobile,))
+            return cursor.fetchone()[0]
 
-    def create_invoice(self, customer_data, cart_items, old_battery_data):
+    def create_invoice(self, customer_data, cart_items, old_battery_data, render_pdf=True, cart_id=None, share=False):
         """
-        customer_data: dict(name, mobile, address)
-        cart_items: list of dict(product_id, qty, selling_price, product_name)
-        old_battery_data: dict(amount, description)
+        customer_data: dict(name, mobile, address, state_code optional: GST place of supply, default the shop's state)
+        cart_items: list of dict(product_id, qty, selling_price, product_name, serials=[...] optional)
+        old_battery_data: dict(amount, description, scrap=[dict(battery_type, grade, weight_kg, value)] optional)
+        render_pdf: False skips the PDF step (returned path is None)
+        cart_id: reservation cart whose holds are converted by this sale
+        share: queue the WhatsApp invoice message; the background worker sends it after commit
         """
         conn = db.get_connection()
         try:
-            cart_total = sum(item['qty'] * item['selling_price'] for item in cart_items)
-            old_battery_amount = old_battery_data.get('amount', 0.0)
-            old_battery_desc = old_battery_data.get('description', '')
-            final_amount = cart_total - old_battery_amount
+            # Totals in integer paise; floats only at the REAL columns
+            line_paise = [line_total(item['qty'], item['selling_price']) for item in cart_items]
+            cart_paise = sum(line_paise)
+            old_paise = to_paise(old_battery_data.get('amount') or 0)
+            cart_total = from_paise(cart_paise)
+            old_battery_amount = from_paise(old_paise)
+            old_battery_desc = old_battery_data.get('description', '') or ScrapService.describe(old_battery_data.get('scrap') or [])
+            final_amount = from_paise(cart_paise - old_paise)
             
             # rule: final amount >= 0
             if final_amount < 0:
                 raise Exception("Final amount cannot be negative. Deduction exceeds total.")
 
-            customer_id = self.get_or_create_customer(
-                customer_data['name'], 
-                customer_data['mobile'], 
-                customer_data['address']
-            )
+            with profiler.phase("invoice.customer"):
+                customer_id = self.get_or_create_customer(
+                    customer_data['name'], 
+                    customer_data['mobile'], 
+                    customer_data['address']
+                )
             
-            invoice_no = self.generate_invoice_number()
-            date_now = time.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Start Transaction
+            # Start Transaction (write lock taken now so other terminals queue instead of interleaving)
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            with profiler.phase("invoice.number"):
+                invoice_no = self.generate_invoice_number(cursor)
+            date_now = time.strftime("%Y-%m-%d %H:%M:%S")
             
-            # 1. Insert Invoice Header
-            cursor.execute("""
-                INSERT INTO invoices (invoice_no, customer_id, total_amount, old_battery_value, old_battery_description, final_amount, date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (invoice_no, customer_id, cart_total, old_battery_amount, old_battery_desc, final_amount, date_now))
+            # 1. Check & Deduct Stock
+            with profiler.phase("invoice.stock"):
+                for item in cart_items:
+                    if not ReservationService.deduct(cursor, cart_id, item['product_id'], item['qty']):
+                        raise Exception(f"Insufficient Stock for Product ID: {item['product_id']}")
+                ReservationService.convert_cart(cursor, cart_id)
+                CartService.close(cursor, cart_id)
+                InventoryService.allocate_units(cursor, invoice_no, cart_items)
 
-            # 2. Process Items
-            for item in cart_items:
-                pid = item['product_id']
-                qty = item['qty']
-                price = item['selling_price']
-                total_line_price = qty * price
-                
-                # Check Stock
-                cursor.execute("SELECT quantity_available FROM stock WHERE product_id = ?", (pid,))
-                stock_res = cursor.fetchone()
-                if not stock_res or stock_res[0] < qty:
-                    raise Exception(f"Insufficient Stock for Product ID: {pid}")
-                
-                # Deduct Stock
-                cursor.execute("UPDATE stock SET quantity_available = quantity_available - ? WHERE product_id = ?", (qty, pid))
-                
-                # Insert Invoice Item
+            # 2. Insert Invoice Header & Items (GST is inside the line totals; the breakup is stored per line)
+            with profiler.phase("invoice.items"):
+                place_of_supply = customer_data.get('state_code') or Config.GST_STATE_CODE
+                tax_lines, tax_totals = TaxService.compute(cursor, cart_items, line_paise, place_of_supply)
                 cursor.execute("""
-                    INSERT INTO invoice_items (invoice_no, product_id, quantity, unit_price, total_price)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (invoice_no, pid, qty, price, total_line_price))
+                    INSERT INTO invoices (invoice_no, customer_id, total_amount, old_battery_value, old_battery_description, final_amount, date,
+                                          place_of_supply, taxable_amount, tax_amount)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (invoice_no, customer_id, cart_total, old_battery_amount, old_battery_desc, final_amount, date_now,
+                      place_of_supply, from_paise(tax_totals['taxable']), from_paise(tax_totals['tax'])))
+                cursor.executemany("""
+                    INSERT INTO invoice_items (invoice_no, product_id, quantity, unit_price, total_price,
+                                               hsn_code, gst_rate, taxable_value, cgst, sgst, igst)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(invoice_no, item['product_id'], item['qty'], item['selling_price'], from_paise(paise),
+                       tax['hsn_code'], tax['gst_rate'], from_paise(tax['taxable']),
+                       from_paise(tax['cgst']), from_paise(tax['sgst']), from_paise(tax['igst']))
+                      for item, paise, tax in zip(cart_items, line_paise, tax_lines)])
+
+            # 3. Maintain Rollups
+            with profiler.phase("invoice.rollups"):
+                CustomerService.record_sale(cursor, customer_id, invoice_no, date_now, final_amount)
+                StatsService.record_sale(cursor, invoice_no, date_now, final_amount, cart_total, old_battery_amount)
+                CostService.snapshot(cursor, invoice_no)
+                ForecastService.mark_sold(cursor, [item['product_id'] for item in cart_items])
+                WarrantyService.register_sale(cursor, customer_id, invoice_no, date_now, cart_items)
+                ScrapService.record_exchange(cursor, invoice_no, date_now, old_battery_data.get('scrap'))
+                if share:
+                    # Sharing never blocks checkout: a message that cannot be queued is logged, the sale stands
+                    try:
+                        ShareService.enqueue('invoice', customer_data['mobile'], {
+                            'customer_name': customer_data['name'], 'invoice_no': invoice_no,
+                            'final_amount': final_amount, 'amount': format_amount(final_amount), 'date': date_now[:10],
+                        }, invoice_no=invoice_no, cursor=cursor)
+                    except Exception as e:
+                        logging.error(f"Could not queue the WhatsApp message for {invoice_no}: {e}")
             
-            # 3. Generate PDF 
-            from app.services.pdf_service import PDFService
-            from app.config import Config
+            # Name as stored: a returning customer's mobile keeps the name it was registered with
+            cursor.execute("SELECT full_name FROM customers WHERE id = ?", (customer_id,))
+            event = {'invoice_no': invoice_no, 'date': date_now, 'customer_name': cursor.fetchone()[0],
+                     'final_amount': final_amount, 'product_ids': [item['product_id'] for item in cart_items]}
+            if not render_pdf:
+                with profiler.phase("invoice.commit"):
+                    conn.commit()
+                if share:
+                    ShareService.wake()
+                bus.publish('invoice.created', **event)
+                return invoice_no, None
+
+            # 4. Journal the PDF, commit, then render (a crash after commit is re-rendered at startup)
             import re
 
             def sanitize(text):
@@ -100,7 +166,6 @@ class InvoiceService:
             date_folder_name = time.strftime("%Y-%m-%d")
             
             daily_folder = os.path.join(Config.INVOICE_DIR, date_folder_name)
-            os.makedirs(daily_folder, exist_ok=True)
             
             filename = f"{cust_name_clean}_{prod_name_clean}_{time_stamp}.pdf"
             pdf_path = os.path.join(daily_folder, filename)
@@ -113,12 +178,38 @@ class InvoiceService:
                 'customer_address': customer_data['address'],
                 'total': cart_total,
                 'old_val': old_battery_amount,
-                'final': final_amount
+                'final': final_amount,
+                'taxable': from_paise(tax_totals['taxable']),
+                'tax': from_paise(tax_totals['tax']),
+                'tax_summary': [(rate, *map(from_paise, parts)) for rate, *parts in TaxService.summarize(tax_lines)],
             }
+            pdf_items = [{**item, 'hsn_code': tax['hsn_code'], 'gst_rate': tax['gst_rate']}
+                         for item, tax in zip(cart_items, tax_lines)]
+            old_battery = {'amount': old_battery_amount, 'description': old_battery_desc}
+            JournalService.commit(cursor, invoice_no, inv_data_for_pdf, pdf_items, old_battery, pdf_path)
             
-            PDFService.generate_invoice_pdf(inv_data_for_pdf, cart_items, old_battery_data, pdf_path)
-            
-            conn.commit()
+            with profiler.phase("invoice.commit"):
+                conn.commit()
+            if share:
+                ShareService.wake()
+            bus.publish('invoice.created', **event)
+
+            # The sale stands even if rendering fails; the journal keeps it for the next startup
+            with profiler.phase("invoice.pdf"):
+                try:
+                    JournalService.render(invoice_no, {'invoice': inv_data_for_pdf, 'items': pdf_items,
+                                                       'old_battery': old_battery, 'path': pdf_path})
+                except Exception as e:
+                    logging.error(f"PDF for {invoice_no} not rendered, will retry at next start: {e}")
+                    pdf_path = None
+
+            # 5. Counter receipt (the sale is committed; a printer fault must not undo it)
+            if Config.RECEIPT_PRINTER:
+                with profiler.phase("invoice.receipt"):
+                    try:
+                        ReceiptService.print_receipt(inv_data_for_pdf, pdf_items, old_battery)
+                    except Exception as e:
+                        logging.warning(f"Receipt for {invoice_no} not printed: {e}")
             return invoice_no, pdf_path
 
         except Exception as e:
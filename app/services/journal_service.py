@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import logging
+from app.config import Config
+from app.database import db
+from app.services.document_service import DocumentService
+
+# invoice_journal.status values, in order. Before them a sale is only its draft, the held_carts
+# row (never a journal row); the journal row is written 'committed' in the same transaction as the
+# invoice, so a crash before commit leaves just the draft to resume.
+STATES = ('committed', 'rendered', 'shared')
+# Rendering goes to this sibling file first; the PDF appears under its real name only once complete
+PARTIAL_SUFFIX = ".part"
+# All the PDF reads from a cart line
+ITEM_FIELDS = ('product_name', 'qty', 'selling_price', 'total', 'hsn_code', 'gst_rate')
+
+class JournalService:
+    """
+    Write-ahead journal for invoice PDFs: the sale transaction records what to render, the
+    render happens after commit, and anything this terminal left 'committed' is rendered again
+    in the background at its next startup. Other tills' rows are theirs: rendering one while its
+    own till is still writing it would race on the same partial file.
+    """
+
+    @staticmethod
+    def commit(cursor, invoice_no, invoice_data, items, old_battery, pdf_path):
+        """Runs inside the create_invoice transaction, as its last write."""
+        items = [{field: item.get(field) for field in ITEM_FIELDS} for item in items]
+        payload = json.dumps({'invoice': invoice_data, 'items': items, 'old_battery': old_battery,
+                              'path': pdf_path}, separators=(",", ":"))
+        cursor.execute("""
+            INSERT INTO invoice_journal (invoice_no, status, payload, terminal_id, updated_at) VALUES (?, 'committed', ?, ?, ?)
+        """, (invoice_no, payload, Config.TERMINAL_ID, time.strftime("%Y-%m-%d %H:%M:%S")))
+
+    @staticmethod
+    def status(invoice_no):
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT status FROM invoice_journal WHERE invoice_no = ?", (invoice_no,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def render(invoice_no, doc=None):
+        """
+        Renders the invoice PDF, registers it and moves the journal to 'rendered' (or 'shared' if
+        its message already went out). Safe to repeat: the output is byte-identical each time.
+        doc: the journal payload, when the caller still has it in memory.
+        """
+        from app.services.pdf_service import PDFService
+
+        conn = db.get_connection()
+        try:
+            if doc is None:
+                row = conn.execute("SELECT status, payload FROM invoice_journal WHERE invoice_no = ?",
+                                   (invoice_no,)).fetchone()
+                if not row or row[0] != 'committed':
+                    return None
+                doc = json.loads(row[1])
+
+            path = doc['path']
+            partial = path + PARTIAL_SUFFIX
+            PDFService.generate_invoice_pdf(doc['invoice'], doc['items'], doc['old_battery'], partial)
+            os.replace(partial, path)
+
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            DocumentService.register(invoice_no, 'invoice', path, cursor)
+            cursor.execute("""
+                UPDATE invoice_journal SET
+                    status = CASE WHEN EXISTS (SELECT 1 FROM share_outbox WHERE invoice_no = ? AND status = 'sent')
+                                  THEN 'shared' ELSE 'rendered' END,
+                    payload = NULL, attempts = attempts + 1, last_error = NULL, updated_at = ?
+                WHERE invoice_no = ? AND status = 'committed'
+            """, (invoice_no, time.strftime("%Y-%m-%d %H:%M:%S"), invoice_no))
+            conn.commit()
+            return path
+        except Exception as e:
+            conn.rollback()
+            conn.execute("UPDATE invoice_journal SET attempts = attempts + 1, last_error = ? WHERE invoice_no = ?",
+                         (str(e), invoice_no))
+            conn.commit()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def mark_shared(cursor, invoice_no):
+        """The invoice message was delivered; runs in the outbox worker's transaction."""
+        cursor.execute("UPDATE invoice_journal SET status = 'shared', updated_at = ? WHERE invoice_no = ? AND status = 'rendered'",
+                       (time.strftime("%Y-%m-%d %H:%M:%S"), invoice_no))
+
+    @staticmethod
+    def pending():
+        """
+        This terminal's invoices committed but never rendered, oldest first. Rows journaled before
+        terminals were recorded are claimed by whichever terminal starts first.
+        """
+        conn = db.get_connection()
+        try:
+            conn.execute("UPDATE invoice_journal SET terminal_id = ? WHERE status = 'committed' AND terminal_id IS NULL",
+                         (Config.TERMINAL_ID,))
+            conn.commit()
+            rows = conn.execute("""
+                SELECT invoice_no FROM invoice_journal WHERE status = 'committed' AND terminal_id = ? ORDER BY updated_at
+            """, (Config.TERMINAL_ID,)).fetchall()
+            return [row[0] for row in rows]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def recover():
+        """Startup pass: queues this terminal's unrendered invoices on the background PDF thread. Returns the futures."""
+        from app.services.pdf_service import PDFService
+
+        pending = JournalService.pending()
+        if pending:
+            logging.warning(f"Resuming PDF render for {len(pending)} invoice(s) interrupted by a crash")
+        return [PDFService.render_async(JournalService.render, invoice_no) for invoice_no in pending]
+
+    @staticmethod
+    def counts():
+        """{status: count}"""
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM invoice_journal GROUP BY status")
+        return dict(cursor.fetchall())
@@ -1,28 +1,52 @@
 import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 from app.config import Config
+from app.money import format_amount
+
+# Compressed page streams; invariant output (no timestamp / random ID) so identical documents hash the same
+_DOC_OPTIONS = {'pageCompression': 1, 'invariant': 1}
+
+def _log_failure(future):
+    if future.exception():
+        logging.error(f"Background PDF render failed: {future.exception()}")
 
 class PDFService:
+    _executor = None
+
+    @staticmethod
+    def render_async(render, *args):
+        """Runs a render function on the single background PDF thread and returns its Future."""
+        if PDFService._executor is None:
+            PDFService._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render")
+        future = PDFService._executor.submit(render, *args)
+        future.add_done_callback(_log_failure)
+        return future
+
     @staticmethod
     def generate_invoice_pdf(invoice_data, cart_items, old_battery, file_path):
         """
-        invoice_data: dict(invoice_no, date, customer_name, customer_mobile, customer_address, total, old_val, final)
-        cart_items: list of dict(product_name, qty, price, total)
+        invoice_data: dict(invoice_no, date, customer_name, customer_mobile, customer_address, total, old_val, final,
+                           taxable, tax, tax_summary=[(gst_rate, taxable, cgst, sgst, igst)] optional)
+        cart_items: list of dict(product_name, qty, price, total, hsn_code, gst_rate optional)
         old_battery: dict(amount, description)
         file_path: absolute path to save the PDF
         """
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
-        doc = SimpleDocTemplate(file_path, pagesize=A4)
+        doc = SimpleDocTemplate(file_path, pagesize=A4, **_DOC_OPTIONS)
         elements = []
         styles = getSampleStyleSheet()
         
         # Title
         elements.append(Paragraph(Config.APP_TITLE, styles['Title']))
+        if Config.GSTIN:
+            elements.append(Paragraph(f"GSTIN: {Config.GSTIN} · Tax Invoice", styles['Normal']))
         elements.append(Spacer(1, 12))
         
         # Header Info
@@ -35,22 +59,25 @@ class PDFService:
         elements.append(header_table)
         elements.append(Spacer(1, 20))
         
-        # Items Table
-        data = [['Product', 'Qty', 'Unit Price', 'Total']]
+        # Items Table (prices include GST)
+        data = [['Product', 'HSN', 'GST %', 'Qty', 'Unit Price', 'Total']]
         for item in cart_items:
+            rate = item.get('gst_rate')
             data.append([
                 item['product_name'],
+                item.get('hsn_code') or "",
+                f"{rate:g}" if rate is not None else "",
                 str(item['qty']),
-                f"₹{item['selling_price']:.2f}",
-                f"₹{item['total']:.2f}"
+                format_amount(item['selling_price']),
+                format_amount(item['total'])
             ])
             
-        data.append(["", "", "Subtotal:", f"₹{invoice_data['total']:.2f}"])
+        data.append(["", "", "", "", "Subtotal:", format_amount(invoice_data['total'])])
         if old_battery['amount'] > 0:
-            data.append(["", "", f"Old Battery ({old_battery['description']}):", f"-₹{old_battery['amount']:.2f}"])
-        data.append(["", "", "Grand Total:", f"₹{invoice_data['final']:.2f}"])
+            data.append(["", "", "", "", f"Old Battery ({old_battery['description']}):", format_amount(-old_battery['amount'])])
+        data.append(["", "", "", "", "Grand Total:", format_amount(invoice_data['final'])])
         
-        table = Table(data, colWidths=[250, 50, 80, 80])
+        table = Table(data, colWidths=[170, 50, 40, 40, 80, 80])
         table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -62,6 +89,23 @@ class PDFService:
             ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
         ]))
         elements.append(table)
+
+        # GST breakup by rate (included in the totals above)
+        if invoice_data.get('tax_summary'):
+            elements.append(Spacer(1, 20))
+            tax_data = [['GST %', 'Taxable Value', 'CGST', 'SGST', 'IGST']]
+            for rate, taxable, cgst, sgst, igst in invoice_data['tax_summary']:
+                tax_data.append([f"{rate:g}", format_amount(taxable), format_amount(cgst), format_amount(sgst), format_amount(igst)])
+            tax_data.append(["Total", format_amount(invoice_data['taxable']), "", "Total Tax:", format_amount(invoice_data['tax'])])
+            tax_table = Table(tax_data, colWidths=[60, 100, 80, 80, 80])
+            tax_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ]))
+            elements.append(tax_table)
         
         # Footer
         elements.append(Spacer(1, 50))
@@ -69,3 +113,58 @@ class PDFService:
         
         doc.build(elements)
         return file_path
+
+    @staticmethod
+    def generate_credit_note_pdf(note_data, lines, file_path):
+        """
+        note_data: dict(credit_note_no, invoice_no, date, customer_name, customer_mobile, kind, reason, total)
+        lines: list of dict(product_name, qty, unit_price, total, serial_no)
+        file_path: absolute path to save the PDF
+        """
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        doc = SimpleDocTemplate(file_path, pagesize=A4, **_DOC_OPTIONS)
+        elements = []
+        styles = getSampleStyleSheet()
+
+        title = "Credit Note" if note_data['kind'] == 'return' else "Credit Note (Warranty Replacement)"
+        elements.append(Paragraph(Config.APP_TITLE, styles['Title']))
+        elements.append(Paragraph(title, styles['Heading2']))
+        elements.append(Spacer(1, 12))
+
+        header_data = [
+            [f"Credit Note No: {note_data['credit_note_no']}", f"Date: {note_data['date']}"],
+            [f"Against Invoice: {note_data['invoice_no']}", ""],
+            [f"Customer: {note_data['customer_name']}", f"Mobile: {note_data['customer_mobile']}"],
+        ]
+        if note_data.get('reason'):
+            header_data.append([f"Reason: {note_data['reason']}", ""])
+        elements.append(Table(header_data, colWidths=[250, 200]))
+        elements.append(Spacer(1, 20))
+
+        data = [['Product', 'Serial', 'Qty', 'Unit Price', 'Total']]
+        for line in lines:
+            data.append([
+                line['product_name'],
+                line.get('serial_no') or "-",
+                str(line['qty']),
+                format_amount(line['unit_price']),
+                format_amount(line['total'])
+            ])
+        data.append(["", "", "", "Credit Total:", format_amount(note_data['total'])])
+
+        table = Table(data, colWidths=[170, 90, 40, 80, 80])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -2), 1, colors.black),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ]))
+        elements.append(table)
+
+        doc.build(elements)
+        return file_path
@@ -0,0 +1,44 @@
+from app import queries
+from app.attributes import normalize
+from app.database import db
+from app.models import CatalogRow
+
+# Filterable attributes, in the order the billing screen shows them
+FACETS = ('brand_name', 'capacity_ah', 'technology')
+
+def _where(filters, skip=None):
+    """' AND col = ?' clauses and their values for the filters that are set."""
+    columns = [c for c in FACETS if c != skip and filters.get(c) not in (None, "")]
+    return "".join(f" AND {c} = ?" for c in columns), [filters[c] for c in columns]
+
+class ProductService:
+    """Catalog lookups by attribute: the billing screen's faceted product list and its filter values."""
+
+    @staticmethod
+    def product_list(text=None, **filters):
+        """
+        CatalogRow(id, brand_name, model_name, price, stock, display_name) for PRODUCT_LIST, narrowed by any of
+        brand_name / capacity_ah / technology (exact, served by the partial facet indexes) and
+        an optional search text matched against the normalized search key.
+        """
+        where, params = _where(filters)
+        if text:
+            where += " AND search_key LIKE ?"
+            params.append(f"%{normalize(text)}%")
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.PRODUCT_LIST + where + " ORDER BY display_name", params)
+        return list(map(CatalogRow._make, cursor))
+
+    @staticmethod
+    def facets(**filters):
+        """
+        {facet: [(value, product count)]} over active products. Each facet's values are narrowed
+        by the other facets that are set, so only combinations that exist are offered.
+        """
+        cursor = db.get_connection().cursor()
+        result = {}
+        for column in FACETS:
+            where, params = _where(filters, skip=column)
+            cursor.execute(queries.PRODUCT_FACET.format(column=column, where=where), params)
+            result[column] = cursor.fetchall()
+        return result
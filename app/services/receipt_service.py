@@ -0,0 +1,119 @@
+import logging
+from app.config import Config
+from app.money import format_amount
+
+# ESC/POS control sequences
+ESC = b'\x1b'
+GS = b'\x1d'
+LF = b'\n'
+INIT = ESC + b'@'
+ALIGN_LEFT = ESC + b'a\x00'
+ALIGN_CENTER = ESC + b'a\x01'
+BOLD_ON = ESC + b'E\x01'
+BOLD_OFF = ESC + b'E\x00'
+SIZE_NORMAL = GS + b'!\x00'
+SIZE_DOUBLE = GS + b'!\x11'
+FEED_AND_CUT = ESC + b'd\x04' + GS + b'V\x42\x00'
+
+# Characters per line in Font A (12x24): 384 dots on 58 mm paper, 576 dots on 80 mm
+_COLUMNS = {58: 32, 80: 48}
+_QR_MODULE = {58: 4, 80: 6}
+
+def _text(s):
+    """Printer code page is plain ASCII-compatible; the rupee sign and other symbols are not."""
+    return str(s).replace("₹", "Rs.").encode('ascii', 'replace')
+
+def _qr(data, module):
+    """Native GS ( k QR: model 2, module size, error level M, store, print."""
+    payload = _text(data)
+    n = len(payload) + 3
+    return (GS + b'(k\x04\x00\x31\x41\x32\x00'
+            + GS + b'(k\x03\x00\x31\x43' + bytes([module])
+            + GS + b'(k\x03\x00\x31\x45\x31'
+            + GS + b'(k' + bytes([n & 0xFF, n >> 8]) + b'\x31\x50\x30' + payload
+            + GS + b'(k\x03\x00\x31\x51\x30')
+
+class _Layout:
+    """Everything about a receipt that doesn't depend on the sale, built once per paper width."""
+
+    def __init__(self, width_mm):
+        if width_mm not in _COLUMNS:
+            raise Exception(f"Unsupported receipt width: {width_mm} mm (58 or 80)")
+        self.cols = _COLUMNS[width_mm]
+        self.qr_module = _QR_MODULE[width_mm]
+        self.rule = b'-' * self.cols + LF
+        # Double-size title only when it fits on one line at half the columns
+        title = Config.APP_TITLE
+        size = SIZE_DOUBLE if len(title) <= self.cols // 2 else SIZE_NORMAL
+        self.header = (INIT + ALIGN_CENTER + size + BOLD_ON + _text(title[:self.cols]) + LF
+                       + SIZE_NORMAL + BOLD_OFF + LF + ALIGN_LEFT)
+        self.footer = ALIGN_CENTER + _text("Thank you for your business!") + LF + LF
+
+    def line(self, text):
+        return _text(text[:self.cols]) + LF
+
+    def pair(self, left, right):
+        """Label on the left, amount flush right."""
+        left = left[:self.cols - len(right) - 1]
+        return _text(left.ljust(self.cols - len(right)) + right) + LF
+
+_layouts = {}
+
+def _layout(width_mm):
+    layout = _layouts.get(width_mm)
+    if layout is None:
+        layout = _layouts[width_mm] = _Layout(width_mm)
+    return layout
+
+class ReceiptService:
+    """ESC/POS receipts for 58 / 80 mm thermal printers, from the same data as the A4 invoice."""
+
+    @staticmethod
+    def render(invoice_data, cart_items, old_battery, width_mm=None):
+        """
+        Same arguments as PDFService.generate_invoice_pdf (minus the path); returns the ESC/POS bytes.
+        The QR code carries the invoice number, which the Warranty screen accepts as a lookup.
+        """
+        layout = _layout(width_mm or Config.RECEIPT_WIDTH_MM)
+        out = bytearray(layout.header)
+        out += layout.line(f"Invoice: {invoice_data['invoice_no']}")
+        out += layout.line(f"Date: {invoice_data['date']}")
+        out += layout.line(f"Customer: {invoice_data['customer_name']}")
+        out += layout.line(f"Mobile: {invoice_data['customer_mobile']}")
+        out += layout.rule
+
+        for item in cart_items:
+            out += layout.line(item['product_name'])
+            out += layout.pair(f"  {item['qty']} x {format_amount(item['selling_price'], False)}", format_amount(item['total'], False))
+            for serial in item.get('serials') or []:
+                out += layout.line(f"  S/N {serial}")
+        out += layout.rule
+
+        out += layout.pair("Subtotal", format_amount(invoice_data['total'], False))
+        if old_battery['amount'] > 0:
+            out += layout.pair("Old Battery", format_amount(-old_battery['amount'], False))
+        out += BOLD_ON + layout.pair("GRAND TOTAL", "Rs." + format_amount(invoice_data['final'], False)) + BOLD_OFF
+        for rate, taxable, cgst, sgst, igst in invoice_data.get('tax_summary') or []:
+            if igst:
+                out += layout.pair(f"  IGST {rate:g}% on {format_amount(taxable, False)}", format_amount(igst, False))
+            else:
+                out += layout.pair(f"  C+SGST {rate:g}% on {format_amount(taxable, False)}", format_amount(cgst + sgst, False))
+        out += layout.rule
+
+        out += ALIGN_CENTER + _qr(invoice_data['invoice_no'], layout.qr_module) + LF
+        out += layout.footer + FEED_AND_CUT
+        return bytes(out)
+
+    @staticmethod
+    def send(payload, device=None):
+        """Writes raw bytes to the printer device / share path, or to a file when testing."""
+        device = device or Config.RECEIPT_PRINTER
+        if not device:
+            raise Exception("No receipt printer configured (settings: receipt_printer).")
+        with open(device, 'wb') as f:
+            f.write(payload)
+        logging.debug(f"Receipt sent to {device} ({len(payload)} bytes)")
+
+    @staticmethod
+    def print_receipt(invoice_data, cart_items, old_battery, device=None, width_mm=None):
+        ReceiptService.send(ReceiptService.render(invoice_data, cart_items, old_battery, width_mm), device)
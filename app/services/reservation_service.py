@@ -0,0 +1,109 @@
+import time
+import uuid
+from app.config import Config
+from app.database import db
+
+# Quantity held by other carts that has not expired yet
+_HELD_BY_OTHERS = """
+    COALESCE((SELECT SUM(quantity) FROM stock_reservations
+              WHERE product_id = ? AND cart_id != ? AND expires_at > ?), 0)
+"""
+
+class ReservationService:
+    """
+    Short-lived stock holds so two terminals sharing app.db cannot sell the same unit.
+    A hold is placed when an item goes into a cart, extended while the cart is open,
+    dropped on cancel or expiry, and converted into a stock deduction at checkout.
+    """
+
+    @staticmethod
+    def new_cart_id():
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def available(product_id, cart_id="", cursor=None):
+        """Stock on hand minus what other carts are holding."""
+        cursor = cursor or db.get_connection().cursor()
+        cursor.execute(f"""
+            SELECT quantity_available - {_HELD_BY_OTHERS}
+            FROM stock WHERE product_id = ?
+        """, (product_id, cart_id, time.time(), product_id))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def reserve(cart_id, product_id, qty, ttl=None):
+        """Places a hold for `qty` units; raises if the live (not cached) availability is short."""
+        conn = db.get_connection()
+        try:
+            # Take the write lock up front so the check and the insert see the same stock
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            now = time.time()
+            cursor.execute("DELETE FROM stock_reservations WHERE product_id = ? AND expires_at <= ?", (product_id, now))
+            cursor.execute("SELECT COALESCE(SUM(quantity), 0) FROM stock_reservations WHERE cart_id = ? AND product_id = ?",
+                           (cart_id, product_id))
+            already_held = cursor.fetchone()[0]
+            available = ReservationService.available(product_id, cart_id, cursor)
+            if available - already_held < qty:
+                raise Exception(f"Only {max(0, available - already_held)} available (others are held in open carts).")
+            cursor.execute("""
+                INSERT INTO stock_reservations (cart_id, terminal_id, product_id, quantity, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (cart_id, Config.TERMINAL_ID, product_id, qty, now + (ttl or Config.RESERVATION_TTL_SECONDS)))
+            conn.commit()
+            return cursor.lastrowid
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def release(hold_id):
+        conn = db.get_connection()
+        conn.execute("DELETE FROM stock_reservations WHERE id = ?", (hold_id,))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def release_cart(cart_id):
+        conn = db.get_connection()
+        conn.execute("DELETE FROM stock_reservations WHERE cart_id = ?", (cart_id,))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def extend_cart(cart_id, ttl=None):
+        """Keeps an open cart's holds alive."""
+        conn = db.get_connection()
+        conn.execute("UPDATE stock_reservations SET expires_at = ? WHERE cart_id = ?",
+                     (time.time() + (ttl or Config.RESERVATION_TTL_SECONDS), cart_id))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def purge_expired():
+        conn = db.get_connection()
+        cursor = conn.execute("DELETE FROM stock_reservations WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount
+
+    @staticmethod
+    def deduct(cursor, cart_id, product_id, qty):
+        """
+        Atomically deducts stock inside the caller's transaction, honouring other carts' holds.
+        Returns False (and changes nothing) if there is not enough unheld stock.
+        """
+        cursor.execute(f"""
+            UPDATE stock SET quantity_available = quantity_available - ?
+            WHERE product_id = ? AND quantity_available - {_HELD_BY_OTHERS} >= ?
+        """, (qty, product_id, product_id, cart_id or "", time.time(), qty))
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def convert_cart(cursor, cart_id):
+        """Drops a cart's holds inside the checkout transaction (the stock has been deducted)."""
+        if cart_id:
+            cursor.execute("DELETE FROM stock_reservations WHERE cart_id = ?", (cart_id,))
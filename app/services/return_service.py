@@ -0,0 +1,208 @@
+import os
+import re
+import time
+import random
+from app.config import Config
+from app.events import bus
+from app.money import to_paise, from_paise, line_total
+from app.services.archive_service import ArchiveService
+from app.services.inventory_service import InventoryService
+from app.services.cost_service import CostService
+from app.services.stats_service import StatsService
+
+_RETURNABLE_ITEMS = """
+    SELECT ii.id, ii.product_id, p.display_name, ii.quantity, ii.unit_price,
+           COALESCE((SELECT SUM(c.quantity) FROM credit_note_items c WHERE c.invoice_item_id = ii.id), 0)
+    FROM all_invoice_items ii LEFT JOIN products p ON p.id = ii.product_id
+    WHERE ii.invoice_no = ?
+    ORDER BY ii.id
+"""
+
+class ReturnService:
+    """Credit notes against an original invoice: returns to stock and warranty replacements."""
+
+    @staticmethod
+    def generate_credit_note_number(cursor):
+        # Format: CN-YYYYMMDD-XXXX
+        date_str = time.strftime("%Y%m%d")
+        while True:
+            credit_note_no = f"CN-{date_str}-{random.randint(1000, 9999)}"
+            cursor.execute("SELECT 1 FROM credit_notes WHERE credit_note_no = ?", (credit_note_no,))
+            if not cursor.fetchone():
+                return credit_note_no
+
+    @staticmethod
+    def _connection_for(invoice_no):
+        """Reporting connection with just the partition the invoice number's date points at."""
+        m = re.match(r"INV-(\d{4})(\d{2})(\d{2})-", invoice_no)
+        if not m:
+            return ArchiveService.reporting_connection()
+        day = f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+        return ArchiveService.reporting_connection(day, day)
+
+    @staticmethod
+    def get_returnable_items(invoice_no):
+        """
+        (header, items) where header = (date, customer name, mobile, final_amount) and items are
+        dict(invoice_item_id, product_id, product_name, quantity, unit_price, returned, serials).
+        """
+        invoice_no = invoice_no.strip().upper()
+        conn = ReturnService._connection_for(invoice_no)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT i.date, c.full_name, c.mobile_number, i.final_amount
+            FROM all_invoices i LEFT JOIN customers c ON c.id = i.customer_id
+            WHERE i.invoice_no = ?
+        """, (invoice_no,))
+        header = cursor.fetchone()
+        if not header:
+            conn.close()
+            return None, []
+        cursor.execute(_RETURNABLE_ITEMS, (invoice_no,))
+        items = [{'invoice_item_id': r[0], 'product_id': r[1], 'product_name': r[2], 'quantity': r[3],
+                  'unit_price': r[4], 'returned': r[5], 'serials': []} for r in cursor.fetchall()]
+        by_id = {item['invoice_item_id']: item for item in items}
+        cursor.execute("""
+            SELECT invoice_item_id, serial_no FROM warranty_registrations
+            WHERE invoice_no = ? AND status = 'active'
+        """, (invoice_no,))
+        for item_id, serial in cursor.fetchall():
+            if item_id in by_id:
+                by_id[item_id]['serials'].append(serial)
+        conn.close()
+        return header, items
+
+    @staticmethod
+    def create_credit_note(invoice_no, lines, kind='return', reason="", render_pdf=True):
+        """
+        lines: list of dict(invoice_item_id, qty, serials=[...]), with a serial for each returned unit that was sold tracked
+        kind: 'return' puts goods back in sellable stock; 'replacement' takes a defective unit back without restocking.
+        Reverses stock, units, warranty, customer and daily aggregates in one transaction, then
+        renders the credit-note PDF in the background. Returns (credit_note_no, pdf_path, future).
+        """
+        if kind not in ('return', 'replacement'):
+            raise Exception(f"Unknown credit note kind: {kind}")
+        invoice_no = invoice_no.strip().upper()
+        conn = ReturnService._connection_for(invoice_no)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                SELECT i.customer_id, i.final_amount, c.full_name, c.mobile_number
+                FROM all_invoices i LEFT JOIN customers c ON c.id = i.customer_id
+                WHERE i.invoice_no = ?
+            """, (invoice_no,))
+            header = cursor.fetchone()
+            if not header:
+                raise Exception(f"Invoice {invoice_no} not found.")
+            customer_id, final_amount, customer_name, mobile = header
+
+            cursor.execute(_RETURNABLE_ITEMS, (invoice_no,))
+            items = {row[0]: row for row in cursor.fetchall()}
+            # Units of each line still out under a serial; the rest of the line was sold untracked
+            cursor.execute("""
+                SELECT invoice_item_id, COUNT(*) FROM warranty_registrations
+                WHERE invoice_no = ? AND status = 'active' GROUP BY invoice_item_id
+            """, (invoice_no,))
+            tracked = dict(cursor.fetchall())
+
+            note_lines = []
+            for line in lines:
+                qty = int(line.get('qty') or 0)
+                if qty <= 0:
+                    continue
+                item = items.get(line['invoice_item_id'])
+                if not item:
+                    raise Exception(f"Item {line['invoice_item_id']} is not on invoice {invoice_no}.")
+                item_id, pid, name, sold, unit_price, returned = item
+                if qty > sold - returned:
+                    raise Exception(f"Only {sold - returned} of {name} can still be returned.")
+                serials = line.get('serials') or []
+                if len(serials) > qty:
+                    raise Exception(f"{len(serials)} serials given for {qty} unit(s) of {name}.")
+                # Untracked units go back as untracked stock; beyond them each unit needs its serial,
+                # or stock would grow by units no sale can ever scan
+                required = qty - (sold - returned - tracked.get(item_id, 0))
+                if len(serials) < required:
+                    raise Exception(f"Scan {required} serial number(s) for the {qty} unit(s) of {name} "
+                                    f"being returned ({len(serials)} given).")
+                note_lines.append((item_id, pid, name, qty, unit_price, serials))
+            if not note_lines:
+                raise Exception("Nothing selected to return.")
+
+            # Never credit more than was paid on the invoice (exchange deductions stay applied), to the paisa
+            cursor.execute("SELECT total_amount FROM credit_notes WHERE invoice_no = ?", (invoice_no,))
+            already_credited = sum(to_paise(amount or 0) for amount, in cursor.fetchall())
+            gross = sum(line_total(qty, unit_price) for _, _, _, qty, unit_price, _ in note_lines)
+            total = from_paise(max(0, min(gross, to_paise(final_amount or 0) - already_credited)))
+
+            credit_note_no = ReturnService.generate_credit_note_number(cursor)
+            now = time.strftime("%Y-%m-%d %H:%M:%S")
+            cursor.execute("""
+                INSERT INTO credit_notes (credit_note_no, invoice_no, date, customer_id, total_amount, kind, reason)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (credit_note_no, invoice_no, now, customer_id, total, kind, reason))
+
+            item_rows = []
+            pdf_lines = []
+            unit_status = 'returned' if kind == 'return' else 'replaced'
+            for item_id, pid, name, qty, unit_price, serials in note_lines:
+                for serial in serials:
+                    cursor.execute("""
+                        UPDATE warranty_registrations SET status = 'void'
+                        WHERE serial_no = ? AND invoice_item_id = ? AND status = 'active'
+                    """, (serial, item_id))
+                    if cursor.rowcount != 1:
+                        raise Exception(f"Serial {serial} was not sold on this invoice line.")
+                    InventoryService.set_status(cursor, serial, unit_status)
+                    unit_total = from_paise(line_total(1, unit_price))
+                    item_rows.append((credit_note_no, item_id, pid, 1, unit_price, unit_total, serial))
+                    pdf_lines.append({'product_name': name, 'serial_no': serial, 'qty': 1,
+                                      'unit_price': unit_price, 'total': unit_total})
+                rest = qty - len(serials)
+                if rest:
+                    rest_total = from_paise(line_total(rest, unit_price))
+                    item_rows.append((credit_note_no, item_id, pid, rest, unit_price, rest_total, None))
+                    pdf_lines.append({'product_name': name, 'serial_no': None, 'qty': rest,
+                                      'unit_price': unit_price, 'total': rest_total})
+
+                if kind == 'return':
+                    CostService.restock(cursor, item_id, qty)
+                    cursor.execute("""
+                        UPDATE stock SET quantity_available = quantity_available + ?, last_updated = CURRENT_TIMESTAMP
+                        WHERE product_id = ?
+                    """, (qty, pid))
+                cursor.execute("UPDATE customer_purchases SET returned_quantity = returned_quantity + ? WHERE invoice_item_id = ?",
+                               (qty, item_id))
+
+            cursor.executemany("""
+                INSERT INTO credit_note_items (credit_note_no, invoice_item_id, product_id, quantity, unit_price, total_price, serial_no)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, item_rows)
+
+            cursor.execute("UPDATE customer_stats SET lifetime_spend = lifetime_spend - ? WHERE customer_id = ?",
+                           (total, customer_id))
+            StatsService.record_return(cursor, now, total, credit_note_no)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        bus.publish('invoice.returned', credit_note_no=credit_note_no, invoice_no=invoice_no, date=now, amount=total,
+                    product_ids=[pid for _, pid, _, _, _, _ in note_lines])
+
+        if not render_pdf:
+            return credit_note_no, None, None
+
+        from app.services.pdf_service import PDFService
+        from app.services.document_service import DocumentService
+        pdf_path = os.path.join(Config.INVOICE_DIR, time.strftime("%Y-%m-%d"), f"{credit_note_no}.pdf")
+        note_data = {
+            'credit_note_no': credit_note_no, 'invoice_no': invoice_no, 'date': now,
+            'customer_name': customer_name, 'customer_mobile': mobile,
+            'kind': kind, 'reason': reason, 'total': total,
+        }
+        future = PDFService.render_async(DocumentService.render_and_register, credit_note_no, 'credit_note',
+                                         PDFService.generate_credit_note_pdf, note_data, pdf_lines, pdf_path)
+        return credit_note_no, pdf_path, future
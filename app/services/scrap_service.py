@@ -0,0 +1,139 @@
+import time
+import logging
+from app.database import db
+
+BATTERY_TYPES = ["Automotive", "Inverter", "Two-Wheeler", "SMF-VRLA", "Other"]
+GRADES = ["A", "B", "C"]
+
+class ScrapService:
+    """Old batteries taken in on exchange, held in the scrap yard until sold to a recycler in bulk."""
+
+    @staticmethod
+    def describe(entries):
+        """Invoice note for the exchange, e.g. '2 x Automotive (B, 13.5 kg)'."""
+        groups = {}
+        for e in entries:
+            key = (e['battery_type'], e['grade'])
+            count, weight = groups.get(key, (0, 0.0))
+            groups[key] = (count + 1, weight + e['weight_kg'])
+        return ", ".join(f"{count} x {btype} ({grade}, {weight:g} kg)"
+                         for (btype, grade), (count, weight) in groups.items())
+
+    @staticmethod
+    def record_exchange(cursor, invoice_no, received_at, entries):
+        """
+        Runs inside the create_invoice transaction.
+        entries: list of dict(battery_type, grade, weight_kg, value), one per old battery.
+        """
+        if not entries:
+            return
+        cursor.executemany("""
+            INSERT INTO scrap_stock (invoice_no, battery_type, grade, weight_kg, value, received_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(invoice_no, e['battery_type'], e['grade'], e['weight_kg'], e['value'], received_at) for e in entries])
+        cursor.executemany("""
+            INSERT INTO scrap_totals (battery_type, grade, units_in_yard, weight_in_yard, value_in_yard)
+            VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT (battery_type, grade) DO UPDATE SET
+                units_in_yard = units_in_yard + 1,
+                weight_in_yard = weight_in_yard + excluded.weight_in_yard,
+                value_in_yard = value_in_yard + excluded.value_in_yard
+        """, [(e['battery_type'], e['grade'], e['weight_kg'], e['value']) for e in entries])
+
+    @staticmethod
+    def get_totals():
+        """[(battery_type, grade, units_in_yard, weight_in_yard, value_in_yard, units_disposed, weight_disposed)]"""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT battery_type, grade, units_in_yard, weight_in_yard, value_in_yard, units_disposed, weight_disposed
+            FROM scrap_totals ORDER BY battery_type, grade
+        """)
+        return cursor.fetchall()
+
+    @staticmethod
+    def list_in_yard(battery_type=None, grade=None):
+        """Units waiting for disposal, oldest first."""
+        sql = "SELECT id, received_at, invoice_no, battery_type, grade, weight_kg, value FROM scrap_stock WHERE status = 'in_yard'"
+        params = []
+        if battery_type:
+            sql += " AND battery_type = ?"
+            params.append(battery_type)
+        if grade:
+            sql += " AND grade = ?"
+            params.append(grade)
+        cursor = db.get_connection().cursor()
+        cursor.execute(sql + " ORDER BY received_at", params)
+        return cursor.fetchall()
+
+    @staticmethod
+    def create_batch(recycler_name, rate_per_kg, scrap_ids=None, battery_type=None, grade=None, notes=""):
+        """
+        Sells scrap to a recycler in one transaction: the chosen units (or every in-yard unit
+        matching the type/grade filter) are marked disposed and the running totals are moved
+        from in-yard to disposed. Returns (batch_no, unit_count, total_weight_kg, amount).
+        """
+        if not recycler_name:
+            raise Exception("Recycler name is required.")
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            sql = "SELECT id, battery_type, grade, weight_kg, value FROM scrap_stock WHERE status = 'in_yard'"
+            params = []
+            if scrap_ids:
+                sql += f" AND id IN ({','.join('?' * len(scrap_ids))})"
+                params.extend(scrap_ids)
+            if battery_type:
+                sql += " AND battery_type = ?"
+                params.append(battery_type)
+            if grade:
+                sql += " AND grade = ?"
+                params.append(grade)
+            cursor.execute(sql, params)
+            units = cursor.fetchall()
+            if not units:
+                raise Exception("No scrap in the yard matches this batch.")
+            if scrap_ids and len(units) != len(set(scrap_ids)):
+                raise Exception("Some selected scrap was already disposed. Refresh and try again.")
+
+            total_weight = round(sum(u[3] for u in units), 3)
+            amount = round(total_weight * rate_per_kg, 2)
+            now = time.strftime("%Y-%m-%d %H:%M:%S")
+            # Numbered per day; the write lock above keeps two terminals off the same number
+            cursor.execute("SELECT COUNT(*) FROM scrap_batches WHERE date >= ?", (now[:10],))
+            batch_no = f"SCR-{now[:10].replace('-', '')}-{cursor.fetchone()[0] + 1:04d}"
+            cursor.execute("""
+                INSERT INTO scrap_batches (batch_no, date, recycler_name, unit_count, total_weight_kg, rate_per_kg, amount, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (batch_no, now, recycler_name, len(units), total_weight, rate_per_kg, amount, notes))
+            batch_id = cursor.lastrowid
+            cursor.executemany("UPDATE scrap_stock SET status = 'disposed', batch_id = ? WHERE id = ?",
+                               [(batch_id, u[0]) for u in units])
+
+            groups = {}
+            for _, btype, grd, weight, value in units:
+                count, w, v = groups.get((btype, grd), (0, 0.0, 0.0))
+                groups[(btype, grd)] = (count + 1, w + weight, v + value)
+            cursor.executemany("""
+                UPDATE scrap_totals SET
+                    units_in_yard = units_in_yard - ?, weight_in_yard = weight_in_yard - ?, value_in_yard = value_in_yard - ?,
+                    units_disposed = units_disposed + ?, weight_disposed = weight_disposed + ?
+                WHERE battery_type = ? AND grade = ?
+            """, [(c, w, v, c, w, btype, grd) for (btype, grd), (c, w, v) in groups.items()])
+            conn.commit()
+            logging.info(f"Scrap batch {batch_no}: {len(units)} units, {total_weight} kg to {recycler_name}")
+            return batch_no, len(units), total_weight, amount
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def list_batches(limit=100):
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT batch_no, date, recycler_name, unit_count, total_weight_kg, rate_per_kg, amount
+            FROM scrap_batches ORDER BY id DESC LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import logging
+import threading
+from app.config import Config
+from app.database import db
+from app.services.whatsapp_service import WhatsAppService
+from app.services.journal_service import JournalService
+
+DEFAULT_TEMPLATES = {
+    'invoice': (
+        "Dear {customer_name},\n"
+        "Thank you for shopping at {shop}.\n"
+        "Invoice: {invoice_no}\n"
+        "Amount: {amount}\n"
+        "Date: {date}\n"
+        "Please keep this message for warranty claims."
+    ),
+    'warranty_expiry': (
+        "Dear {customer_name},\n"
+        "The warranty on your {products} from {shop} ends on {due_date}.\n"
+        "Visit us before then for a free health check, or ask about our exchange offers."
+    ),
+    'service_due': (
+        "Dear {customer_name},\n"
+        "Your {products} is due for its free service check this month (from {due_date}).\n"
+        "Drop by {shop} any time; it takes about 15 minutes."
+    ),
+}
+
+MAX_ATTEMPTS = 5
+BATCH_SIZE = 20
+# Worker wakes on its own this often to retry failures even if nothing new is queued
+POLL_SECONDS = 60
+
+class BrowserTransport:
+    """Opens a prefilled wa.me chat per message."""
+
+    # Each message is a browser tab the cashier must act on, so bulk sends are refused
+    interactive = True
+
+    def send(self, mobile, message):
+        WhatsAppService.open_whatsapp_web(mobile, message)
+
+class FileTransport:
+    """Stand-in for tests and dry runs: one JSON line per message."""
+
+    interactive = False
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, mobile, message):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'mobile': mobile, 'message': message,
+                                'link': WhatsAppService.generate_whatsapp_link(mobile, message)}) + "\n")
+
+def get_transport(spec=None):
+    spec = spec or Config.SHARE_TRANSPORT
+    if spec == 'browser':
+        return BrowserTransport()
+    if spec.startswith('file:'):
+        return FileTransport(spec[len('file:'):])
+    raise Exception(f"Unknown share transport: {spec}")
+
+class ShareService:
+    """Persistent WhatsApp outbox: messages are queued with the sale and sent by a background worker."""
+
+    _worker = None
+
+    @staticmethod
+    def render(template, context):
+        """
+        Fills a message template. A custom template from settings.json that does not format
+        (unknown placeholder, stray brace) falls back to the built-in one, since this runs inside
+        the sale transaction and a message must never undo an invoice.
+        """
+        context = {'shop': Config.APP_TITLE, **context}
+        custom = Config.SHARE_TEMPLATES.get(template)
+        if custom is not None:
+            try:
+                return str(custom).format_map(context)
+            except (KeyError, ValueError, IndexError, AttributeError) as e:
+                logging.warning(f"Share template '{template}' in settings is invalid ({e!r}); using the default.")
+        if template not in DEFAULT_TEMPLATES:
+            raise Exception(f"Unknown message template: {template}")
+        return DEFAULT_TEMPLATES[template].format_map(context)
+
+    @staticmethod
+    def enqueue(template, mobile, context, invoice_no=None, cursor=None):
+        """
+        Renders the template now and queues the message. Pass the create_invoice cursor to queue
+        it in the sale transaction; otherwise it commits on its own and wakes the worker.
+        """
+        row = (invoice_no, mobile, template, ShareService.render(template, context))
+        sql = "INSERT INTO share_outbox (invoice_no, mobile, template, message) VALUES (?, ?, ?, ?)"
+        if cursor is not None:
+            cursor.execute(sql, row)
+            return
+        conn = db.get_connection()
+        conn.execute(sql, row)
+        conn.commit()
+        conn.close()
+        ShareService.wake()
+
+    @staticmethod
+    def _claim(limit):
+        """Marks up to `limit` due messages as 'sending' by this terminal and returns them."""
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        conn = db.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("""
+                SELECT id, mobile, message, attempts, invoice_no FROM share_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY id LIMIT ?
+            """, (now, limit)).fetchall()
+            conn.executemany("UPDATE share_outbox SET status = 'sending', claimed_by = ? WHERE id = ?",
+                             [(Config.TERMINAL_ID, r[0]) for r in rows])
+            conn.commit()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def process_batch(transport=None, limit=BATCH_SIZE, min_interval=None):
+        """
+        Sends one batch, spacing sends by `min_interval` seconds. Failures are retried with
+        exponential backoff up to MAX_ATTEMPTS. An interactive transport only puts the message in
+        front of the cashier, so those rows end 'opened' and the invoice is not marked shared.
+        Returns the number of messages handled.
+        """
+        transport = transport or get_transport()
+        min_interval = Config.SHARE_MIN_INTERVAL if min_interval is None else min_interval
+        rows = ShareService._claim(limit)
+        last_send = 0.0
+        conn = db.get_connection()
+        try:
+            for msg_id, mobile, message, attempts, invoice_no in rows:
+                wait = last_send + min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                last_send = time.monotonic()
+                try:
+                    transport.send(mobile, message)
+                    status = 'opened' if transport.interactive else 'sent'
+                    conn.execute("UPDATE share_outbox SET status = ?, attempts = attempts + 1, sent_at = ? WHERE id = ?",
+                                 (status, time.strftime("%Y-%m-%d %H:%M:%S"), msg_id))
+                    if invoice_no and status == 'sent':
+                        JournalService.mark_shared(conn, invoice_no)
+                except Exception as e:
+                    attempts += 1
+                    status = 'failed' if attempts >= MAX_ATTEMPTS else 'pending'
+                    retry_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() + 30 * 2 ** attempts))
+                    conn.execute("""
+                        UPDATE share_outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?
+                        WHERE id = ?
+                    """, (status, attempts, str(e), retry_at, msg_id))
+                    logging.warning(f"Share {msg_id} to {mobile} failed (attempt {attempts}): {e}")
+                conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    @staticmethod
+    def requeue_stale():
+        """Messages this terminal claimed but never finished (app closed mid-send) go back to pending."""
+        conn = db.get_connection()
+        conn.execute("UPDATE share_outbox SET status = 'pending' WHERE status = 'sending' AND claimed_by = ?",
+                     (Config.TERMINAL_ID,))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def counts():
+        """{status: count}"""
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM share_outbox GROUP BY status")
+        return dict(cursor.fetchall())
+
+    @staticmethod
+    def start_worker():
+        if ShareService._worker is None:
+            ShareService.requeue_stale()
+            ShareService._worker = _ShareWorker()
+            ShareService._worker.start()
+
+    @staticmethod
+    def wake():
+        if ShareService._worker is not None:
+            ShareService._worker.wake.set()
+
+    @staticmethod
+    def stop_worker():
+        if ShareService._worker is not None:
+            ShareService._worker.stop.set()
+            ShareService._worker.wake.set()
+            ShareService._worker = None
+
+class _ShareWorker(threading.Thread):
+    def __init__(self):
+        super().__init__(name="share-outbox", daemon=True)
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+        self.wake.set()  # drain anything left from the last session
+
+    def run(self):
+        while not self.stop.is_set():
+            self.wake.wait(POLL_SECONDS)
+            self.wake.clear()
+            try:
+                transport = get_transport()
+                while not self.stop.is_set() and ShareService.process_batch(transport):
+                    pass
+            except Exception as e:
+                logging.error(f"Share worker error: {e}")
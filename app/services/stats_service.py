@@ -0,0 +1,160 @@
+import logging
+from app.database import db
+
+# Month cube rows per (category, brand): units and line revenue, net of credit notes
+_MIX_FROM_INVOICE = """
+    SELECT strftime('%Y-%m', ?), COALESCE(p.category, ''), COALESCE(p.brand_name, ''),
+           SUM(ii.quantity), SUM(ii.total_price)
+    FROM invoice_items ii JOIN products p ON p.id = ii.product_id
+    WHERE ii.invoice_no = ?
+    GROUP BY 2, 3
+"""
+_MIX_FROM_CREDIT_NOTE = """
+    SELECT strftime('%Y-%m', ?), COALESCE(p.category, ''), COALESCE(p.brand_name, ''),
+           -SUM(cni.quantity), -SUM(cni.total_price)
+    FROM credit_note_items cni JOIN products p ON p.id = cni.product_id
+    WHERE cni.credit_note_no = ?
+    GROUP BY 2, 3
+"""
+_MIX_UPSERT = """
+    ON CONFLICT (month, category, brand) DO UPDATE SET
+        units = units + excluded.units,
+        revenue = revenue + excluded.revenue
+"""
+
+class StatsService:
+    """Pre-aggregated sales totals, updated inside the same transaction as each sale or return."""
+
+    @staticmethod
+    def record_sale(cursor, invoice_no, sale_date, final_amount, gross_amount=None, exchange_amount=0.0):
+        """Runs inside the create_invoice transaction, after the invoice items are inserted."""
+        gross_amount = final_amount if gross_amount is None else gross_amount
+        exchanged = 1 if exchange_amount > 0 else 0
+        row = (sale_date, final_amount, gross_amount, exchanged, exchange_amount)
+        cursor.execute("""
+            INSERT INTO sales_daily (day, invoice_count, sales_amount, gross_amount, exchange_count, exchange_amount)
+            VALUES (DATE(?), 1, ?, ?, ?, ?)
+            ON CONFLICT (day) DO UPDATE SET
+                invoice_count = invoice_count + 1,
+                sales_amount = sales_amount + excluded.sales_amount,
+                gross_amount = gross_amount + excluded.gross_amount,
+                exchange_count = exchange_count + excluded.exchange_count,
+                exchange_amount = exchange_amount + excluded.exchange_amount
+        """, row)
+        cursor.execute("""
+            INSERT INTO sales_monthly (month, invoice_count, sales_amount, gross_amount, exchange_count, exchange_amount)
+            VALUES (strftime('%Y-%m', ?), 1, ?, ?, ?, ?)
+            ON CONFLICT (month) DO UPDATE SET
+                invoice_count = invoice_count + 1,
+                sales_amount = sales_amount + excluded.sales_amount,
+                gross_amount = gross_amount + excluded.gross_amount,
+                exchange_count = exchange_count + excluded.exchange_count,
+                exchange_amount = exchange_amount + excluded.exchange_amount
+        """, row)
+        cursor.execute(f"INSERT INTO sales_monthly_mix (month, category, brand, units, revenue) {_MIX_FROM_INVOICE} {_MIX_UPSERT}",
+                       (sale_date, invoice_no))
+
+    @staticmethod
+    def record_return(cursor, return_date, amount, credit_note_no=None):
+        """Runs inside the credit-note transaction, after the credit note items are inserted."""
+        for table, key in (("sales_daily", "day"), ("sales_monthly", "month")):
+            bucket = "DATE(?)" if key == "day" else "strftime('%Y-%m', ?)"
+            cursor.execute(f"""
+                INSERT INTO {table} ({key}, return_count, return_amount) VALUES ({bucket}, 1, ?)
+                ON CONFLICT ({key}) DO UPDATE SET
+                    return_count = return_count + 1,
+                    return_amount = return_amount + excluded.return_amount
+            """, (return_date, amount))
+        if credit_note_no:
+            cursor.execute(f"INSERT INTO sales_monthly_mix (month, category, brand, units, revenue) {_MIX_FROM_CREDIT_NOTE} {_MIX_UPSERT}",
+                           (return_date, credit_note_no))
+
+    @staticmethod
+    def needs_rebuild():
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT EXISTS (SELECT 1 FROM invoices)
+               AND (NOT EXISTS (SELECT 1 FROM sales_daily) OR NOT EXISTS (SELECT 1 FROM sales_monthly))
+        """)
+        return bool(cursor.fetchone()[0])
+
+    @staticmethod
+    def _stage(cursor):
+        """One ArchiveService batch: its daily sales and monthly mix into TEMP staging tables."""
+        cursor.execute("""
+            INSERT INTO temp.stage_sales (day, invoice_count, sales_amount, gross_amount, exchange_count, exchange_amount)
+            SELECT DATE(date), COUNT(*), SUM(final_amount), SUM(total_amount),
+                   SUM(old_battery_value > 0), SUM(COALESCE(old_battery_value, 0))
+            FROM all_invoices GROUP BY 1
+        """)
+        cursor.execute("""
+            INSERT INTO temp.stage_mix (month, category, brand, units, revenue)
+            SELECT strftime('%Y-%m', i.date), COALESCE(p.category, ''), COALESCE(p.brand_name, ''),
+                   SUM(ii.quantity), SUM(ii.total_price)
+            FROM all_invoices i
+            JOIN all_invoice_items ii ON ii.invoice_no = i.invoice_no
+            JOIN products p ON p.id = ii.product_id
+            GROUP BY 1, 2, 3
+        """)
+
+    @staticmethod
+    def rebuild():
+        """
+        Recomputes the aggregates from every invoice and credit note, archived years included.
+        Archives are read in batches (see ArchiveService.for_each_batch) and the tables are
+        replaced in one transaction at the end.
+        """
+        from app.services.archive_service import ArchiveService
+
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                CREATE TEMP TABLE stage_sales (day TEXT, invoice_count INTEGER, sales_amount REAL, gross_amount REAL,
+                                               exchange_count INTEGER, exchange_amount REAL)
+            """)
+            cursor.execute("CREATE TEMP TABLE stage_mix (month TEXT, category TEXT, brand TEXT, units INTEGER, revenue REAL)")
+            ArchiveService.for_each_batch(conn, StatsService._stage)
+
+            cursor.execute("BEGIN IMMEDIATE")
+            for table, key, bucket in (("sales_daily", "day", "day"), ("sales_monthly", "month", "strftime('%Y-%m', day)")):
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(f"""
+                    INSERT INTO {table} ({key}, invoice_count, sales_amount, gross_amount, exchange_count, exchange_amount)
+                    SELECT {bucket}, SUM(invoice_count), SUM(sales_amount), SUM(gross_amount),
+                           SUM(exchange_count), SUM(exchange_amount)
+                    FROM temp.stage_sales GROUP BY 1
+                """)
+                bucket = "DATE(date)" if key == "day" else "strftime('%Y-%m', date)"
+                cursor.execute(f"""
+                    INSERT INTO {table} ({key}, return_count, return_amount)
+                    SELECT {bucket}, COUNT(*), SUM(total_amount) FROM credit_notes WHERE true GROUP BY 1
+                    ON CONFLICT ({key}) DO UPDATE SET
+                        return_count = excluded.return_count,
+                        return_amount = excluded.return_amount
+                """)
+
+            cursor.execute("DELETE FROM sales_monthly_mix")
+            cursor.execute("""
+                INSERT INTO sales_monthly_mix (month, category, brand, units, revenue)
+                SELECT month, category, brand, SUM(units), SUM(revenue)
+                FROM temp.stage_mix GROUP BY 1, 2, 3
+            """)
+            cursor.execute(f"""
+                INSERT INTO sales_monthly_mix (month, category, brand, units, revenue)
+                SELECT strftime('%Y-%m', cn.date), COALESCE(p.category, ''), COALESCE(p.brand_name, ''),
+                       -SUM(cni.quantity), -SUM(cni.total_price)
+                FROM credit_notes cn
+                JOIN credit_note_items cni ON cni.credit_note_no = cn.credit_note_no
+                JOIN products p ON p.id = cni.product_id
+                WHERE true
+                GROUP BY 1, 2, 3
+                {_MIX_UPSERT}
+            """)
+            conn.commit()
+            logging.info("Sales aggregates rebuilt.")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
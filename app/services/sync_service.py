@@ -0,0 +1,425 @@
+import os
+import gzip
+import hmac
+import json
+import time
+import socket
+import struct
+import hashlib
+import logging
+from app.config import Config
+from app.database import db
+from app.events import bus
+
+BATCH_VERSION = 1
+# First line of a batch file; a JSON header with the signature and the gzipped batch follow on their own lines
+BATCH_MAGIC = b"SBSYNC"
+# Socket frames: 4-byte big-endian length, an HMAC-SHA256 tag, then a gzipped JSON document
+_FRAME = struct.Struct(">I")
+_MAX_FRAME = 256 * 1024 * 1024
+_TAG_SIZE = hashlib.sha256().digest_size
+# Random bytes each side sends first; tags cover both, so frames cannot be replayed into another connection
+_NONCE_SIZE = 16
+
+_PRODUCT_COLUMNS = ("category", "brand_name", "model_name", "warranty_months", "current_price", "hsn_code", "is_active",
+                    "capacity_ah", "voltage", "technology")
+
+# Snapshot of what existed before change capture, logged once as ordinary changes
+_SEED = [
+    ("product", "qr_code", f"""json_object({', '.join(f"'{c}', {c}" for c in _PRODUCT_COLUMNS)})""", "products"),
+    ("customer", "mobile_number", "json_object('full_name', full_name, 'address', address)", "customers"),
+    ("stock", "(SELECT qr_code FROM products p WHERE p.id = stock.product_id)",
+     "json_object('delta', quantity_available)", "stock WHERE quantity_available != 0 AND EXISTS (SELECT 1 FROM products p WHERE p.id = stock.product_id)"),
+]
+
+
+def _pack(document):
+    return gzip.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"), compresslevel=6)
+
+
+def _unpack(blob):
+    return json.loads(gzip.decompress(blob).decode("utf-8"))
+
+
+def _sync_key():
+    key = Config.SYNC_KEY
+    if not key:
+        raise Exception("Set sync_key (or catalog_key) in data/settings.json, the same at every branch, to sync.")
+    return key.encode("utf-8")
+
+
+def _signature(key, body):
+    return hmac.new(key, body, hashlib.sha256).hexdigest()
+
+
+class _Channel:
+    """
+    One sync connection. Every frame is tagged with HMAC-SHA256 over both sides' nonces, the
+    frame's position in the exchange and its body, using the branches' shared key; a frame
+    that does not verify is refused before it is decompressed or parsed.
+    """
+
+    def __init__(self, sock, server):
+        self.sock = sock
+        self.key = _sync_key()
+        mine = os.urandom(_NONCE_SIZE)
+        sock.sendall(mine)
+        theirs = _recv_exact(sock, _NONCE_SIZE)
+        self.session = theirs + mine if server else mine + theirs
+        self.frames = 0
+
+    def _tag(self, blob):
+        self.frames += 1
+        return hmac.new(self.key, self.session + _FRAME.pack(self.frames) + blob, hashlib.sha256).digest()
+
+    def send(self, document):
+        blob = _pack(document)
+        self.sock.sendall(_FRAME.pack(len(blob)) + self._tag(blob) + blob)
+
+    def recv(self):
+        (size,) = _FRAME.unpack(_recv_exact(self.sock, _FRAME.size))
+        if size > _MAX_FRAME:
+            raise Exception(f"Sync frame of {size} bytes refused.")
+        tag = _recv_exact(self.sock, _TAG_SIZE)
+        blob = _recv_exact(self.sock, size)
+        if not hmac.compare_digest(tag, self._tag(blob)):
+            raise Exception("Sync frame failed authentication; the peer uses another sync_key or the data was altered.")
+        return _unpack(blob)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise Exception("Sync peer closed the connection.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+
+class SyncService:
+    """
+    Multi-branch replication. Triggers (see database.py) log every local change to the catalog,
+    customers and stock in change_log with a Lamport time; batches of the log are swapped with
+    other branches as files or over a socket. Applying is idempotent: a change is keyed by the
+    branch that made it and its sequence number there, so resends and relays are harmless.
+    Products and customers are last-writer-wins on (lamport, branch); stock travels as deltas
+    into branch_stock, each branch's own count of what it holds.
+    """
+
+    @staticmethod
+    def branch_id(cursor=None):
+        cursor = cursor or db.get_connection().cursor()
+        cursor.execute("SELECT value FROM sync_state WHERE key = 'branch_id'")
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def init_branch(name):
+        """
+        Gives this database a new branch identity and a clean log. Run it on a copied app.db
+        before its first sync, or both copies will claim the same changes.
+        """
+        name = (name or "").strip()
+        if not name or any(c in name for c in "/\\ "):
+            raise Exception("Branch name must be non-empty, without spaces or slashes.")
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for table in ("change_log", "sync_peers", "branch_stock"):
+                cursor.execute(f"DELETE FROM {table}")
+            cursor.execute("DELETE FROM sync_state WHERE key IN ('branch_id', 'seeded')")
+            cursor.execute("INSERT INTO sync_state (key, value) VALUES ('branch_id', ?)", (name,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        SyncService.seed()
+
+    @staticmethod
+    def needs_seed():
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM sync_state WHERE key = 'seeded')")
+        return bool(cursor.fetchone()[0])
+
+    @staticmethod
+    def seed():
+        """Logs the current catalog, customers and stock once, so a new peer receives all of it."""
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            origin = SyncService.branch_id(cursor)
+            # Our own changes captured before the snapshot are part of it
+            cursor.execute("DELETE FROM change_log WHERE origin = ?", (origin,))
+            for entity, key, payload, source in _SEED:
+                cursor.execute("SELECT COALESCE(MAX(lamport), 0) FROM change_log")
+                base = cursor.fetchone()[0]
+                cursor.execute(f"""
+                    INSERT INTO change_log (origin, lamport, entity, entity_key, payload)
+                    SELECT ?, ? + ROW_NUMBER() OVER (), ?, {key}, {payload}
+                    FROM {source}
+                """, (origin, base, entity))
+            cursor.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('seeded', CURRENT_TIMESTAMP)")
+            cursor.execute("SELECT COUNT(*) FROM change_log")
+            count = cursor.fetchone()[0]
+            conn.commit()
+            logging.info(f"Sync log seeded with {count} changes.")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def list_peers():
+        """[(peer_id, sent_seq, received_seq, last_sync, pending changes for it)]"""
+        cursor = db.get_connection().cursor()
+        cursor.execute("""
+            SELECT p.peer_id, p.sent_seq, p.received_seq, p.last_sync,
+                   (SELECT COUNT(*) FROM change_log c WHERE c.seq > p.sent_seq AND c.origin != p.peer_id)
+            FROM sync_peers p ORDER BY p.peer_id
+        """)
+        return cursor.fetchall()
+
+    @staticmethod
+    def build_batch(peer_id=None):
+        """
+        Everything the peer has not acknowledged, minus what it wrote itself, plus our ack of
+        what we have applied from it. peer_id None (first contact) sends the whole log.
+        """
+        cursor = db.get_connection().cursor()
+        me = SyncService.branch_id(cursor)
+        sent_seq, received_seq = 0, 0
+        if peer_id:
+            cursor.execute("SELECT sent_seq, received_seq FROM sync_peers WHERE peer_id = ?", (peer_id,))
+            row = cursor.fetchone()
+            if row:
+                sent_seq, received_seq = row
+        cursor.execute("""
+            SELECT seq, origin, COALESCE(origin_seq, seq), lamport, entity, entity_key, payload
+            FROM change_log WHERE seq > ? AND origin != ?
+            ORDER BY seq
+        """, (sent_seq, peer_id or ""))
+        return {
+            'version': BATCH_VERSION,
+            'from': me,
+            'to': peer_id,
+            'ack': received_seq,
+            'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'changes': cursor.fetchall(),
+        }
+
+    @staticmethod
+    def apply_batch(batch):
+        """
+        Applies a peer's batch in one transaction, oldest Lamport time first. Returns
+        {'received', 'applied', 'duplicates', 'superseded'}.
+        """
+        if batch.get('version') != BATCH_VERSION:
+            raise Exception(f"Unsupported sync batch version {batch.get('version')}.")
+        sender = batch['from']
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        stats = {'received': len(batch['changes']), 'applied': 0, 'duplicates': 0, 'superseded': 0}
+        products = 0
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            me = SyncService.branch_id(cursor)
+            if sender == me:
+                raise Exception(f"Batch comes from this branch ({me}); run `sync_branches.py init` on copied databases.")
+            if batch.get('to') not in (None, me):
+                raise Exception(f"Batch is addressed to branch {batch['to']}, this is {me}.")
+            # Switches change capture off for this transaction only
+            cursor.execute("INSERT INTO sync_state (key, value) VALUES ('applying', ?)", (sender,))
+
+            now = time.strftime("%Y-%m-%d %H:%M:%S")
+            top_seq = 0
+            for sender_seq, origin, origin_seq, lamport, entity, key, payload in sorted(
+                    batch['changes'], key=lambda c: (c[3], c[1], c[2])):
+                top_seq = max(top_seq, sender_seq)
+                if origin == me:
+                    stats['duplicates'] += 1
+                    continue
+                cursor.execute("SELECT 1 FROM change_log WHERE origin = ? AND origin_seq = ?", (origin, origin_seq))
+                if cursor.fetchone():
+                    stats['duplicates'] += 1
+                    continue
+
+                if entity == 'stock':
+                    winner = True
+                else:
+                    cursor.execute("""
+                        SELECT lamport, origin FROM change_log WHERE entity = ? AND entity_key = ?
+                        ORDER BY lamport DESC, origin DESC LIMIT 1
+                    """, (entity, key))
+                    current = cursor.fetchone()
+                    winner = current is None or (lamport, origin) > tuple(current)
+
+                # Logged even when superseded: it still has to be relayed and never re-applied
+                cursor.execute("""
+                    INSERT INTO change_log (origin, origin_seq, lamport, entity, entity_key, payload)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (origin, origin_seq, lamport, entity, key, payload))
+                if not winner:
+                    stats['superseded'] += 1
+                    continue
+
+                data = json.loads(payload)
+                if entity == 'stock':
+                    cursor.execute("""
+                        INSERT INTO branch_stock (qr_code, branch_id, quantity, updated_at) VALUES (?, ?, ?, ?)
+                        ON CONFLICT (qr_code, branch_id) DO UPDATE SET
+                            quantity = quantity + excluded.quantity,
+                            updated_at = excluded.updated_at
+                    """, (key, origin, data['delta'], now))
+                elif entity == 'product':
+                    values = [data.get(c) for c in _PRODUCT_COLUMNS]
+                    cursor.execute(f"""
+                        INSERT INTO products (qr_code, {', '.join(_PRODUCT_COLUMNS)})
+                        VALUES (?, {', '.join('?' * len(_PRODUCT_COLUMNS))})
+                        ON CONFLICT (qr_code) DO UPDATE SET
+                            {', '.join(f'{c} = excluded.{c}' for c in _PRODUCT_COLUMNS)},
+                            last_updated = CURRENT_TIMESTAMP
+                    """, (key, *values))
+                    cursor.execute("""
+                        INSERT OR IGNORE INTO stock (product_id, quantity_available)
+                        SELECT id, 0 FROM products WHERE qr_code = ?
+                    """, (key,))
+                    products += 1
+                elif entity == 'customer':
+                    cursor.execute("""
+                        INSERT INTO customers (mobile_number, full_name, address) VALUES (?, ?, ?)
+                        ON CONFLICT (mobile_number) DO UPDATE SET
+                            full_name = excluded.full_name,
+                            address = excluded.address
+                    """, (key, data.get('full_name'), data.get('address')))
+                else:
+                    logging.warning(f"Unknown sync entity {entity} from {origin}; logged, not applied.")
+                    continue
+                stats['applied'] += 1
+
+            cursor.execute("""
+                INSERT INTO sync_peers (peer_id, sent_seq, received_seq, last_sync) VALUES (?, ?, ?, ?)
+                ON CONFLICT (peer_id) DO UPDATE SET
+                    sent_seq = MAX(sent_seq, excluded.sent_seq),
+                    received_seq = MAX(received_seq, excluded.received_seq),
+                    last_sync = excluded.last_sync
+            """, (sender, batch.get('ack') or 0, top_seq, now))
+            cursor.execute("DELETE FROM sync_state WHERE key = 'applying'")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        logging.info(f"Sync from {sender}: {stats}")
+        if products:
+            # Other processes see the commit as 'db.changed'; this one is told directly
+            bus.publish('product.changed', product_ids=[])
+        return stats
+
+    @staticmethod
+    def _received_from(peer_id):
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT received_seq FROM sync_peers WHERE peer_id = ?", (peer_id,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _acknowledged(peer_id, seq):
+        """The peer confirmed it holds our log up to seq; the next batch starts after it."""
+        conn = db.get_connection()
+        conn.execute("UPDATE sync_peers SET sent_seq = MAX(sent_seq, ?) WHERE peer_id = ?", (seq, peer_id))
+        conn.commit()
+        conn.close()
+
+    # --- Batch files ---
+
+    @staticmethod
+    def export_batch(peer_id, out_dir=None):
+        """Writes data/sync/<me>_to_<peer>_<timestamp>.sbs, signed with sync_key, for carrying to the other shop."""
+        key = _sync_key()
+        batch = SyncService.build_batch(peer_id)
+        body = _pack(batch)
+        header = {'from': batch['from'], 'to': peer_id, 'signature': _signature(key, body)}
+        out_dir = out_dir or Config.SYNC_DIR
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{batch['from']}_to_{peer_id}_{time.strftime('%Y%m%d-%H%M%S')}.sbs")
+        with open(path, "wb") as f:
+            f.write(BATCH_MAGIC + b"\n" + json.dumps(header).encode("utf-8") + b"\n" + body)
+        logging.info(f"Sync batch for {peer_id}: {len(batch['changes'])} changes -> {path}")
+        return path, len(batch['changes'])
+
+    @staticmethod
+    def import_batch(path):
+        """Verifies the signature before anything is unpacked, then applies the batch."""
+        key = _sync_key()
+        with open(path, "rb") as f:
+            data = f.read()
+        parts = data.split(b"\n", 2)
+        if len(parts) != 3 or parts[0] != BATCH_MAGIC:
+            raise Exception(f"{os.path.basename(path)} is not a sync batch file.")
+        header = json.loads(parts[1])
+        body = parts[2]
+        if not hmac.compare_digest(header.get('signature', ''), _signature(key, body)):
+            raise Exception("Sync batch signature does not match; it was altered or signed with another sync_key.")
+        return SyncService.apply_batch(_unpack(body))
+
+    # --- Socket ---
+
+    @staticmethod
+    def serve(host="127.0.0.1", port=None, once=False):
+        """
+        Answers sync requests until interrupted. One exchange per connection: the client says who
+        it is, gets our batch, then sends its own. Every frame must carry the shared sync_key's
+        HMAC. Listens on this machine only unless a LAN/VPN address is given as `host`.
+        """
+        port = port or Config.SYNC_PORT
+        _sync_key()
+        with socket.create_server((host, port)) as server:
+            logging.info(f"Sync server listening on {host}:{port}")
+            while True:
+                sock, address = server.accept()
+                with sock:
+                    channel = None
+                    try:
+                        sock.settimeout(60)
+                        channel = _Channel(sock, server=True)
+                        hello = channel.recv()
+                        channel.send(SyncService.build_batch(hello['from']))
+                        stats = SyncService.apply_batch(channel.recv())
+                        channel.send({'ok': True, 'stats': stats, 'ack': SyncService._received_from(hello['from'])})
+                    except Exception as e:
+                        logging.error(f"Sync with {address[0]} failed: {e}")
+                        try:
+                            if channel:
+                                channel.send({'ok': False, 'error': str(e)})
+                        except OSError:
+                            pass
+                if once:
+                    return
+
+    @staticmethod
+    def sync_with(host, port=None, timeout=60):
+        """Two-way sync with a branch running `serve`. Returns (received stats, sent stats)."""
+        port = port or Config.SYNC_PORT
+        _sync_key()
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            channel = _Channel(sock, server=False)
+            channel.send({'from': SyncService.branch_id()})
+            incoming = channel.recv()
+            if 'changes' not in incoming:
+                raise Exception(f"Sync refused: {incoming.get('error')}")
+            received = SyncService.apply_batch(incoming)
+            channel.send(SyncService.build_batch(incoming['from']))
+            reply = channel.recv()
+            if not reply.get('ok'):
+                raise Exception(f"Peer could not apply our changes: {reply.get('error')}")
+            SyncService._acknowledged(incoming['from'], reply['ack'])
+            return received, reply['stats']
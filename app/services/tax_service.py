@@ -0,0 +1,213 @@
+import os
+import csv
+import time
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from app.config import Config
+from app.database import db
+from app.money import split, allocate, from_paise, to_paise
+from app.services.archive_service import ArchiveService
+from app.utils import month_bounds
+
+class TaxService:
+    """GST on GST-inclusive prices: each line's total is split into taxable value and CGST+SGST (or IGST)."""
+
+    # (by_hsn {hsn: rate}, by_category {category: (hsn, rate)}); loaded once per process
+    _rates = None
+
+    @staticmethod
+    def rates():
+        if TaxService._rates is None:
+            cursor = db.get_connection().cursor()
+            cursor.execute("SELECT hsn_code, category, gst_rate FROM tax_rates ORDER BY hsn_code")
+            by_hsn, by_category = {}, {}
+            for hsn, category, rate in cursor.fetchall():
+                by_hsn[hsn] = rate
+                if category:
+                    by_category.setdefault(category, (hsn, rate))
+            TaxService._rates = (by_hsn, by_category)
+        return TaxService._rates
+
+    @staticmethod
+    def invalidate():
+        TaxService._rates = None
+
+    @staticmethod
+    def list_rates():
+        cursor = db.get_connection().cursor()
+        cursor.execute("SELECT hsn_code, description, category, gst_rate, updated_at FROM tax_rates ORDER BY hsn_code")
+        return cursor.fetchall()
+
+    @staticmethod
+    def set_rate(hsn_code, gst_rate, description="", category=None):
+        """Adds or changes a rate; takes effect for this terminal immediately, others on restart."""
+        conn = db.get_connection()
+        conn.execute("""
+            INSERT INTO tax_rates (hsn_code, description, category, gst_rate, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(hsn_code) DO UPDATE SET description = excluded.description, category = excluded.category,
+                gst_rate = excluded.gst_rate, updated_at = excluded.updated_at
+        """, (hsn_code, description, category, gst_rate))
+        conn.commit()
+        conn.close()
+        TaxService.invalidate()
+
+    @staticmethod
+    def rate_for(hsn_code, category):
+        """(hsn_code, gst %) for a product: its own HSN, else its category's default, else DEFAULT_GST_RATE."""
+        by_hsn, by_category = TaxService.rates()
+        if hsn_code and hsn_code in by_hsn:
+            return hsn_code, by_hsn[hsn_code]
+        if category in by_category:
+            return by_category[category]
+        return hsn_code or "", Config.DEFAULT_GST_RATE
+
+    @staticmethod
+    def split_line(paise, rate, intra_state=True):
+        """Inclusive line paise -> (taxable, cgst, sgst, igst) in paise; the parts add back to the line."""
+        taxable = int((Decimal(paise) * 100 / (100 + Decimal(str(rate)))).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        tax = paise - taxable
+        if intra_state:
+            cgst, sgst = split(tax, 2)
+            return taxable, cgst, sgst, 0
+        return taxable, 0, 0, tax
+
+    @staticmethod
+    def is_intra_state(place_of_supply):
+        return not place_of_supply or not Config.GST_STATE_CODE or place_of_supply == Config.GST_STATE_CODE
+
+    @staticmethod
+    def compute(cursor, cart_items, line_paise, place_of_supply=None):
+        """
+        Breakup for a cart, read with the sale's cursor. Returns (lines, totals):
+        lines[i] = dict(hsn_code, gst_rate, taxable, cgst, sgst, igst) in paise, matching cart_items[i];
+        totals = dict(taxable, cgst, sgst, igst, tax) in paise.
+        """
+        ids = sorted({item['product_id'] for item in cart_items})
+        products = {}
+        if ids:
+            cursor.execute(f"SELECT id, hsn_code, category FROM products WHERE id IN ({','.join('?' * len(ids))})", ids)
+            products = {pid: (hsn, category) for pid, hsn, category in cursor.fetchall()}
+
+        intra = TaxService.is_intra_state(place_of_supply)
+        lines = []
+        totals = {'taxable': 0, 'cgst': 0, 'sgst': 0, 'igst': 0}
+        for item, paise in zip(cart_items, line_paise):
+            hsn, rate = TaxService.rate_for(*products.get(item['product_id'], (None, None)))
+            taxable, cgst, sgst, igst = TaxService.split_line(paise, rate, intra)
+            lines.append({'hsn_code': hsn, 'gst_rate': rate, 'taxable': taxable, 'cgst': cgst, 'sgst': sgst, 'igst': igst})
+            for key, value in (('taxable', taxable), ('cgst', cgst), ('sgst', sgst), ('igst', igst)):
+                totals[key] += value
+        totals['tax'] = totals['cgst'] + totals['sgst'] + totals['igst']
+        return lines, totals
+
+    @staticmethod
+    def summarize(lines):
+        """Per-rate breakup for printing: [(gst_rate, taxable, cgst, sgst, igst)] in paise, by rate."""
+        by_rate = {}
+        for line in lines:
+            acc = by_rate.setdefault(line['gst_rate'], [0, 0, 0, 0])
+            acc[0] += line['taxable']; acc[1] += line['cgst']; acc[2] += line['sgst']; acc[3] += line['igst']
+        return [(rate, *by_rate[rate]) for rate in sorted(by_rate)]
+
+    @staticmethod
+    def gstr1_export(year, month, out_dir=None):
+        """
+        GSTR-1 style B2CS, HSN and document summaries for one month, written as CSVs into
+        out_dir (default invoices/gst/GSTR1_YYYY-MM). Invoice lines are read in one streamed
+        pass; lines sold before the tax columns existed are split at today's rates.
+        Credit notes issued in the month are netted off. Returns (out_dir, totals in rupees).
+        """
+        month_start, month_end = month_bounds(year, month)
+        out_dir = out_dir or os.path.join(Config.INVOICE_DIR, "gst", f"GSTR1_{year}-{month:02d}")
+        os.makedirs(out_dir, exist_ok=True)
+
+        b2cs = {}   # (place_of_supply, rate) -> [taxable, cgst, sgst, igst]
+        hsn = {}    # (hsn, rate) -> [qty, value, taxable, cgst, sgst, igst]
+        invoices = set()
+        t0 = time.perf_counter()
+
+        def add(pos, hsn_code, rate, qty, value, taxable, cgst, sgst, igst, sign=1):
+            acc = b2cs.setdefault((pos or Config.GST_STATE_CODE, rate), [0, 0, 0, 0])
+            for i, v in enumerate((taxable, cgst, sgst, igst)):
+                acc[i] += sign * v
+            acc = hsn.setdefault((hsn_code, rate), [0, 0, 0, 0, 0, 0])
+            for i, v in enumerate((qty, value, taxable, cgst, sgst, igst)):
+                acc[i] += sign * v
+
+        def breakup(pos, item_hsn, item_rate, product_hsn, category, total, taxable, cgst, sgst, igst):
+            paise = to_paise(total or 0)
+            if item_rate is None:
+                item_hsn, item_rate = TaxService.rate_for(product_hsn, category)
+                return (item_hsn, item_rate, paise, *TaxService.split_line(paise, item_rate, TaxService.is_intra_state(pos)))
+            return (item_hsn, item_rate, paise, to_paise(taxable or 0), to_paise(cgst or 0), to_paise(sgst or 0), to_paise(igst or 0))
+
+        conn = ArchiveService.reporting_connection(month_start, month_end)
+        try:
+            cursor = conn.execute("""
+                SELECT i.invoice_no, i.place_of_supply, ii.hsn_code, ii.gst_rate, p.hsn_code, p.category,
+                       ii.quantity, ii.total_price, ii.taxable_value, ii.cgst, ii.sgst, ii.igst
+                FROM all_invoices i
+                JOIN all_invoice_items ii ON ii.invoice_no = i.invoice_no
+                LEFT JOIN products p ON p.id = ii.product_id
+                WHERE i.date >= ? AND i.date < ?
+            """, (month_start, month_end))
+            for invoice_no, pos, item_hsn, item_rate, product_hsn, category, qty, total, taxable, cgst, sgst, igst in cursor:
+                invoices.add(invoice_no)
+                item_hsn, item_rate, paise, *parts = breakup(pos, item_hsn, item_rate, product_hsn, category,
+                                                             total, taxable, cgst, sgst, igst)
+                add(pos, item_hsn, item_rate, qty, paise, *parts)
+
+            # Credit notes: the returned share of the original line, at the line's rate. A note's
+            # total is capped at what the invoice still had to credit, so its lines are scaled
+            # to that total before the tax split.
+            cursor = conn.execute("""
+                SELECT cn.credit_note_no, cn.total_amount, i.place_of_supply, ii.hsn_code, ii.gst_rate, p.hsn_code,
+                       p.category, cni.quantity, cni.total_price
+                FROM credit_notes cn
+                JOIN credit_note_items cni ON cni.credit_note_no = cn.credit_note_no
+                JOIN all_invoice_items ii ON ii.id = cni.invoice_item_id
+                JOIN all_invoices i ON i.invoice_no = ii.invoice_no
+                LEFT JOIN products p ON p.id = ii.product_id
+                WHERE cn.date >= ? AND cn.date < ?
+                ORDER BY cn.credit_note_no
+            """, (month_start, month_end))
+            notes = {}
+            for note_no, note_total, *line in cursor:
+                notes.setdefault((note_no, note_total), []).append(line)
+            credit_notes = sum(len(lines) for lines in notes.values())
+            for (_, note_total), lines in notes.items():
+                scaled = allocate(to_paise(note_total or 0), [to_paise(line[-1] or 0) for line in lines])
+                for (pos, item_hsn, item_rate, product_hsn, category, qty, _), paise in zip(lines, scaled):
+                    if item_rate is None:
+                        item_hsn, item_rate = TaxService.rate_for(product_hsn, category)
+                    add(pos, item_hsn, item_rate, qty, paise,
+                        *TaxService.split_line(paise, item_rate, TaxService.is_intra_state(pos)), sign=-1)
+        finally:
+            conn.close()
+
+        with open(os.path.join(out_dir, "b2cs.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Type", "Place Of Supply", "Rate", "Taxable Value", "Integrated Tax", "Central Tax", "State Tax"])
+            for (pos, rate), (taxable, cgst, sgst, igst) in sorted(b2cs.items()):
+                writer.writerow(["OE", pos, rate, from_paise(taxable), from_paise(igst), from_paise(cgst), from_paise(sgst)])
+
+        with open(os.path.join(out_dir, "hsn.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["HSN", "UQC", "Total Quantity", "Total Value", "Rate", "Taxable Value",
+                             "Integrated Tax", "Central Tax", "State Tax"])
+            for (hsn_code, rate), (qty, value, taxable, cgst, sgst, igst) in sorted(hsn.items()):
+                writer.writerow([hsn_code, "NOS-NUMBERS", qty, from_paise(value), rate, from_paise(taxable),
+                                 from_paise(igst), from_paise(cgst), from_paise(sgst)])
+
+        with open(os.path.join(out_dir, "docs.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Nature of Document", "Sr. No. From", "Sr. No. To", "Total Number", "Cancelled"])
+            if invoices:
+                writer.writerow(["Invoices for outward supply", min(invoices), max(invoices), len(invoices), 0])
+
+        taxable, cgst, sgst, igst = (sum(acc[i] for acc in b2cs.values()) for i in range(4))
+        totals = {'invoices': len(invoices), 'credit_note_lines': credit_notes, 'taxable': from_paise(taxable),
+                  'cgst': from_paise(cgst), 'sgst': from_paise(sgst), 'igst': from_paise(igst)}
+        logging.info(f"GSTR-1 {year}-{month:02d}: {len(invoices)} invoices -> {out_dir} ({time.perf_counter() - t0:.2f}s)")
+        return out_dir, totals
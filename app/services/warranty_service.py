@@ -0,0 +1,98 @@
+import re
+from datetime import date
+from app.database import db
+
+_LOOKUP_COLUMNS = """
+    w.serial_no, w.invoice_no, w.sale_date, w.expiry_date, w.status,
+    p.display_name, c.full_name, c.mobile_number
+"""
+
+def parse_serials(text):
+    """Serials as scanned into one field: separated by commas, spaces or new lines."""
+    return [s for s in re.split(r"[\s,;]+", text or "") if s]
+
+class WarrantyService:
+    """Index from a sold unit's serial/QR to its invoice, customer and warranty expiry."""
+
+    @staticmethod
+    def register_sale(cursor, customer_id, invoice_no, sale_date, cart_items):
+        """Runs inside the create_invoice transaction; registers every serial captured on the cart lines."""
+        if not any(item.get('serials') for item in cart_items):
+            return
+        cursor.execute("SELECT id FROM invoice_items WHERE invoice_no = ? ORDER BY id", (invoice_no,))
+        item_ids = [row[0] for row in cursor.fetchall()]
+        rows = []
+        for item_id, item in zip(item_ids, cart_items):
+            for serial in item.get('serials') or []:
+                rows.append((serial, invoice_no, item_id, customer_id, sale_date, sale_date, item['product_id']))
+        cursor.executemany("""
+            INSERT INTO warranty_registrations
+                (serial_no, invoice_no, invoice_item_id, customer_id, product_id, sale_date, expiry_date)
+            SELECT ?, ?, ?, ?, p.id, ?,
+                   CASE WHEN p.warranty_months > 0 THEN DATE(?, '+' || p.warranty_months || ' months') END
+            FROM products p WHERE p.id = ?
+        """, rows)
+
+    @staticmethod
+    def _describe(row, today):
+        serial, invoice_no, sale_date, expiry, status, product, customer, mobile = row
+        if status != 'active':
+            state, days_left = status.title(), None
+        elif not expiry:
+            state, days_left = "No Warranty", None
+        else:
+            days_left = (date.fromisoformat(expiry) - today).days
+            state = "In Warranty" if days_left >= 0 else "Expired"
+        return {
+            'serial_no': serial, 'invoice_no': invoice_no, 'sale_date': sale_date,
+            'expiry_date': expiry, 'state': state, 'days_left': days_left,
+            'product': product, 'customer': customer, 'mobile': mobile,
+        }
+
+    @staticmethod
+    def lookup(code):
+        """
+        Answers a claim from whatever was scanned: a unit serial/QR first, otherwise an
+        invoice number or a customer's mobile. Newest sale first; every path is an index seek.
+        """
+        code = (code or "").strip()
+        if not code:
+            return []
+        today = date.today()
+        cursor = db.get_connection().cursor()
+        cursor.execute(f"""
+            SELECT {_LOOKUP_COLUMNS}
+            FROM warranty_registrations w
+            LEFT JOIN products p ON p.id = w.product_id
+            LEFT JOIN customers c ON c.id = w.customer_id
+            WHERE w.serial_no = ?
+            ORDER BY w.sale_date DESC
+        """, (code,))
+        rows = cursor.fetchall()
+
+        if not rows:
+            from app.services.inventory_service import InventoryService
+            unit = InventoryService.get_unit(code)
+            if unit:
+                # Known unit that was never sold: not a valid claim
+                serial, _, status, invoice_no, received_at, product = unit
+                return [{
+                    'serial_no': serial, 'invoice_no': invoice_no or "-", 'sale_date': None,
+                    'expiry_date': None, 'state': f"Unsold ({status})", 'days_left': None,
+                    'product': product, 'customer': "-", 'mobile': "-",
+                }]
+
+            # Invoice number or mobile: answer from the purchase history (covers sales without serials)
+            column = "cp.invoice_no" if code.upper().startswith("INV-") else "c.mobile_number"
+            cursor.execute(f"""
+                SELECT NULL, cp.invoice_no, cp.sale_date, cp.warranty_expiry,
+                       CASE WHEN cp.returned_quantity >= cp.quantity THEN 'returned' ELSE 'active' END,
+                       cp.product_name, c.full_name, c.mobile_number
+                FROM customer_purchases cp
+                JOIN customers c ON c.id = cp.customer_id
+                WHERE {column} = ?
+                ORDER BY cp.sale_date DESC LIMIT 100
+            """, (code.upper() if column == "cp.invoice_no" else code,))
+            rows = cursor.fetchall()
+
+        return [WarrantyService._describe(row, today) for row in rows]
@@ -0,0 +1,257 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QFrame,
+                               QScrollArea, QGridLayout)
+from PySide6.QtCore import Qt
+from datetime import date, timedelta
+from app.services.analytics_service import AnalyticsService, GRAINS
+from app.services.cost_service import CostService, GROUPS
+from app.money import format_amount
+from app.ui.charts import BarChart
+from app.ui.event_bridge import EventBridge
+
+def _short_amount(value):
+    """Axis labels: ₹1.2L / ₹3.4Cr instead of full figures."""
+    if abs(value) >= 1e7:
+        return f"₹{value / 1e7:.1f}Cr"
+    if abs(value) >= 1e5:
+        return f"₹{value / 1e5:.1f}L"
+    if abs(value) >= 1e3:
+        return f"₹{value / 1e3:.1f}K"
+    return f"₹{value:.0f}"
+
+class AnalyticsScreen(QWidget):
+    def __init__(self, controller=None):
+        super().__init__()
+        self.controller = controller
+        self.dirty = True
+        self.setup_ui()
+        # Cubes change with every sale; redraw on the next visit rather than on every event
+        EventBridge.instance().event.connect(self.on_event)
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(30, 30, 30, 30)
+        self.main_layout.setSpacing(30)
+
+        # Header
+        header = QLabel("Sales Analytics")
+        header.setObjectName("SectionHeader")
+        self.main_layout.addWidget(header)
+
+        # Scroll Area
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QFrame.NoFrame)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setStyleSheet("background-color: transparent;")
+        self.main_layout.addWidget(scroll)
+
+        content = QWidget()
+        content.setStyleSheet("background-color: transparent;")
+        self.content_layout = QVBoxLayout(content)
+        self.content_layout.setSpacing(30)
+        scroll.setWidget(content)
+
+        # --- Section 1: Revenue ---
+        self.combo_grain = QComboBox()
+        for key, label in GRAINS.items():
+            self.combo_grain.addItem(label, key)
+        self.combo_grain.currentIndexChanged.connect(self.load_revenue)
+        self.chart_revenue = BarChart(_short_amount)
+        self.lbl_revenue = QLabel("")
+        self.lbl_revenue.setObjectName("Description")
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Revenue",
+            "Net sales after exchange deductions and credit notes.",
+            [("Period", self.combo_grain)],
+            footer_widget=self.lbl_revenue,
+            full_width_widget=self.chart_revenue
+        ))
+
+        # --- Section 2: Sales Mix ---
+        self.combo_dimension = QComboBox()
+        self.combo_dimension.addItem("By Brand", "brand")
+        self.combo_dimension.addItem("By Category", "category")
+        self.combo_dimension.currentIndexChanged.connect(self.load_mix)
+        self.combo_measure = QComboBox()
+        self.combo_measure.addItems(["Units", "Revenue"])
+        self.combo_measure.currentIndexChanged.connect(self.load_mix)
+        self.chart_mix = BarChart(str, horizontal=True)
+        self.chart_mix.setMinimumHeight(320)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Sales Mix",
+            "Best sellers over the last 12 months, net of returns.",
+            [("Group", self.combo_dimension), ("Measure", self.combo_measure)],
+            full_width_widget=self.chart_mix
+        ))
+
+        # --- Section 3: Exchange Trend ---
+        self.chart_exchange = BarChart(_short_amount)
+        self.lbl_exchange = QLabel("")
+        self.lbl_exchange.setObjectName("Description")
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Old Battery Exchange",
+            "Deductions given per month (bars) and their share of gross sales (line).",
+            [],
+            footer_widget=self.lbl_exchange,
+            full_width_widget=self.chart_exchange
+        ))
+
+        # --- Section 4: Top Customers ---
+        self.table_customers = QTableWidget(0, 5)
+        self.table_customers.setHorizontalHeaderLabels(["CUSTOMER", "MOBILE", "INVOICES", "LIFETIME SPEND", "LAST PURCHASE"])
+        self.table_customers.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_customers.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_customers.setMinimumHeight(300)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Top Customers",
+            "Highest lifetime spend, net of credit notes.",
+            [],
+            full_width_widget=self.table_customers
+        ))
+
+        # --- Section 5: Margins ---
+        self.combo_margin_group = QComboBox()
+        for key, label in GROUPS.items():
+            self.combo_margin_group.addItem(label, key)
+        self.combo_margin_group.currentIndexChanged.connect(self.show_margins)
+        self.combo_margin_period = QComboBox()
+        for label, days in (("Last 30 days", 30), ("Last 90 days", 90), ("Last 12 months", 365)):
+            self.combo_margin_period.addItem(label, days)
+        self.combo_margin_period.currentIndexChanged.connect(self.load_margins)
+        self.table_margins = QTableWidget(0, 6)
+        self.table_margins.setHorizontalHeaderLabels(["NAME", "UNITS", "REVENUE (EX-GST)", "COST", "PROFIT", "MARGIN"])
+        self.table_margins.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_margins.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_margins.setMinimumHeight(360)
+        self.lbl_margins = QLabel("")
+        self.lbl_margins.setObjectName("Description")
+        self.margin_report = {}
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Margins",
+            "Profit on each line at the average cost when it was sold, net of returns.",
+            [("Group", self.combo_margin_group), ("Period", self.combo_margin_period)],
+            footer_widget=self.lbl_margins,
+            full_width_widget=self.table_margins
+        ))
+
+    def create_card_section(self, title, desc, fields, footer_widget=None, full_width_widget=None):
+        card = QFrame()
+        card.setObjectName("Card")
+        card_layout = QHBoxLayout(card)
+        card_layout.setContentsMargins(30, 30, 30, 30)
+        card_layout.setSpacing(50)
+
+        # Left Column
+        left_col = QVBoxLayout()
+        h = QLabel(title)
+        h.setObjectName("SubHeader")
+        left_col.addWidget(h)
+
+        d = QLabel(desc)
+        d.setObjectName("Description")
+        d.setWordWrap(True)
+        left_col.addWidget(d)
+        left_col.addStretch()
+        card_layout.addLayout(left_col, 1)
+
+        # Right Column
+        right_col = QVBoxLayout()
+        if fields:
+            grid = QGridLayout()
+            grid.setSpacing(15)
+            for i, (label_text, widget) in enumerate(fields):
+                grid.addWidget(QLabel(label_text), i, 0)
+                grid.addWidget(widget, i, 1)
+            right_col.addLayout(grid)
+
+        if full_width_widget:
+            right_col.addWidget(full_width_widget)
+
+        if footer_widget:
+            right_col.addWidget(footer_widget)
+
+        card_layout.addLayout(right_col, 2)
+        return card
+
+    def on_event(self, topic, payload):
+        if topic in ('invoice.created', 'invoice.returned', 'db.changed'):
+            self.dirty = True
+
+    def on_show(self):
+        if self.dirty:
+            self.load_data()
+
+    def load_data(self):
+        self.load_revenue()
+        self.load_mix()
+        self.load_exchange()
+        self.load_customers()
+        self.load_margins()
+        self.dirty = False
+
+    def load_revenue(self):
+        rows = AnalyticsService.revenue(self.combo_grain.currentData())
+        # Day labels shortened to MM-DD, weeks to their Monday
+        self.chart_revenue.set_data([(label[5:] if len(label) == 10 else label, net) for label, net, _ in rows])
+        total = sum(net for _, net, _ in rows)
+        returns = sum(ret for _, _, ret in rows)
+        self.lbl_revenue.setText(f"{len(rows)} periods · net {format_amount(total)} · returns {format_amount(returns)}")
+
+    def load_mix(self):
+        rows = AnalyticsService.mix(self.combo_dimension.currentData())
+        if self.combo_measure.currentText() == "Revenue":
+            self.chart_mix.value_format = _short_amount
+            self.chart_mix.set_data([(name, revenue) for name, _, revenue in rows])
+        else:
+            self.chart_mix.value_format = str
+            self.chart_mix.set_data([(name, units) for name, units, _ in rows])
+
+    def load_exchange(self):
+        rows = AnalyticsService.exchange_trend()
+        self.chart_exchange.set_data([(month[2:], amount) for month, _, amount, _ in rows],
+                                     line=[share for _, _, _, share in rows])
+        count = sum(c for _, c, _, _ in rows)
+        amount = sum(a for _, _, a, _ in rows)
+        self.lbl_exchange.setText(f"{count} exchanges · {format_amount(amount)} deducted in 12 months")
+
+    def load_customers(self):
+        rows = AnalyticsService.top_customers()
+        self.table_customers.setRowCount(len(rows))
+        for r, (name, mobile, count, spend, last) in enumerate(rows):
+            for c, text in enumerate([name or "-", mobile, str(count), format_amount(spend), (last or "")[:10]]):
+                self.table_customers.setItem(r, c, QTableWidgetItem(text))
+
+    def load_margins(self):
+        today = date.today()
+        date_from = today - timedelta(days=self.combo_margin_period.currentData() - 1)
+        try:
+            self.margin_report = CostService.margins(date_from.isoformat(), today.isoformat())
+        except Exception as e:
+            self.margin_report = {}
+            self.lbl_margins.setText(str(e))
+            return
+        self.show_margins()
+
+    def show_margins(self):
+        rows = self.margin_report.get(self.combo_margin_group.currentData(), [])
+        self.table_margins.setRowCount(len(rows))
+        for r, (name, units, revenue, cost, profit, margin, _) in enumerate(rows):
+            for c, text in enumerate([name, str(units), format_amount(revenue), format_amount(cost),
+                                      format_amount(profit), f"{margin:.1f}%"]):
+                self.table_margins.setItem(r, c, QTableWidgetItem(text))
+        revenue = sum(row[2] for row in rows)
+        profit = sum(row[4] for row in rows)
+        uncosted = sum(row[6] for row in rows)
+        text = f"Profit {format_amount(profit)} on {format_amount(revenue)}"
+        if revenue:
+            text += f" ({100 * profit / revenue:.1f}%)"
+        if uncosted:
+            text += f" · {uncosted} unit(s) sold without a known cost left out"
+        self.lbl_margins.setText(text)
@@ -0,0 +1,71 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QStringListModel
+from app.money import format_amount
+
+PLACEHOLDER = "Select Product..."
+CART_HEADERS = ["PRODUCT", "QTY", "PRICE", "TOTAL"]
+
+class CatalogListModel(QStringListModel):
+    """
+    The product picker's rows: labels live in Qt's own string list, so the combo and the
+    completer's contains-filter never call back into Python per row, and the product id of
+    each row is kept alongside. Row 0 is the placeholder.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.ids = [None]
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.ids = [None, *(row.id for row in rows)]
+        self.setStringList([PLACEHOLDER, *(row.label for row in rows)])
+
+    def product_id(self, row):
+        return self.ids[row] if 0 < row < len(self.ids) else None
+
+class CartTableModel(QAbstractTableModel):
+    """
+    Invoice Items table over the screen's list of CartLine. Appends insert one row and a
+    quantity change repaints one row; nothing is copied into per-cell items.
+    """
+
+    def __init__(self, lines, parent=None):
+        super().__init__(parent)
+        self.lines = lines
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(CART_HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        line = self.lines[index.row()]
+        column = index.column()
+        if column == 0:
+            return line.product_name
+        if column == 1:
+            return str(line.qty)
+        return format_amount(line.selling_price if column == 2 else line.total)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return CART_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def append(self, line):
+        row = len(self.lines)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.lines.append(line)
+        self.endInsertRows()
+
+    def row_changed(self, row):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(CART_HEADERS) - 1))
+
+    def reset(self, lines=()):
+        self.beginResetModel()
+        self.lines[:] = lines
+        self.endResetModel()
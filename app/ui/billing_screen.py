@@ -1,14 +1,30 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                               QLineEdit, QComboBox, QPushButton, QTableWidget, 
-                               QTableWidgetItem, QHeaderView, QMessageBox, 
+                               QLineEdit, QComboBox, QPushButton, 
+                               QTableView, QHeaderView, QMessageBox, 
                                QRadioButton, QButtonGroup, QGridLayout, QScrollArea, QFrame, QCompleter)
-from PySide6.QtCore import Qt, QRegularExpression
-from PySide6.QtGui import QRegularExpressionValidator, QIntValidator
+from PySide6.QtCore import Qt, QRegularExpression, QTimer
+from PySide6.QtGui import QRegularExpressionValidator, QIntValidator, QDoubleValidator
 import os
 import logging
 from app.database import db
+from app import queries
 from app.services.invoice_service import InvoiceService
-from app.services.whatsapp_service import WhatsAppService
+from app.services.reservation_service import ReservationService
+from app.services.cart_service import CartService
+from app.services.product_service import ProductService
+from app.services.warranty_service import parse_serials
+from app.services.inventory_service import InventoryService
+from app.services.forecast_service import ForecastService
+from app.services.scrap_service import BATTERY_TYPES, GRADES
+from app.config import Config
+from app.models import CartLine
+from app.money import CartTotals, from_paise, to_paise, split, format_inr, format_amount
+from app.ui.billing_models import CatalogListModel, CartTableModel
+
+# Autosave fires once the cashier pauses this long; each keystroke only restarts the timer
+AUTOSAVE_MS = 700
+# Parked carts shown as one-click buttons in the header
+MAX_HELD_BUTTONS = 6
 
 class StepperWidget(QWidget):
     def __init__(self, steps):
@@ -61,10 +77,40 @@ class BillingScreen(QWidget):
         self.controller = controller
         self.invoice_service = InvoiceService()
         self.cart = []
+        # (product_id, unit price in paise) -> row, so a repeat scan bumps its line instead of adding one
+        self.cart_rows = {}
+        self.cart_model = CartTableModel(self.cart)
+        self.totals = CartTotals()
+        self.catalog = {}
+        self.catalog_model = CatalogListModel()
+        self.cart_id = ReservationService.new_cart_id()
         self.current_stock = 0
+        self.current_reorder_point = 0
         self.setup_ui()
+        self.refresh_facets()
         self.load_product_list()
 
+        # Keep this cart's stock holds alive while it is open
+        self.hold_timer = QTimer(self)
+        self.hold_timer.timeout.connect(self.extend_holds)
+        self.hold_timer.start(Config.RESERVATION_TTL_SECONDS * 1000 // 3)
+
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(AUTOSAVE_MS)
+        self.autosave_timer.timeout.connect(self.autosave)
+        for w in (self.entry_mobile, self.entry_name, self.entry_address, self.entry_ex_val,
+                  self.entry_ex_desc, self.entry_ex_count, self.entry_ex_weight):
+            w.textChanged.connect(self.schedule_autosave)
+        for combo in (self.combo_ex_type, self.combo_ex_grade):
+            combo.currentIndexChanged.connect(self.schedule_autosave)
+
+        # Pick up where this terminal left off before a restart
+        open_cart = CartService.latest_open()
+        if open_cart:
+            self.apply_cart_state(open_cart, CartService.load(open_cart))
+        self.refresh_held_bar()
+
     def setup_ui(self):
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(30, 30, 30, 30)
@@ -76,6 +122,8 @@ class BillingScreen(QWidget):
         header.setObjectName("SectionHeader")
         header_layout.addWidget(header)
         header_layout.addStretch()
+        self.held_bar = QHBoxLayout()
+        header_layout.addLayout(self.held_bar)
         self.main_layout.addLayout(header_layout)
 
         # Stepper
@@ -117,9 +165,17 @@ class BillingScreen(QWidget):
         self.entry_mobile.editingFinished.connect(self.on_mobile_leave)
 
         # --- Section 2: Product Addition ---
+        self.combo_brand = QComboBox()
+        self.combo_capacity = QComboBox()
+        self.combo_technology = QComboBox()
+        self.facet_combos = {'brand_name': (self.combo_brand, "All brands", "{}"),
+                             'capacity_ah': (self.combo_capacity, "Any capacity", "{:g} Ah"),
+                             'technology': (self.combo_technology, "Any type", "{}")}
         self.combo_product = QComboBox()
         self.combo_product.setEditable(True)
-        self.combo_completer = QCompleter()
+        self.combo_product.setInsertPolicy(QComboBox.NoInsert)
+        self.combo_product.setModel(self.catalog_model)
+        self.combo_completer = QCompleter(self.catalog_model, self)
         self.combo_completer.setFilterMode(Qt.MatchContains)
         self.combo_completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.combo_product.setCompleter(self.combo_completer)
@@ -127,14 +183,18 @@ class BillingScreen(QWidget):
         self.entry_price.setValidator(QIntValidator(0, 999999))
         self.entry_qty = QLineEdit("1")
         self.entry_qty.setValidator(QIntValidator(1, 999))
+        self.entry_serials = QLineEdit()
+        self.entry_serials.setPlaceholderText("Scan unit serial/QR (one per unit, comma separated)")
         
         self.content_layout.addWidget(self.create_card_section(
             "Product Choice", 
             "Select the battery or inverter model.",
             [
+                ("Filter", self.create_filter_row()),
                 ("Select Product*", self.combo_product),
                 ("Selling Price (₹)", self.entry_price),
                 ("Quantity", self.entry_qty),
+                ("Serial No(s)", self.entry_serials),
             ],
             footer_widget=self.create_product_footer()
         ))
@@ -142,14 +202,15 @@ class BillingScreen(QWidget):
         self.entry_qty.textChanged.connect(self.on_qty_change)
 
         # --- Section 3: Cart Table ---
-        self.table = QTableWidget(0, 4)
+        self.table = QTableView()
+        self.table.setModel(self.cart_model)
         self.content_layout.addWidget(self.create_card_section(
             "Invoice Items", 
             "Review items being added to the bill.",
             [], 
             full_width_widget=self.table
         ))
-        self.table.setHorizontalHeaderLabels(["PRODUCT", "QTY", "PRICE", "TOTAL"])
+        self.table.verticalHeader().hide()
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setMinimumHeight(200)
 
@@ -157,12 +218,26 @@ class BillingScreen(QWidget):
         self.entry_ex_val = QLineEdit("0")
         self.entry_ex_val.setValidator(QIntValidator(0, 999999))
         self.entry_ex_desc = QLineEdit()
+        self.entry_ex_desc.setPlaceholderText("Auto-filled from the scrap details if left blank")
+        self.entry_ex_count = QLineEdit("1")
+        self.entry_ex_count.setValidator(QIntValidator(1, 99))
+        self.combo_ex_type = QComboBox()
+        self.combo_ex_type.addItems(BATTERY_TYPES)
+        self.combo_ex_grade = QComboBox()
+        self.combo_ex_grade.addItems(GRADES)
+        self.entry_ex_weight = QLineEdit()
+        self.entry_ex_weight.setValidator(QDoubleValidator(0, 999, 2))
+        self.entry_ex_weight.setPlaceholderText("Per battery")
         
         self.content_layout.addWidget(self.create_card_section(
             "Finalization", 
-            "Apply deductions and generate the PDF invoice.",
+            "Apply deductions and generate the PDF invoice. Old batteries are added to the scrap yard.",
             [
                 ("Old Battery Value (Deduction)", self.entry_ex_val),
+                ("Old Batteries (Count)", self.entry_ex_count),
+                ("Scrap Type", self.combo_ex_type),
+                ("Scrap Grade", self.combo_ex_grade),
+                ("Weight (kg)", self.entry_ex_weight),
                 ("Deduction Note", self.entry_ex_desc),
             ],
             footer_widget=self.create_final_footer()
@@ -208,6 +283,15 @@ class BillingScreen(QWidget):
         card_layout.addLayout(right_col, 2)
         return card
 
+    def create_filter_row(self):
+        w = QWidget()
+        l = QHBoxLayout(w)
+        l.setContentsMargins(0, 0, 0, 0)
+        for combo, _, _ in self.facet_combos.values():
+            combo.currentIndexChanged.connect(self.on_filter_change)
+            l.addWidget(combo)
+        return w
+
     def create_product_footer(self):
         w = QWidget()
         l = QHBoxLayout(w)
@@ -230,7 +314,7 @@ class BillingScreen(QWidget):
         l.setContentsMargins(0, 20, 0, 0)
         
         total_row = QHBoxLayout()
-        self.lbl_total = QLabel("Total: ₹0.00")
+        self.lbl_total = QLabel(f"Total: {format_inr(0)}")
         self.lbl_total.setStyleSheet("font-size: 24px; font-weight: bold; color: #2196F3;")
         total_row.addWidget(self.lbl_total)
         total_row.addStretch()
@@ -241,8 +325,14 @@ class BillingScreen(QWidget):
         
         btn_cancel = QPushButton("Cancel")
         btn_cancel.setObjectName("Secondary")
-        btn_cancel.clicked.connect(lambda: self.controller.show_dashboard() if self.controller else None)
+        btn_cancel.clicked.connect(self.cancel_bill)
         btn_row.addWidget(btn_cancel)
+
+        btn_park = QPushButton("Park")
+        btn_park.setObjectName("Secondary")
+        btn_park.setToolTip("Hold this cart while the customer steps out and start a new one")
+        btn_park.clicked.connect(self.park_cart)
+        btn_row.addWidget(btn_park)
         
         btn_gen = QPushButton("Generate & Share")
         btn_gen.clicked.connect(self.generate_invoice)
@@ -252,38 +342,59 @@ class BillingScreen(QWidget):
         return w
 
     def load_data(self):
+        self.refresh_facets()
+        self.load_product_list()
+        self.refresh_held_bar()
+
+    def facet_filters(self):
+        return {column: combo.currentData() for column, (combo, _, _) in self.facet_combos.items()}
+
+    def refresh_facets(self):
+        """Refills the filter combos with the values that exist alongside the current selection."""
+        facets = ProductService.facets(**self.facet_filters())
+        for column, (combo, any_label, fmt) in self.facet_combos.items():
+            selected = combo.currentData()
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem(any_label, None)
+            for value, count in facets[column]:
+                combo.addItem(f"{fmt.format(value)} ({count})", value)
+            combo.setCurrentIndex(max(0, combo.findData(selected)))
+            combo.blockSignals(False)
+
+    def on_filter_change(self):
+        self.refresh_facets()
         self.load_product_list()
 
     def load_product_list(self):
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, brand_name, model_name, current_price, quantity_available FROM products JOIN stock ON products.id = stock.product_id WHERE products.is_active = 1")
-        self.products = cursor.fetchall()
-        self.prod_map = {}
-        self.combo_product.clear()
-        self.combo_product.addItem("Select Product...")
-        for p in self.products:
-            name = f"{p[1]} {p[2]} (₹{p[3]})"
-            self.prod_map[name] = p
-            self.combo_product.addItem(name)
-        
-        # Link completer to the updated combo list
-        if hasattr(self, 'combo_completer'):
-            self.combo_completer.setModel(self.combo_product.model())
+        rows = ProductService.product_list(**self.facet_filters())
+        self.catalog = {row.id: row for row in rows}
+        self.catalog_model.set_rows(rows)
+        self.combo_product.setCurrentIndex(0)
+
+    def selected_product(self):
+        """CatalogRow picked in the combo (by the id behind the item), or None."""
+        index = self.combo_product.currentIndex()
+        text = self.combo_product.currentText()
+        if index <= 0 or text != self.combo_product.itemText(index):
+            index = self.combo_product.findText(text) # Typed in full rather than picked
+        return self.catalog.get(self.catalog_model.product_id(index))
 
     def on_product_select(self):
-        name = self.combo_product.currentText()
-        if name in self.prod_map:
-            p = self.prod_map[name]
-            self.current_stock = p[4]
-            self.entry_price.setText(str(p[3]))
+        p = self.selected_product()
+        if p:
+            # Live figure: the cached list may be stale if another terminal sold or is holding units
+            self.current_stock = ReservationService.available(p.id, self.cart_id)
+            self.current_reorder_point = ForecastService.reorder_point(p.id)
+            self.entry_price.setText(str(p.price))
             self.update_stock_badge()
             self.on_qty_change()
             self.stepper.set_active_step(1)
 
     def update_stock_badge(self):
         self.lbl_stock_badge.show()
-        if self.current_stock > 10:
+        # Same line as the dashboard and stock screen: at or below the forecast reorder point is low
+        if self.current_stock > self.current_reorder_point:
             self.lbl_stock_badge.setText(f"IN STOCK: {self.current_stock}")
             self.lbl_stock_badge.setObjectName("BadgeSuccess")
         elif self.current_stock > 0:
@@ -308,7 +419,7 @@ class BillingScreen(QWidget):
         mobile = self.entry_mobile.text().strip()
         if len(mobile) == 10:
             cursor = db.get_connection().cursor()
-            cursor.execute("SELECT full_name, address FROM customers WHERE mobile_number = ?", (mobile,))
+            cursor.execute(queries.CUSTOMER_BY_MOBILE, (mobile,))
             row = cursor.fetchone()
             if row:
                 self.entry_name.setText(row[0])
@@ -316,39 +427,65 @@ class BillingScreen(QWidget):
             self.stepper.set_active_step(1)
 
     def add_to_cart(self):
-        name = self.combo_product.currentText()
-        if name not in self.prod_map: return
-        p = self.prod_map[name]
+        p = self.selected_product()
+        if not p: return
         try:
             qty = int(self.entry_qty.text())
             price = float(self.entry_price.text())
         except: return
+
+        serials = parse_serials(self.entry_serials.text())
+        if len(serials) > qty:
+            QMessageBox.warning(self, "Serial Numbers", f"{len(serials)} serials scanned for a quantity of {qty}.")
+            return
+        # Serials already in the cart for this product count towards its tracked units
+        lines = [line for line in self.cart if line.product_id == p.id]
+        in_cart = sum(line.qty for line in lines)
+        scanned = sum(len(line.serials) for line in lines)
+        required = InventoryService.serials_required(db.get_connection().cursor(), p.id, in_cart + qty) - scanned
+        if len(serials) < required:
+            QMessageBox.warning(self, "Serial Numbers", f"This product is tracked per unit. Scan {required} serial number(s).")
+            return
         
-        if qty > p[4]:
-            QMessageBox.warning(self, "Stock Warning", f"Only {p[4]} available!")
+        try:
+            ReservationService.reserve(self.cart_id, p.id, qty)
+        except Exception as e:
+            QMessageBox.warning(self, "Stock Warning", str(e))
             return
             
-        self.cart.append({
-            'product_id': p[0], 'product_name': f"{p[1]} {p[2]}",
-            'qty': qty, 'selling_price': price, 'total': qty * price
-        })
-        self.refresh_cart_table()
+        self.add_line(p.id, p.display_name, qty, price, serials)
+        self.entry_serials.clear()
+        self.update_total()
         self.stepper.set_active_step(2)
+        self.schedule_autosave()
+
+    def add_line(self, product_id, product_name, qty, price, serials):
+        """
+        Adds to the cart, merging with a line of the same product at the same price. Only that
+        row is redrawn; totals are adjusted by the one line.
+        """
+        row = self.cart_rows.get((product_id, to_paise(price)))
+        if row is None:
+            key, paise = self.totals.add(qty, price)
+            self.cart_rows[(product_id, to_paise(price))] = len(self.cart)
+            self.cart_model.append(CartLine(key, product_id, product_name, qty, price, from_paise(paise), serials))
+            return
+        line = self.cart[row]
+        line.qty += qty
+        line.serials.extend(serials)
+        line.total = from_paise(self.totals.update(line.key, line.qty, price))
+        self.cart_model.row_changed(row)
 
-    def refresh_cart_table(self):
-        self.table.setRowCount(len(self.cart))
-        for r, item in enumerate(self.cart):
-            self.table.setItem(r, 0, QTableWidgetItem(item['product_name']))
-            self.table.setItem(r, 1, QTableWidgetItem(str(item['qty'])))
-            self.table.setItem(r, 2, QTableWidgetItem(str(item['selling_price'])))
-            self.table.setItem(r, 3, QTableWidgetItem(f"₹{item['total']:.2f}"))
+    def clear_cart(self):
+        self.cart_rows.clear()
+        self.totals.clear()
+        self.cart_model.reset()
         self.update_total()
 
     def update_total(self):
-        subtotal = sum(i['total'] for i in self.cart)
-        try: d = float(self.entry_ex_val.text() or 0)
-        except: d = 0
-        self.lbl_total.setText(f"Grand Total: ₹{subtotal - d:,.2f}")
+        try: self.totals.set_deduction(self.entry_ex_val.text() or 0)
+        except Exception: self.totals.set_deduction(0)
+        self.lbl_total.setText(f"Grand Total: {format_inr(self.totals.grand_total)}")
         if self.cart:
             self.stepper.set_active_step(3)
 
@@ -360,18 +497,162 @@ class BillingScreen(QWidget):
             QMessageBox.warning(self, "Validation", "Need name and 10-digit mobile.")
             return
         
-        subtotal = sum(i['total'] for i in self.cart)
         try: ex_v = float(self.entry_ex_val.text() or 0)
         except: ex_v = 0
         
+        scrap = []
+        if ex_v > 0:
+            try: weight = float(self.entry_ex_weight.text() or 0)
+            except: weight = 0
+            if weight <= 0:
+                QMessageBox.warning(self, "Validation", "Enter the old battery weight for the scrap yard.")
+                return
+            count = int(self.entry_ex_count.text() or 1)
+            scrap = [{'battery_type': self.combo_ex_type.currentText(), 'grade': self.combo_ex_grade.currentText(),
+                      'weight_kg': weight, 'value': from_paise(value)} for value in split(to_paise(ex_v), count)]
+        
         try:
             inv_no, pdf_path = self.invoice_service.create_invoice(
                 {'name': name, 'mobile': mobile, 'address': self.entry_address.text()},
-                self.cart, {'amount': ex_v, 'description': self.entry_ex_desc.text()}
+                [line.as_item() for line in self.cart], {'amount': ex_v, 'description': self.entry_ex_desc.text(), 'scrap': scrap},
+                cart_id=self.cart_id, share=True
             )
-            QMessageBox.information(self, "Success", f"Invoice {inv_no} Generated!")
-            if os.path.exists(pdf_path): os.startfile(pdf_path)
-            self.cart = []; self.refresh_cart_table(); self.load_product_list()
+            if pdf_path:
+                QMessageBox.information(self, "Success", f"Invoice {inv_no} Generated!\nWhatsApp message queued.")
+                if os.path.exists(pdf_path): os.startfile(pdf_path)
+            else:
+                QMessageBox.warning(self, "Invoice Saved", f"Invoice {inv_no} is saved but its PDF could not be created.\n"
+                                                           "It will be generated again when the app next starts.")
+            self.clear_cart(); self.cart_id = ReservationService.new_cart_id()
+            self.load_product_list()
+            self.entry_ex_val.setText("0"); self.entry_ex_desc.clear(); self.entry_ex_weight.clear(); self.entry_ex_count.setText("1")
             self.stepper.set_active_step(0)
+            # The sale closed the saved cart; the cleared fields are not a new one
+            self.autosave_timer.stop()
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
+
+    def extend_holds(self):
+        if self.cart:
+            try: ReservationService.extend_cart(self.cart_id)
+            except Exception as e: logging.warning(f"Could not extend stock holds: {e}")
+
+    def cancel_bill(self):
+        self.autosave_timer.stop()
+        CartService.discard(self.cart_id)
+        if self.cart:
+            ReservationService.release_cart(self.cart_id)
+            self.clear_cart()
+            self.cart_id = ReservationService.new_cart_id()
+            self.stepper.set_active_step(0)
+        if self.controller:
+            self.controller.show_dashboard()
+
+    # --- Held Carts ---
+
+    def cart_state(self):
+        return {
+            'mobile': self.entry_mobile.text().strip(),
+            'name': self.entry_name.text().strip(),
+            'address': self.entry_address.text(),
+            'items': [line.as_item() for line in self.cart],
+            'exchange': {
+                'amount': self.entry_ex_val.text(), 'description': self.entry_ex_desc.text(),
+                'count': self.entry_ex_count.text(), 'type': self.combo_ex_type.currentText(),
+                'grade': self.combo_ex_grade.currentText(), 'weight': self.entry_ex_weight.text(),
+            },
+        }
+
+    def schedule_autosave(self, *_):
+        self.autosave_timer.start()
+
+    def autosave(self):
+        try:
+            CartService.save(self.cart_id, self.cart_state())
+        except Exception as e:
+            logging.warning(f"Cart autosave failed: {e}")
+
+    def hideEvent(self, event):
+        # Navigating away or closing: don't wait out the debounce
+        if self.autosave_timer.isActive():
+            self.autosave_timer.stop()
+            self.autosave()
+        super().hideEvent(event)
+
+    def park_cart(self):
+        state = self.cart_state()
+        if not state['items'] and not state['mobile']:
+            return
+        self.autosave_timer.stop()
+        try:
+            CartService.save(self.cart_id, state, status='held')
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        # The cart's stock holds stay until they expire, so the units are still there on resume
+        self.apply_cart_state(ReservationService.new_cart_id(), {})
+        self.refresh_held_bar()
+
+    def resume_cart(self, cart_id):
+        if cart_id == self.cart_id:
+            return
+        state = CartService.load(cart_id)
+        if state is None or not CartService.claim(cart_id):
+            QMessageBox.information(self, "Held Carts", "That cart was already resumed on another terminal.")
+            self.refresh_held_bar()
+            return
+        # Whatever is on screen is parked rather than lost
+        current = self.cart_state()
+        self.autosave_timer.stop()
+        if current['items'] or current['mobile']:
+            CartService.save(self.cart_id, current, status='held')
+        else:
+            CartService.discard(self.cart_id)
+        self.apply_cart_state(cart_id, state)
+        self.refresh_held_bar()
+
+    def apply_cart_state(self, cart_id, state):
+        """Puts a saved cart on screen under its own id, placing fresh stock holds for its lines."""
+        self.cart_id = cart_id
+        self.clear_cart()
+        self.entry_mobile.setText(state.get('mobile', ''))
+        self.entry_name.setText(state.get('name', ''))
+        self.entry_address.setText(state.get('address', ''))
+        ex = state.get('exchange', {})
+        self.entry_ex_val.setText(ex.get('amount') or "0")
+        self.entry_ex_desc.setText(ex.get('description', ''))
+        self.entry_ex_count.setText(ex.get('count') or "1")
+        self.combo_ex_type.setCurrentText(ex.get('type', BATTERY_TYPES[0]))
+        self.combo_ex_grade.setCurrentText(ex.get('grade', GRADES[0]))
+        self.entry_ex_weight.setText(ex.get('weight', ''))
+        self.entry_serials.clear()
+
+        dropped = []
+        if state.get('items'):
+            ReservationService.release_cart(cart_id)
+        for saved in state.get('items', []):
+            try:
+                ReservationService.reserve(cart_id, saved['product_id'], saved['qty'])
+            except Exception as e:
+                dropped.append(f"{saved['product_name']}: {e}")
+                continue
+            self.add_line(saved['product_id'], saved['product_name'], saved['qty'], saved['selling_price'],
+                          saved.get('serials') or [])
+        self.update_total()
+        self.stepper.set_active_step(2 if self.cart else 0)
+        self.autosave_timer.stop()
+        if dropped:
+            QMessageBox.warning(self, "Held Cart", "Some items are no longer available:\n" + "\n".join(dropped))
+            self.schedule_autosave()
+
+    def refresh_held_bar(self):
+        while self.held_bar.count():
+            widget = self.held_bar.takeAt(0).widget()
+            if widget:
+                widget.deleteLater()
+        for cart_id, name, mobile, count, total, updated_at, terminal in CartService.list_held()[:MAX_HELD_BUTTONS]:
+            btn = QPushButton(f"⏸ {name or mobile or 'Walk-in'} · {format_amount(total)}")
+            btn.setObjectName("Secondary")
+            btn.setToolTip(f"{count} item(s), parked at {(updated_at or '')[11:16]} on {terminal}. Click to resume.")
+            btn.clicked.connect(lambda _=False, c=cart_id: self.resume_cart(c))
+            self.held_bar.addWidget(btn)
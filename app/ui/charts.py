@@ -0,0 +1,81 @@
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QPainter, QColor, QPen
+from app.config import Config
+
+class BarChart(QWidget):
+    """
+    Minimal bar chart painted with QPainter: one bar per (label, value), an optional
+    line series on the same x axis, and the peak value on the y axis. Meant for the few
+    dozen to few hundred points the analytics cubes return.
+    """
+
+    def __init__(self, value_format=str, horizontal=False, parent=None):
+        super().__init__(parent)
+        self.value_format = value_format
+        self.horizontal = horizontal
+        self.points = []
+        self.line = []
+        self.setMinimumHeight(240)
+
+    def set_data(self, points, line=None):
+        """points: [(label, value)]; line: [value] aligned with points, drawn as a polyline."""
+        self.points = list(points)
+        self.line = list(line or [])
+        self.update()
+
+    def _colors(self):
+        palette = Config.PALETTES.get(Config.THEME, Config.PALETTES['light'])
+        return QColor(palette['accent']), QColor(palette['fg']), QColor(palette['danger'])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        bar_color, text_color, line_color = self._colors()
+        painter.setPen(text_color)
+        if not self.points:
+            painter.drawText(self.rect(), Qt.AlignCenter, "No data yet")
+            return
+        if self.horizontal:
+            self._paint_horizontal(painter, bar_color, text_color)
+        else:
+            self._paint_vertical(painter, bar_color, text_color, line_color)
+
+    def _paint_vertical(self, painter, bar_color, text_color, line_color):
+        left, top, bottom = 70, 10, 30
+        w = self.width() - left - 10
+        h = self.height() - top - bottom
+        peak = max([v for _, v in self.points] + [0]) or 1
+        step = w / len(self.points)
+
+        painter.drawText(QRectF(0, top - 6, left - 6, 14), Qt.AlignRight, self.value_format(peak))
+        painter.drawText(QRectF(0, top + h - 8, left - 6, 14), Qt.AlignRight, self.value_format(0))
+        painter.drawLine(left, top + h, left + w, top + h)
+
+        # Label every k-th bar so text never overlaps
+        every = max(1, int(70 // step) + 1)
+        for i, (label, value) in enumerate(self.points):
+            bar_h = h * max(value, 0) / peak
+            painter.fillRect(QRectF(left + i * step + step * 0.15, top + h - bar_h, step * 0.7, bar_h), bar_color)
+            if i % every == 0:
+                painter.drawText(QRectF(left + i * step - 30 + step / 2, top + h + 4, 60, 14), Qt.AlignCenter, str(label))
+
+        if self.line:
+            line_peak = max(self.line + [0]) or 1
+            painter.setPen(QPen(line_color, 2))
+            pts = [(left + i * step + step / 2, top + h - h * v / line_peak) for i, v in enumerate(self.line)]
+            for (x1, y1), (x2, y2) in zip(pts, pts[1:]):
+                painter.drawLine(int(x1), int(y1), int(x2), int(y2))
+
+    def _paint_horizontal(self, painter, bar_color, text_color):
+        left, right = 140, 100
+        w = self.width() - left - right
+        step = self.height() / len(self.points)
+        peak = max([v for _, v in self.points] + [0]) or 1
+        for i, (label, value) in enumerate(self.points):
+            y = i * step
+            painter.setPen(text_color)
+            painter.drawText(QRectF(0, y, left - 8, step), Qt.AlignRight | Qt.AlignVCenter, str(label))
+            bar_w = w * max(value, 0) / peak
+            painter.fillRect(QRectF(left, y + step * 0.2, bar_w, step * 0.6), bar_color)
+            painter.drawText(QRectF(left + bar_w + 6, y, right, step), Qt.AlignLeft | Qt.AlignVCenter, self.value_format(value))
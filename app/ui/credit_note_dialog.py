@@ -0,0 +1,96 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+                               QLineEdit, QComboBox, QPushButton, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QSpinBox, QMessageBox)
+from app.services.return_service import ReturnService
+from app.services.warranty_service import parse_serials
+from app.money import format_amount
+
+class CreditNoteDialog(QDialog):
+    """Return or replace goods from one invoice and issue the credit note."""
+
+    def __init__(self, invoice_no, parent=None):
+        super().__init__(parent)
+        self.invoice_no = invoice_no
+        self.setWindowTitle(f"Credit Note · {invoice_no}")
+        self.resize(820, 560)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        self.lbl_header = QLabel(invoice_no)
+        self.lbl_header.setObjectName("SubHeader")
+        layout.addWidget(self.lbl_header)
+
+        grid = QGridLayout()
+        grid.setSpacing(10)
+        self.combo_kind = QComboBox()
+        self.combo_kind.addItem("Return (back to stock)", "return")
+        self.combo_kind.addItem("Warranty Replacement (defective)", "replacement")
+        self.entry_reason = QLineEdit()
+        grid.addWidget(QLabel("Type"), 0, 0)
+        grid.addWidget(self.combo_kind, 0, 1)
+        grid.addWidget(QLabel("Reason"), 1, 0)
+        grid.addWidget(self.entry_reason, 1, 1)
+        layout.addLayout(grid)
+
+        self.table_items = QTableWidget(0, 5)
+        self.table_items.setHorizontalHeaderLabels(["PRODUCT", "SOLD", "RETURNED", "QTY", "SERIAL NO(S)"])
+        self.table_items.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table_items)
+
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        btn_cancel = QPushButton("Cancel")
+        btn_cancel.setObjectName("Secondary")
+        btn_cancel.clicked.connect(self.reject)
+        btn_row.addWidget(btn_cancel)
+        btn_issue = QPushButton("Issue Credit Note")
+        btn_issue.clicked.connect(self.issue)
+        btn_row.addWidget(btn_issue)
+        layout.addLayout(btn_row)
+
+        self.items = []
+        self.load_items()
+
+    def load_items(self):
+        header, self.items = ReturnService.get_returnable_items(self.invoice_no)
+        if not header:
+            self.lbl_header.setText(f"{self.invoice_no} not found")
+            return
+        date, name, mobile, final_amount = header
+        self.lbl_header.setText(f"{self.invoice_no} · {name or '-'} ({mobile or '-'}) · {date[:10]} · {format_amount(final_amount)}")
+
+        self.table_items.setRowCount(len(self.items))
+        for r, item in enumerate(self.items):
+            remaining = item['quantity'] - item['returned']
+            self.table_items.setItem(r, 0, QTableWidgetItem(item['product_name'] or ""))
+            self.table_items.setItem(r, 1, QTableWidgetItem(str(item['quantity'])))
+            self.table_items.setItem(r, 2, QTableWidgetItem(str(item['returned'])))
+            spin = QSpinBox()
+            spin.setRange(0, max(remaining, 0))
+            spin.setEnabled(remaining > 0)
+            self.table_items.setCellWidget(r, 3, spin)
+            # Pre-filled with the line's active serials; delete the ones the customer keeps
+            self.table_items.setItem(r, 4, QTableWidgetItem(", ".join(item['serials'])))
+
+    def issue(self):
+        lines = []
+        for r, item in enumerate(self.items):
+            qty = self.table_items.cellWidget(r, 3).value()
+            if qty:
+                cell = self.table_items.item(r, 4)
+                lines.append({'invoice_item_id': item['invoice_item_id'], 'qty': qty,
+                              'serials': parse_serials(cell.text() if cell else "")})
+        if not lines:
+            QMessageBox.warning(self, "Credit Note", "Set the quantity to return on at least one line.")
+            return
+        try:
+            credit_note_no, pdf_path, _ = ReturnService.create_credit_note(
+                self.invoice_no, lines, self.combo_kind.currentData(), self.entry_reason.text().strip()
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Credit Note", str(e))
+            return
+        QMessageBox.information(self, "Credit Note", f"Credit note {credit_note_no} issued.\nPDF: {pdf_path}")
+        self.accept()
@@ -1,8 +1,13 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, 
-                               QHeaderView, QFrame, QScrollArea, QGridLayout, QMessageBox)
+                               QHeaderView, QFrame, QScrollArea, QGridLayout, QMessageBox, QComboBox)
 from PySide6.QtCore import Qt
 from app.database import db
+from app import queries
+from app.services.customer_service import CustomerService
+from app.money import format_amount
+from app.services.campaign_service import CampaignService, COHORTS, next_month
+from datetime import date
 
 class CustomerScreen(QWidget):
     def __init__(self, controller=None):
@@ -63,6 +68,49 @@ class CustomerScreen(QWidget):
             [], 
             full_width_widget=self.table_customers
         ))
+        self.table_customers.itemSelectionChanged.connect(self.on_customer_select)
+
+        # --- Section 3: Customer Detail ---
+        self.lbl_invoice_count = QLabel("-")
+        self.lbl_lifetime = QLabel("-")
+        self.lbl_last_purchase = QLabel("-")
+        self.table_history = QTableWidget(0, 5)
+        self.table_history.setHorizontalHeaderLabels(["PRODUCT", "INVOICE #", "DATE", "QTY", "WARRANTY UNTIL"])
+        self.table_history.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_history.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_history.setMinimumHeight(250)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Purchase History", 
+            "Lifetime value and recent purchases of the selected customer, with warranty status.",
+            [
+                ("Invoices", self.lbl_invoice_count),
+                ("Lifetime Spend", self.lbl_lifetime),
+                ("Last Purchase", self.lbl_last_purchase)
+            ], 
+            full_width_widget=self.table_history
+        ))
+
+        # --- Section 4: Reminder Campaigns ---
+        self.combo_cohort = QComboBox()
+        for key, label in COHORTS.items():
+            self.combo_cohort.addItem(label, key)
+        self.combo_month = QComboBox()
+        year, month = date.today().year, date.today().month
+        for _ in range(3):
+            self.combo_month.addItem(f"{year}-{month:02d}", (year, month))
+            year, month = next_month(date(year, month, 1))
+        self.combo_month.setCurrentIndex(1)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Reminder Campaigns",
+            "Message every customer whose warranty ends, or whose free service check falls, in the chosen month.",
+            [
+                ("Campaign", self.combo_cohort),
+                ("Month", self.combo_month)
+            ],
+            footer_widget=self.create_campaign_footer()
+        ))
 
     def create_card_section(self, title, desc, fields, footer_widget=None, full_width_widget=None):
         card = QFrame()
@@ -120,10 +168,45 @@ class CustomerScreen(QWidget):
         l.addWidget(btn_new_bill)
         return w
 
+    def create_campaign_footer(self):
+        w = QWidget()
+        l = QHBoxLayout(w)
+        l.setContentsMargins(0, 10, 0, 0)
+        l.addStretch()
+
+        btn_export = QPushButton("Export Batch File")
+        btn_export.setObjectName("Secondary")
+        btn_export.clicked.connect(lambda: self.run_campaign(queue=False))
+        l.addWidget(btn_export)
+
+        btn_queue = QPushButton("Export && Queue WhatsApp")
+        btn_queue.clicked.connect(lambda: self.run_campaign(queue=True))
+        if not CampaignService.can_queue():
+            btn_queue.setEnabled(False)
+            btn_queue.setToolTip("The browser share transport opens a tab per message; "
+                                 "send campaigns from the exported batch file instead.")
+        l.addWidget(btn_queue)
+        return w
+
+    def run_campaign(self, queue):
+        cohort = self.combo_cohort.currentData()
+        year, month = self.combo_month.currentData()
+        if queue and QMessageBox.question(
+                self, "Reminder Campaign",
+                f"Queue WhatsApp messages for every customer in '{self.combo_cohort.currentText()}' ({year}-{month:02d})?"
+        ) != QMessageBox.Yes:
+            return
+        try:
+            path, count = CampaignService.export(cohort, year=year, month=month, queue=queue)
+        except Exception as e:
+            QMessageBox.critical(self, "Reminder Campaign", str(e))
+            return
+        QMessageBox.information(self, "Reminder Campaign", f"{count} customers written to:\n{path}")
+
     def load_data(self):
         conn = db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, full_name, mobile_number, address FROM customers ORDER BY full_name ASC")
+        cursor.execute(queries.CUSTOMER_LIST)
         rows = cursor.fetchall()
         self.render_table(rows)
 
@@ -141,14 +224,43 @@ class CustomerScreen(QWidget):
             self.load_data()
             return
             
-        cursor.execute("""
-            SELECT id, full_name, mobile_number, address FROM customers 
-            WHERE full_name LIKE ? OR mobile_number LIKE ?
-            ORDER BY full_name ASC
-        """, (f"%{query}%", f"%{query}%"))
+        cursor.execute(queries.CUSTOMER_SEARCH, (f"%{query}%", f"%{query}%"))
         rows = cursor.fetchall()
         self.render_table(rows)
 
+    def on_customer_select(self):
+        row = self.table_customers.currentRow()
+        id_item = self.table_customers.item(row, 0) if row >= 0 else None
+        if not id_item:
+            return
+        customer_id = int(id_item.text())
+
+        # Primary-key rollup + indexed top-N: same cost however long the history is
+        summary = CustomerService.get_summary(customer_id)
+        if summary:
+            count, spend, _, last = summary
+            self.lbl_invoice_count.setText(str(count))
+            self.lbl_lifetime.setText(format_amount(spend))
+            self.lbl_last_purchase.setText(last[:10] if last else "-")
+        else:
+            for lbl in (self.lbl_invoice_count, self.lbl_lifetime, self.lbl_last_purchase):
+                lbl.setText("-")
+
+        today = date.today().isoformat()
+        rows = CustomerService.get_recent_purchases(customer_id)
+        self.table_history.setRowCount(len(rows))
+        for r, (product, invoice_no, sale_date, qty, _, expiry) in enumerate(rows):
+            self.table_history.setItem(r, 0, QTableWidgetItem(str(product)))
+            self.table_history.setItem(r, 1, QTableWidgetItem(str(invoice_no)))
+            self.table_history.setItem(r, 2, QTableWidgetItem(sale_date[:10] if sale_date else ""))
+            self.table_history.setItem(r, 3, QTableWidgetItem(str(qty)))
+            if expiry:
+                item = QTableWidgetItem(f"{expiry} ({'Active' if expiry >= today else 'Expired'})")
+                if expiry < today: item.setForeground(Qt.red)
+            else:
+                item = QTableWidgetItem("No warranty")
+            self.table_history.setItem(r, 4, item)
+
     def start_bill_for_selected(self):
         row = self.table_customers.currentRow()
         if row < 0:
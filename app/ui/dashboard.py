@@ -1,11 +1,18 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QPushButton, QTableWidget, QTableWidgetItem, 
-                               QHeaderView, QFrame, QGridLayout, QScrollArea)
+                               QHeaderView, QFrame, QGridLayout, QScrollArea, QMessageBox)
 from PySide6.QtCore import Qt, Signal
 from app.database import db
+from app import queries
 from app.config import Config
+from app.money import format_amount
+from app.services.tax_service import TaxService
+from app.services.forecast_service import ForecastService
+from app.ui.event_bridge import EventBridge
 from datetime import datetime
 
+RECENT_INVOICES = 10
+
 class StatCard(QFrame):
     clicked = Signal()
 
@@ -48,7 +55,12 @@ class Dashboard(QWidget):
     def __init__(self, controller=None):
         super().__init__()
         self.controller = controller
+        self.loaded = False
+        # Set when a change arrived while another screen was up; the next on_show reloads
+        self.stale = False
+        self.latest_date = ''
         self.setup_ui()
+        EventBridge.instance().event.connect(self.on_event)
 
     def setup_ui(self):
         self.main_layout = QVBoxLayout(self)
@@ -76,7 +88,7 @@ class Dashboard(QWidget):
         
         self.card_sales = StatCard("Today's Sales", "₹0.00", "💰", "Based on 0 invoices")
         self.card_invoices = StatCard("Total Invoices", "0", "📄", "Cumulative count")
-        self.card_stock = StatCard("Low Stock Items", "0", "⚠️", "Requires attention", color="#DC3545")
+        self.card_stock = StatCard("Low Stock Items", "0", "⚠️", "At or below reorder point", color="#DC3545")
         self.card_products = StatCard("Total Products", "0", "📦", "In inventory")
 
         stats_layout.addWidget(self.card_sales, 0, 0)
@@ -147,6 +159,11 @@ class Dashboard(QWidget):
         btn_cust.setObjectName("Secondary")
         btn_cust.clicked.connect(lambda: self.controller.show_customers() if self.controller else None)
         act_v_layout.addWidget(btn_cust)
+
+        btn_gst = QPushButton("🧾 Export GSTR-1 (Last Month)")
+        btn_gst.setObjectName("Secondary")
+        btn_gst.clicked.connect(self.export_gstr1)
+        act_v_layout.addWidget(btn_gst)
         
         act_v_layout.addStretch()
         
@@ -156,42 +173,105 @@ class Dashboard(QWidget):
         self.content_layout.addLayout(tables_layout)
 
     def load_data(self):
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        """Full reload (first show and the Refresh button); afterwards events keep it current."""
+        ForecastService.refresh_stale()
+        self.refresh_stats()
+        self.refresh_stock_cards()
 
-        # Summary Stats
-        cursor.execute("SELECT COUNT(*) FROM invoices")
-        total_inv = cursor.fetchone()[0]
-        self.card_invoices.val_lbl.setText(str(total_inv))
+        # Recent Invoices Table
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.DASHBOARD_RECENT_INVOICES)
+        self.table_invoices.setRowCount(0)
+        for row in reversed(cursor.fetchall()):
+            self.prepend_invoice(row)
+        self.loaded = True
+        self.stale = False
 
-        cursor.execute("SELECT SUM(final_amount) FROM invoices WHERE DATE(date) = DATE('now')")
-        today_sales = cursor.fetchone()[0] or 0
-        self.card_sales.val_lbl.setText(f"₹{today_sales:,.2f}")
-        
-        cursor.execute("SELECT COUNT(*) FROM invoices WHERE DATE(date) = DATE('now')")
-        today_invoices_count = cursor.fetchone()[0] or 0
-        self.card_sales.sub_lbl.setText(f"Based on {today_invoices_count} invoices today")
-        
-        cursor.execute("SELECT COUNT(*) FROM stock JOIN products ON stock.product_id = products.id WHERE products.is_active = 1 AND stock.quantity_available < 10")
-        low_stock = cursor.fetchone()[0]
-        self.card_stock.val_lbl.setText(str(low_stock))
-        
-        cursor.execute("SELECT COUNT(*) FROM products WHERE is_active = 1")
-        total_prod = cursor.fetchone()[0]
-        self.card_products.val_lbl.setText(str(total_prod))
+    def on_show(self):
+        if not self.loaded or self.stale:
+            self.load_data()
 
-        # Recent Invoices Table
-        cursor.execute("""
-            SELECT i.invoice_no, c.full_name, i.final_amount, i.date
-            FROM invoices i 
-            JOIN customers c ON i.customer_id = c.id 
-            ORDER BY i.date DESC LIMIT 10
-        """)
-        invoices = cursor.fetchall()
-        self.table_invoices.setRowCount(len(invoices))
-        for r, row in enumerate(invoices):
-            self.table_invoices.setItem(r, 0, QTableWidgetItem(str(row[0])))
-            self.table_invoices.setItem(r, 1, QTableWidgetItem(str(row[1])))
-            self.table_invoices.setItem(r, 2, QTableWidgetItem(f"₹{row[2]:,.2f}"))
-            date_str = row[3][:10] if row[3] else ''
-            self.table_invoices.setItem(r, 3, QTableWidgetItem(date_str))
+    def refresh_stats(self):
+        """Sales and invoice cards: a few primary-key lookups on the aggregates."""
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.DASHBOARD_TOTAL_INVOICES)
+        self.total_invoices = cursor.fetchone()[0]
+        cursor.execute(queries.DASHBOARD_TODAY_SALES)
+        self.today_sales = cursor.fetchone()[0] or 0
+        cursor.execute(queries.DASHBOARD_TODAY_COUNT)
+        self.today_count = cursor.fetchone()[0] or 0
+        self.today = datetime.now().strftime("%Y-%m-%d")
+        self.show_stats()
+
+    def show_stats(self):
+        self.card_invoices.val_lbl.setText(str(self.total_invoices))
+        self.card_sales.val_lbl.setText(format_amount(self.today_sales))
+        self.card_sales.sub_lbl.setText(f"Based on {self.today_count} invoices today")
+
+    def refresh_stock_cards(self):
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.DASHBOARD_LOW_STOCK)
+        self.card_stock.val_lbl.setText(str(cursor.fetchone()[0]))
+        cursor.execute(queries.DASHBOARD_TOTAL_PRODUCTS)
+        self.card_products.val_lbl.setText(str(cursor.fetchone()[0]))
+
+    def prepend_invoice(self, row):
+        invoice_no, customer_name, final_amount, date = row
+        if self.table_invoices.findItems(str(invoice_no), Qt.MatchExactly):
+            return
+        self.table_invoices.insertRow(0)
+        self.table_invoices.setItem(0, 0, QTableWidgetItem(str(invoice_no)))
+        self.table_invoices.setItem(0, 1, QTableWidgetItem(str(customer_name)))
+        self.table_invoices.setItem(0, 2, QTableWidgetItem(format_amount(final_amount)))
+        self.table_invoices.setItem(0, 3, QTableWidgetItem(date[:10] if date else ''))
+        self.latest_date = max(self.latest_date, date or '')
+        while self.table_invoices.rowCount() > RECENT_INVOICES:
+            self.table_invoices.removeRow(self.table_invoices.rowCount() - 1)
+
+    def on_event(self, topic, payload):
+        """Applies one change to the cards and table instead of re-running every query."""
+        if not self.loaded:
+            return
+        if not self.isVisible():
+            self.stale = True
+            return
+        if datetime.now().strftime("%Y-%m-%d") != self.today:
+            self.refresh_stats()  # day rolled over: today's figures restart from the aggregate
+
+        if topic == 'invoice.created':
+            self.total_invoices += 1
+            if payload['date'][:10] == self.today:
+                self.today_sales += payload['final_amount']
+                self.today_count += 1
+            self.show_stats()
+            self.prepend_invoice((payload['invoice_no'], payload['customer_name'], payload['final_amount'], payload['date']))
+            ForecastService.refresh_stale()
+            self.refresh_stock_cards()
+        elif topic == 'invoice.returned':
+            if payload['date'][:10] == self.today:
+                self.today_sales -= payload['amount']
+                self.show_stats()
+            self.refresh_stock_cards()
+        elif topic in ('stock.changed', 'product.changed'):
+            self.refresh_stock_cards()
+        elif topic == 'db.changed':
+            # Another terminal: re-read the cheap aggregates and only the invoices newer than ours
+            self.refresh_stats()
+            self.refresh_stock_cards()
+            cursor = db.get_connection().cursor()
+            cursor.execute(queries.DASHBOARD_INVOICES_SINCE, (self.latest_date,))
+            # Oldest of the batch first, so the newest ends up on top
+            for row in reversed(cursor.fetchall()):
+                self.prepend_invoice(row)
+
+    def export_gstr1(self):
+        today = datetime.now()
+        year, month = (today.year - 1, 12) if today.month == 1 else (today.year, today.month - 1)
+        try:
+            out_dir, totals = TaxService.gstr1_export(year, month)
+        except Exception as e:
+            QMessageBox.warning(self, "GSTR-1", str(e))
+            return
+        QMessageBox.information(self, "GSTR-1",
+                                f"{year}-{month:02d}: {totals['invoices']} invoices, taxable {format_amount(totals['taxable'])}, "
+                                f"tax {format_amount(totals['cgst'] + totals['sgst'] + totals['igst'])}\n{out_dir}")
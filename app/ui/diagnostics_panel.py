@@ -0,0 +1,81 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView)
+from PySide6.QtCore import Qt
+from app.instrumentation import profiler
+
+class DiagnosticsPanel(QDialog):
+    """Hidden panel (Ctrl+Shift+D) showing the profiler's rolling histograms."""
+
+    COLUMNS = ["KIND", "NAME", "COUNT", "P50 ms", "P95 ms", "P99 ms", "MAX ms", "TOTAL ms", "ROWS"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(1100, 600)
+        self.setup_ui()
+        self.load_data()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        header = QLabel("Performance Diagnostics")
+        header.setObjectName("SubHeader")
+        layout.addWidget(header)
+
+        self.lbl_status = QLabel()
+        self.lbl_status.setObjectName("Description")
+        layout.addWidget(self.lbl_status)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        btn_row = QHBoxLayout()
+        self.btn_toggle = QPushButton()
+        self.btn_toggle.setObjectName("Secondary")
+        self.btn_toggle.clicked.connect(self.toggle_profiling)
+        btn_row.addWidget(self.btn_toggle)
+
+        btn_reset = QPushButton("Reset")
+        btn_reset.setObjectName("Secondary")
+        btn_reset.clicked.connect(self.reset)
+        btn_row.addWidget(btn_reset)
+
+        btn_row.addStretch()
+
+        btn_refresh = QPushButton("Refresh")
+        btn_refresh.clicked.connect(self.load_data)
+        btn_row.addWidget(btn_refresh)
+        layout.addLayout(btn_row)
+
+    def load_data(self):
+        state = "ON" if profiler.enabled else "OFF"
+        self.lbl_status.setText(f"Profiling {state} · slow queries (≥ {profiler.slow_query_ms:.0f} ms) logged to {profiler.slow_log_path}")
+        self.btn_toggle.setText("Disable Profiling" if profiler.enabled else "Enable Profiling")
+
+        rows = profiler.snapshot()
+        self.table.setRowCount(len(rows))
+        for r, (kind, name, s) in enumerate(rows):
+            values = [kind, name, str(s['count']), f"{s['p50']:.2f}", f"{s['p95']:.2f}",
+                      f"{s['p99']:.2f}", f"{s['max']:.2f}", f"{s['total_ms']:.1f}", str(s['rows'])]
+            for c, val in enumerate(values):
+                item = QTableWidgetItem(val)
+                if c >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(r, c, item)
+
+    def toggle_profiling(self):
+        if profiler.enabled:
+            profiler.disable()
+        else:
+            profiler.enable()
+        self.load_data()
+
+    def reset(self):
+        profiler.reset()
+        self.load_data()
@@ -0,0 +1,77 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer
+from app.config import Config
+from app.database import DatabaseManager
+from app.events import bus
+
+# Coalesces the burst of file notifications one commit produces
+SETTLE_MS = 250
+
+class EventBridge(QObject):
+    """
+    Re-emits bus events as a Qt signal (queued onto the GUI thread when published from a
+    worker), and turns other terminals' commits into 'db.changed'. The database file is
+    watched by the OS, so nothing runs while nobody writes; PRAGMA data_version then tells
+    a real commit apart from spurious notifications. data_version moves for any other
+    connection, this process's included, so every local commit runs through _local_commit,
+    which absorbs the version it produced unless someone else had committed first.
+    """
+    event = Signal(str, dict)
+
+    _instance = None
+
+    @staticmethod
+    def instance():
+        if EventBridge._instance is None:
+            EventBridge._instance = EventBridge()
+        return EventBridge._instance
+
+    def __init__(self, db_path=None):
+        super().__init__()
+        self.db_path = db_path or Config.DB_PATH
+        # One long-lived connection: data_version is per connection
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._seen_version = self._data_version()
+
+        self._settle = QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(SETTLE_MS)
+        self._settle.timeout.connect(self._check_external)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(lambda _: self._settle.start())
+        self._watch()
+
+        DatabaseManager.commit_hook = self._local_commit
+        bus.subscribe('*', self._on_local)
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _watch(self):
+        # The -wal file only exists in WAL mode; a replaced file drops out of the watch list
+        wanted = [p for p in (self.db_path, self.db_path + "-wal") if os.path.exists(p)]
+        missing = [p for p in wanted if p not in self._watcher.files()]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    @contextmanager
+    def _local_commit(self):
+        # Runs on whichever thread commits. If the version already moved, another terminal
+        # committed since the last check: leave it unseen so the watcher still reports it.
+        unchanged = self._data_version() == self._seen_version
+        yield
+        if unchanged:
+            self._seen_version = self._data_version()
+
+    def _on_local(self, topic, payload):
+        self.event.emit(topic, payload)
+
+    def _check_external(self):
+        self._watch()
+        version = self._data_version()
+        if version != self._seen_version:
+            self._seen_version = version
+            self.event.emit('db.changed', {})
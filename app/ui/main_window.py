@@ -1,8 +1,9 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QPushButton, QStackedWidget, QStatusBar, QFrame, QLabel, QFileDialog, QMessageBox)
 from PySide6.QtCore import Qt, QSize, QTimer
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QPixmap, QShortcut, QKeySequence
 from app.config import Config
+from app.instrumentation import profiler
 import os
 
 class MainWindow(QMainWindow):
@@ -14,6 +15,8 @@ class MainWindow(QMainWindow):
         self.nav_buttons = {}
         self.nav_history = []
         self.setup_ui()
+        # Hidden diagnostics panel
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.show_diagnostics)
         QTimer.singleShot(100, self.check_first_run)
 
     def check_first_run(self):
@@ -74,7 +77,10 @@ class MainWindow(QMainWindow):
         self.create_nav_button("New Bill", "🧾", self.show_billing)
         self.create_nav_button("Inventory", "📦", self.show_products)
         self.create_nav_button("Stock Ledger", "📊", self.show_stock)
+        self.create_nav_button("Analytics", "📈", self.show_analytics)
         self.create_nav_button("Customers", "👥", self.show_customers)
+        self.create_nav_button("Warranty", "🛡️", self.show_warranty)
+        self.create_nav_button("Scrap Yard", "♻️", self.show_scrap)
 
         sidebar_layout.addStretch()
         
@@ -158,9 +164,14 @@ class MainWindow(QMainWindow):
     def refresh_current_screen(self):
         screen = self.stack.currentWidget()
         if screen and hasattr(screen, 'load_data'):
-            screen.load_data()
+            with profiler.phase(f"screen.{type(screen).__name__}.load"):
+                screen.load_data()
             self.status_bar.showMessage("Data Refreshed", 3000)
 
+    def show_diagnostics(self):
+        from app.ui.diagnostics_panel import DiagnosticsPanel
+        DiagnosticsPanel(self).exec()
+
     def open_invoices_folder(self):
         import os
         from app.config import Config
@@ -189,11 +200,26 @@ class MainWindow(QMainWindow):
         from app.ui.stock_screen import StockScreen
         self._switch_screen("stock", StockScreen, is_back)
 
+    def show_analytics(self, is_back=False):
+        self.set_active_nav("Analytics")
+        from app.ui.analytics_screen import AnalyticsScreen
+        self._switch_screen("analytics", AnalyticsScreen, is_back)
+
     def show_customers(self, is_back=False):
         self.set_active_nav("Customers")
         from app.ui.customer_screen import CustomerScreen
         self._switch_screen("customers", CustomerScreen, is_back)
 
+    def show_warranty(self, is_back=False):
+        self.set_active_nav("Warranty")
+        from app.ui.warranty_screen import WarrantyScreen
+        self._switch_screen("warranty", WarrantyScreen, is_back)
+
+    def show_scrap(self, is_back=False):
+        self.set_active_nav("Scrap Yard")
+        from app.ui.scrap_screen import ScrapScreen
+        self._switch_screen("scrap", ScrapScreen, is_back)
+
     def go_back(self):
         if len(self.nav_history) > 1:
             self.nav_history.pop() # remove current screen
@@ -204,7 +230,10 @@ class MainWindow(QMainWindow):
                 "billing": self.show_billing,
                 "products": self.show_products,
                 "stock": self.show_stock,
-                "customers": self.show_customers
+                "analytics": self.show_analytics,
+                "customers": self.show_customers,
+                "warranty": self.show_warranty,
+                "scrap": self.show_scrap
             }
             if prev_key in nav_map:
                 nav_map[prev_key](is_back=True)
@@ -227,5 +256,10 @@ class MainWindow(QMainWindow):
         
         self.stack.setCurrentWidget(self.screens[key])
         
-        if hasattr(self.screens[key], 'load_data'):
-            self.screens[key].load_data()
+        # Live screens keep themselves current from change events; the rest reload on every visit
+        if hasattr(self.screens[key], 'on_show'):
+            with profiler.phase(f"screen.{widget_class.__name__}.show"):
+                self.screens[key].on_show()
+        elif hasattr(self.screens[key], 'load_data'):
+            with profiler.phase(f"screen.{widget_class.__name__}.load"):
+                self.screens[key].load_data()
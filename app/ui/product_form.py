@@ -2,8 +2,10 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QLineEdit, QComboBox, QPushButton, QFrame, 
                                QScrollArea, QGridLayout, QMessageBox)
 from PySide6.QtCore import Qt, QRegularExpression
-from PySide6.QtGui import QRegularExpressionValidator, QIntValidator
+from PySide6.QtGui import QRegularExpressionValidator, QIntValidator, QDoubleValidator
 from app.database import db
+from app.attributes import TECHNOLOGIES, parse_attributes
+from app.events import bus
 
 class ProductForm(QWidget):
     def __init__(self, controller=None):
@@ -41,13 +43,17 @@ class ProductForm(QWidget):
         self.entry_qr.setPlaceholderText("Scan or enter QR Code")
         self.entry_category = QComboBox()
         self.entry_category.addItems(["Battery", "Inverter", "Solar Panel", "Cable", "Other"])
+        self.entry_hsn = QLineEdit()
+        self.entry_hsn.setValidator(QRegularExpressionValidator(QRegularExpression(r"^\d{0,8}$")))
+        self.entry_hsn.setPlaceholderText("Blank = category default")
         
         self.content_layout.addWidget(self.create_card_section(
             "Product Identity", 
             "Enter the tracking and classification details for this item.",
             [
                 ("QR Code*", self.entry_qr),
-                ("Category*", self.entry_category)
+                ("Category*", self.entry_category),
+                ("HSN Code", self.entry_hsn)
             ]
         ))
 
@@ -58,14 +64,25 @@ class ProductForm(QWidget):
         self.entry_warranty = QLineEdit()
         self.entry_warranty.setValidator(QIntValidator(0, 999))
         self.entry_warranty.setPlaceholderText("Months")
+        self.entry_capacity = QLineEdit()
+        self.entry_capacity.setValidator(QDoubleValidator(0, 9999, 1))
+        self.entry_capacity.setPlaceholderText("Blank = read from model name")
+        self.entry_voltage = QLineEdit()
+        self.entry_voltage.setValidator(QDoubleValidator(0, 999, 1))
+        self.entry_voltage.setPlaceholderText("Blank = read from model name")
+        self.entry_technology = QComboBox()
+        self.entry_technology.addItems(["", *TECHNOLOGIES])
         
         self.content_layout.addWidget(self.create_card_section(
             "Model Specification", 
-            "Specify the manufacturer, model name, and warranty period.",
+            "Specify the manufacturer, model name, warranty period and the attributes billing filters on.",
             [
                 ("Brand Name*", self.entry_brand),
                 ("Model Name*", self.entry_model),
-                ("Warranty (Months)", self.entry_warranty)
+                ("Warranty (Months)", self.entry_warranty),
+                ("Capacity (Ah)", self.entry_capacity),
+                ("Voltage (V)", self.entry_voltage),
+                ("Technology", self.entry_technology)
             ]
         ))
 
@@ -74,13 +91,17 @@ class ProductForm(QWidget):
         self.entry_price.setValidator(QIntValidator(0, 999999))
         self.entry_stock = QLineEdit("0")
         self.entry_stock.setValidator(QIntValidator(0, 9999))
+        self.entry_cost = QLineEdit()
+        self.entry_cost.setValidator(QIntValidator(0, 999999))
+        self.entry_cost.setPlaceholderText("Pre-GST; blank = keep average")
         
         self.content_layout.addWidget(self.create_card_section(
             "Inventory & Pricing", 
-            "Set the current market price and initial stock level.",
+            "Set the current market price, initial stock level and its unit cost. Receiving units keeps the cost averaged.",
             [
                 ("Current Price (₹)*", self.entry_price),
-                ("Opening Stock", self.entry_stock)
+                ("Opening Stock", self.entry_stock),
+                ("Purchase Price (₹)", self.entry_cost)
             ],
             footer_widget=self.create_form_footer()
         ))
@@ -147,6 +168,7 @@ class ProductForm(QWidget):
         cat = self.entry_category.currentText()
         brand = self.entry_brand.text().strip()
         model = self.entry_model.text().strip()
+        hsn = self.entry_hsn.text().strip() or None
         
         if not qr or not brand or not model:
             QMessageBox.warning(self, "Validation", "Please fill mandatory fields (*)")
@@ -156,6 +178,11 @@ class ProductForm(QWidget):
             warranty = int(self.entry_warranty.text() or 0)
             price = float(self.entry_price.text() or 0)
             opening_stock = int(self.entry_stock.text() or 0)
+            cost = float(self.entry_cost.text()) if self.entry_cost.text() else None
+            capacity, voltage, technology = parse_attributes(model)
+            capacity = float(self.entry_capacity.text()) if self.entry_capacity.text() else capacity
+            voltage = float(self.entry_voltage.text()) if self.entry_voltage.text() else voltage
+            technology = self.entry_technology.currentText() or technology
         except:
             QMessageBox.warning(self, "Error", "Numeric fields are invalid.")
             return
@@ -163,22 +190,31 @@ class ProductForm(QWidget):
         conn = db.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("SELECT id FROM products WHERE qr_code = ?", (qr,))
+            cursor.execute("SELECT id, current_price FROM products WHERE qr_code = ?", (qr,))
             existing = cursor.fetchone()
             if existing:
+                if round(existing[1] or 0, 2) != round(price, 2):
+                    cursor.execute("INSERT INTO price_history (product_id, old_price, new_price, reason) VALUES (?, ?, ?, ?)",
+                                   (existing[0], existing[1], price, "Product form"))
                 cursor.execute("""
                     UPDATE products 
-                    SET category = ?, brand_name = ?, model_name = ?, warranty_months = ?, current_price = ?, is_active = 1
+                    SET category = ?, brand_name = ?, model_name = ?, warranty_months = ?, current_price = ?, hsn_code = ?,
+                        capacity_ah = ?, voltage = ?, technology = ?, is_active = 1
                     WHERE id = ?
-                """, (cat, brand, model, warranty, price, existing[0]))
+                """, (cat, brand, model, warranty, price, hsn, capacity, voltage, technology, existing[0]))
+                pid = existing[0]
+                if cost is not None:
+                    cursor.execute("UPDATE products SET current_purchase_price = ? WHERE id = ?", (cost, pid))
             else:
                 cursor.execute("""
-                    INSERT INTO products (qr_code, category, brand_name, model_name, warranty_months, current_price)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (qr, cat, brand, model, warranty, price))
+                    INSERT INTO products (qr_code, category, brand_name, model_name, warranty_months, current_price, hsn_code,
+                                          current_purchase_price, capacity_ah, voltage, technology)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (qr, cat, brand, model, warranty, price, hsn, cost or 0, capacity, voltage, technology))
                 pid = cursor.lastrowid
                 cursor.execute("INSERT INTO stock (product_id, quantity_available) VALUES (?, ?)", (pid, opening_stock))
             conn.commit()
+            bus.publish('product.changed', product_ids=[pid])
             QMessageBox.information(self, "Success", "Product Saved!")
             self.clear_form()
         except Exception as e:
@@ -202,6 +238,7 @@ class ProductForm(QWidget):
                 pid = row[0]
                 cursor.execute("UPDATE products SET is_active = 0 WHERE id = ?", (pid,))
                 conn.commit()
+                bus.publish('product.changed', product_ids=[pid])
                 QMessageBox.information(self, "Deleted", "Product has been archived and removed from active lists.")
                 self.clear_form()
             else:
@@ -210,10 +247,12 @@ class ProductForm(QWidget):
             QMessageBox.critical(self, "Error", str(e))
 
     def clear_form(self):
-        for w in [self.entry_qr, self.entry_brand, self.entry_model, self.entry_warranty, self.entry_price]:
+        for w in [self.entry_qr, self.entry_hsn, self.entry_brand, self.entry_model, self.entry_warranty, self.entry_price, self.entry_cost,
+                  self.entry_capacity, self.entry_voltage]:
             w.clear()
         self.entry_stock.setText("0")
         self.entry_category.setCurrentIndex(0)
+        self.entry_technology.setCurrentIndex(0)
 
     def load_data(self):
         self.clear_form()
@@ -0,0 +1,80 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+                               QLineEdit, QPlainTextEdit, QPushButton, QMessageBox)
+from PySide6.QtGui import QIntValidator
+from app.services.inventory_service import InventoryService
+from app.services.warranty_service import parse_serials
+
+class ReceiveUnitsDialog(QDialog):
+    """Bulk-receive serialized units for one product from a barcode scanner."""
+
+    def __init__(self, product_id, product_name, parent=None):
+        super().__init__(parent)
+        self.product_id = product_id
+        self.setWindowTitle(f"Receive Units · {product_name}")
+        self.resize(520, 560)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        title = QLabel(product_name)
+        title.setObjectName("SubHeader")
+        layout.addWidget(title)
+
+        grid = QGridLayout()
+        grid.setSpacing(10)
+        self.entry_distributor = QLineEdit()
+        self.entry_price = QLineEdit()
+        self.entry_price.setValidator(QIntValidator(0, 999999))
+        grid.addWidget(QLabel("Distributor"), 0, 0)
+        grid.addWidget(self.entry_distributor, 0, 1)
+        grid.addWidget(QLabel("Purchase Price (₹, pre-GST)"), 1, 0)
+        grid.addWidget(self.entry_price, 1, 1)
+        self.entry_lead_time = QLineEdit()
+        self.entry_lead_time.setValidator(QIntValidator(0, 365))
+        self.entry_lead_time.setPlaceholderText("Days from order to delivery")
+        grid.addWidget(QLabel("Lead Time"), 2, 0)
+        grid.addWidget(self.entry_lead_time, 2, 1)
+        layout.addLayout(grid)
+
+        desc = QLabel("Scan each unit's serial/QR. One per line.")
+        desc.setObjectName("Description")
+        layout.addWidget(desc)
+
+        self.text_serials = QPlainTextEdit()
+        self.text_serials.textChanged.connect(self.update_count)
+        layout.addWidget(self.text_serials)
+
+        btn_row = QHBoxLayout()
+        self.lbl_count = QLabel("0 units")
+        btn_row.addWidget(self.lbl_count)
+        btn_row.addStretch()
+        btn_cancel = QPushButton("Cancel")
+        btn_cancel.setObjectName("Secondary")
+        btn_cancel.clicked.connect(self.reject)
+        btn_row.addWidget(btn_cancel)
+        btn_save = QPushButton("Receive")
+        btn_save.clicked.connect(self.save)
+        btn_row.addWidget(btn_save)
+        layout.addLayout(btn_row)
+
+        self.text_serials.setFocus()
+
+    def serials(self):
+        return list(dict.fromkeys(parse_serials(self.text_serials.toPlainText())))
+
+    def update_count(self):
+        self.lbl_count.setText(f"{len(self.serials())} units")
+
+    def save(self):
+        try:
+            count = InventoryService.receive_units(
+                self.product_id, self.serials(),
+                self.entry_distributor.text().strip(), float(self.entry_price.text() or 0),
+                int(self.entry_lead_time.text()) if self.entry_lead_time.text() else None
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Receive Units", str(e))
+            return
+        QMessageBox.information(self, "Receive Units", f"{count} units added to stock.")
+        self.accept()
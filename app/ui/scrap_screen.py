@@ -0,0 +1,209 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+                               QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QFrame, QScrollArea, QGridLayout, QMessageBox)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QDoubleValidator
+from app.services.scrap_service import ScrapService, BATTERY_TYPES, GRADES
+from app.money import format_amount
+
+class ScrapScreen(QWidget):
+    def __init__(self, controller=None):
+        super().__init__()
+        self.controller = controller
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(30, 30, 30, 30)
+        self.main_layout.setSpacing(30)
+
+        # Header
+        header = QLabel("Scrap Yard")
+        header.setObjectName("SectionHeader")
+        self.main_layout.addWidget(header)
+
+        # Scroll Area
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QFrame.NoFrame)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setStyleSheet("background-color: transparent;")
+        self.main_layout.addWidget(scroll)
+
+        content = QWidget()
+        content.setStyleSheet("background-color: transparent;")
+        self.content_layout = QVBoxLayout(content)
+        self.content_layout.setSpacing(30)
+        scroll.setWidget(content)
+
+        # --- Section 1: Running Totals ---
+        self.table_totals = QTableWidget(0, 7)
+        self.table_totals.setHorizontalHeaderLabels(["TYPE", "GRADE", "IN YARD", "WEIGHT (KG)", "VALUE PAID", "DISPOSED", "DISPOSED (KG)"])
+        self.table_totals.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_totals.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_totals.setMinimumHeight(200)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Yard Totals",
+            "Old batteries taken in on exchange, by type and grade.",
+            [],
+            full_width_widget=self.table_totals
+        ))
+
+        # --- Section 2: Units in Yard ---
+        self.combo_type = QComboBox()
+        self.combo_type.addItems(["All"] + BATTERY_TYPES)
+        self.combo_type.currentIndexChanged.connect(self.load_yard)
+        self.combo_grade = QComboBox()
+        self.combo_grade.addItems(["All"] + GRADES)
+        self.combo_grade.currentIndexChanged.connect(self.load_yard)
+
+        self.table_yard = QTableWidget(0, 6)
+        self.table_yard.setHorizontalHeaderLabels(["ID", "RECEIVED", "INVOICE #", "TYPE", "GRADE", "WEIGHT (KG)"])
+        self.table_yard.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_yard.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_yard.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table_yard.setSelectionMode(QTableWidget.ExtendedSelection)
+        self.table_yard.setMinimumHeight(300)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "In Yard",
+            "Select the units going out, or leave none selected to send everything shown.",
+            [
+                ("Type", self.combo_type),
+                ("Grade", self.combo_grade),
+            ],
+            full_width_widget=self.table_yard
+        ))
+
+        # --- Section 3: Disposal Batch ---
+        self.entry_recycler = QLineEdit()
+        self.entry_rate = QLineEdit()
+        self.entry_rate.setValidator(QDoubleValidator(0, 9999, 2))
+        self.entry_notes = QLineEdit()
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Disposal Batch",
+            "Sell the selected scrap to a recycler in one batch.",
+            [
+                ("Recycler*", self.entry_recycler),
+                ("Rate per kg (₹)*", self.entry_rate),
+                ("Notes", self.entry_notes),
+            ],
+            footer_widget=self.create_batch_footer()
+        ))
+
+        # --- Section 4: Batch History ---
+        self.table_batches = QTableWidget(0, 7)
+        self.table_batches.setHorizontalHeaderLabels(["BATCH #", "DATE", "RECYCLER", "UNITS", "WEIGHT (KG)", "RATE", "AMOUNT"])
+        self.table_batches.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_batches.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_batches.setMinimumHeight(200)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Batch History",
+            "Most recent disposal first.",
+            [],
+            full_width_widget=self.table_batches
+        ))
+
+    def create_card_section(self, title, desc, fields, footer_widget=None, full_width_widget=None):
+        card = QFrame()
+        card.setObjectName("Card")
+        card_layout = QHBoxLayout(card)
+        card_layout.setContentsMargins(30, 30, 30, 30)
+        card_layout.setSpacing(50)
+
+        # Left Column
+        left_col = QVBoxLayout()
+        h = QLabel(title)
+        h.setObjectName("SubHeader")
+        left_col.addWidget(h)
+
+        d = QLabel(desc)
+        d.setObjectName("Description")
+        d.setWordWrap(True)
+        left_col.addWidget(d)
+        left_col.addStretch()
+        card_layout.addLayout(left_col, 1)
+
+        # Right Column
+        right_col = QVBoxLayout()
+        if fields:
+            grid = QGridLayout()
+            grid.setSpacing(15)
+            for i, (label_text, widget) in enumerate(fields):
+                grid.addWidget(QLabel(label_text), i, 0)
+                grid.addWidget(widget, i, 1)
+            right_col.addLayout(grid)
+
+        if full_width_widget:
+            right_col.addWidget(full_width_widget)
+
+        if footer_widget:
+            right_col.addWidget(footer_widget)
+
+        card_layout.addLayout(right_col, 2)
+        return card
+
+    def create_batch_footer(self):
+        w = QWidget()
+        l = QHBoxLayout(w)
+        l.setContentsMargins(0, 10, 0, 0)
+        self.lbl_selection = QLabel("")
+        l.addWidget(self.lbl_selection)
+        l.addStretch()
+
+        btn_batch = QPushButton("Create Disposal Batch")
+        btn_batch.clicked.connect(self.create_batch)
+        l.addWidget(btn_batch)
+        return w
+
+    def load_data(self):
+        self._fill(self.table_totals, ScrapService.get_totals())
+        self.load_yard()
+        self._fill(self.table_batches, ScrapService.list_batches())
+
+    def _fill(self, table, rows):
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, val in enumerate(row):
+                text = f"{val:,.2f}" if isinstance(val, float) else str(val if val is not None else "")
+                table.setItem(r, c, QTableWidgetItem(text))
+        return rows
+
+    def filters(self):
+        btype = self.combo_type.currentText()
+        grade = self.combo_grade.currentText()
+        return (None if btype == "All" else btype), (None if grade == "All" else grade)
+
+    def load_yard(self):
+        rows = ScrapService.list_in_yard(*self.filters())
+        self._fill(self.table_yard, [(sid, (received or "")[:10], inv or "-", btype, grade, weight)
+                                     for sid, received, inv, btype, grade, weight, _ in rows])
+        weight = sum(r[5] for r in rows)
+        self.lbl_selection.setText(f"{len(rows)} units · {weight:,.1f} kg shown")
+
+    def create_batch(self):
+        recycler = self.entry_recycler.text().strip()
+        try: rate = float(self.entry_rate.text() or 0)
+        except: rate = 0
+        if not recycler or rate <= 0:
+            QMessageBox.warning(self, "Validation", "Need recycler name and rate per kg.")
+            return
+
+        selected = sorted({i.row() for i in self.table_yard.selectedIndexes()})
+        scrap_ids = [int(self.table_yard.item(r, 0).text()) for r in selected]
+        btype, grade = self.filters()
+        try:
+            batch_no, count, weight, amount = ScrapService.create_batch(
+                recycler, rate, scrap_ids or None, btype, grade, self.entry_notes.text().strip()
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Disposal Batch", str(e))
+            return
+        QMessageBox.information(self, "Disposal Batch",
+                                f"Batch {batch_no}: {count} units, {weight:,.1f} kg, {format_amount(amount)}")
+        self.entry_notes.clear()
+        self.load_data()
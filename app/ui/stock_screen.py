@@ -3,6 +3,10 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QHeaderView, QFrame, QScrollArea, QGridLayout, QMessageBox)
 from PySide6.QtCore import Qt
 from app.database import db
+from app.events import bus
+from app import queries
+from app.attributes import normalize
+from app.services.forecast_service import ForecastService
 
 class StockScreen(QWidget):
     def __init__(self, controller=None):
@@ -50,8 +54,8 @@ class StockScreen(QWidget):
         ))
 
         # --- Section 2: Stock Ledger ---
-        self.table_stock = QTableWidget(0, 5)
-        self.table_stock.setHorizontalHeaderLabels(["ID", "PRODUCT", "CATEGORY", "QR CODE", "AVAILABLE"])
+        self.table_stock = QTableWidget(0, 7)
+        self.table_stock.setHorizontalHeaderLabels(["ID", "PRODUCT", "CATEGORY", "QR CODE", "AVAILABLE", "REORDER AT", "OTHER BRANCHES"])
         self.table_stock.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table_stock.setSelectionBehavior(QTableWidget.SelectRows)
         self.table_stock.setSelectionMode(QTableWidget.SingleSelection)
@@ -59,7 +63,7 @@ class StockScreen(QWidget):
         
         self.content_layout.addWidget(self.create_card_section(
             "Inventory Ledger", 
-            "View and manage current stock levels across all registered items.",
+            "View and manage current stock levels. Red rows are at or below the reorder point forecast from recent sales.",
             [], 
             full_width_widget=self.table_stock
         ))
@@ -114,6 +118,16 @@ class StockScreen(QWidget):
         
         l.addStretch()
         
+        btn_receive = QPushButton("📥 Receive Units")
+        btn_receive.setObjectName("Secondary")
+        btn_receive.clicked.connect(self.receive_units)
+        l.addWidget(btn_receive)
+
+        btn_po = QPushButton("🧾 Suggested PO")
+        btn_po.setObjectName("Secondary")
+        btn_po.clicked.connect(self.export_purchase_order)
+        l.addWidget(btn_po)
+
         btn_refresh = QPushButton("Refresh Table")
         btn_refresh.setObjectName("Secondary")
         btn_refresh.clicked.connect(self.load_data)
@@ -126,26 +140,21 @@ class StockScreen(QWidget):
         return w
 
     def load_data(self):
+        ForecastService.refresh_stale()
         conn = db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT p.id, p.brand_name || ' ' || p.model_name, p.category, p.qr_code, s.quantity_available 
-            FROM products p
-            JOIN stock s ON p.id = s.product_id
-            WHERE p.is_active = 1
-            ORDER BY s.quantity_available ASC
-        """)
+        cursor.execute(queries.STOCK_LEDGER)
         rows = cursor.fetchall()
         self.render_table(rows)
 
     def render_table(self, rows):
         self.table_stock.setRowCount(len(rows))
         for r, row in enumerate(rows):
+            low = row[4] <= row[5]
             for c, val in enumerate(row):
                 item = QTableWidgetItem(str(val))
-                if c == 4: # Stock Column
-                    qty = int(val)
-                    if qty < 10: item.setForeground(Qt.red)
+                if c == 4 and low: # Stock Column
+                    item.setForeground(Qt.red)
                 self.table_stock.setItem(r, c, item)
 
     def on_search(self):
@@ -156,13 +165,7 @@ class StockScreen(QWidget):
             
         conn = db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT p.id, p.brand_name || ' ' || p.model_name, p.category, p.qr_code, s.quantity_available 
-            FROM products p
-            JOIN stock s ON p.id = s.product_id
-            WHERE p.is_active = 1 AND (p.qr_code LIKE ? OR p.brand_name LIKE ? OR p.model_name LIKE ?)
-            ORDER BY s.quantity_available ASC
-        """, (f"%{query}%", f"%{query}%", f"%{query}%"))
+        cursor.execute(queries.STOCK_SEARCH, (f"%{normalize(query)}%",))
         rows = cursor.fetchall()
         
         if not rows and len(query) > 5: # Likely a QR code scan
@@ -178,6 +181,17 @@ class StockScreen(QWidget):
 
         self.render_table(rows)
 
+    def receive_units(self):
+        row = self.table_stock.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Selection Required", "Please select the product being received.")
+            return
+        from app.ui.receive_units_dialog import ReceiveUnitsDialog
+        pid = int(self.table_stock.item(row, 0).text())
+        pname = self.table_stock.item(row, 1).text()
+        if ReceiveUnitsDialog(pid, pname, self).exec():
+            self.load_data()
+
     def delete_selected(self):
         row = self.table_stock.currentRow()
         if row < 0:
@@ -206,9 +220,21 @@ class StockScreen(QWidget):
             # Archiving instead of hard deleting for safety and history
             cursor.execute("UPDATE products SET is_active = 0 WHERE id = ?", (pid,))
             conn.commit()
+            bus.publish('product.changed', product_ids=[int(pid)])
             
             QMessageBox.information(self, "Deleted", f"Product '{pname}' has been successfully archived and removed from active views.")
             self.load_data()
         except Exception as e:
             conn.rollback()
             QMessageBox.critical(self, "Error", f"Failed to archive product: {str(e)}")
+
+    def export_purchase_order(self):
+        try:
+            path, count = ForecastService.export_purchase_order()
+        except Exception as e:
+            QMessageBox.warning(self, "Suggested PO", str(e))
+            return
+        if not count:
+            QMessageBox.information(self, "Suggested PO", "Nothing is at or below its reorder point.")
+            return
+        QMessageBox.information(self, "Suggested PO", f"{count} products to reorder.\nSaved to: {path}")
@@ -0,0 +1,198 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                               QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
+                               QHeaderView, QFrame, QScrollArea, QGridLayout, QMessageBox)
+from PySide6.QtCore import Qt
+from app.services.warranty_service import WarrantyService
+from app.services.document_service import DocumentService
+from app.ui.credit_note_dialog import CreditNoteDialog
+import os
+
+class WarrantyScreen(QWidget):
+    def __init__(self, controller=None):
+        super().__init__()
+        self.controller = controller
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(30, 30, 30, 30)
+        self.main_layout.setSpacing(30)
+
+        # Header
+        header = QLabel("Warranty Lookup")
+        header.setObjectName("SectionHeader")
+        self.main_layout.addWidget(header)
+
+        # Scroll Area
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QFrame.NoFrame)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setStyleSheet("background-color: transparent;")
+        self.main_layout.addWidget(scroll)
+
+        content = QWidget()
+        content.setStyleSheet("background-color: transparent;")
+        self.content_layout = QVBoxLayout(content)
+        self.content_layout.setSpacing(30)
+        scroll.setWidget(content)
+
+        # --- Section 1: Scan ---
+        self.entry_code = QLineEdit()
+        self.entry_code.setPlaceholderText("Scan battery serial/QR, or type invoice no. / mobile and press Enter")
+        self.entry_code.returnPressed.connect(self.on_lookup)
+
+        self.lbl_verdict = QLabel("")
+        self.lbl_verdict.setStyleSheet("font-size: 22px; font-weight: bold;")
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Scan to Check",
+            "Scan the unit being claimed. The sale, customer and warranty expiry are shown instantly.",
+            [
+                ("Serial / Invoice / Mobile", self.entry_code)
+            ],
+            footer_widget=self.create_scan_footer()
+        ))
+
+        # --- Section 2: Results ---
+        self.table_results = QTableWidget(0, 7)
+        self.table_results.setHorizontalHeaderLabels(["SERIAL", "PRODUCT", "CUSTOMER", "MOBILE", "INVOICE #", "SOLD ON", "WARRANTY"])
+        self.table_results.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_results.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_results.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table_results.setMinimumHeight(300)
+
+        self.content_layout.addWidget(self.create_card_section(
+            "Sale Record",
+            "Most recent sale first.",
+            [],
+            full_width_widget=self.table_results
+        ))
+
+    def create_card_section(self, title, desc, fields, footer_widget=None, full_width_widget=None):
+        card = QFrame()
+        card.setObjectName("Card")
+        card_layout = QHBoxLayout(card)
+        card_layout.setContentsMargins(30, 30, 30, 30)
+        card_layout.setSpacing(50)
+
+        # Left Column
+        left_col = QVBoxLayout()
+        h = QLabel(title)
+        h.setObjectName("SubHeader")
+        left_col.addWidget(h)
+
+        d = QLabel(desc)
+        d.setObjectName("Description")
+        d.setWordWrap(True)
+        left_col.addWidget(d)
+        left_col.addStretch()
+        card_layout.addLayout(left_col, 1)
+
+        # Right Column
+        right_col = QVBoxLayout()
+        if fields:
+            grid = QGridLayout()
+            grid.setSpacing(15)
+            for i, (label_text, widget) in enumerate(fields):
+                grid.addWidget(QLabel(label_text), i, 0)
+                grid.addWidget(widget, i, 1)
+            right_col.addLayout(grid)
+
+        if full_width_widget:
+            right_col.addWidget(full_width_widget)
+
+        if footer_widget:
+            right_col.addWidget(footer_widget)
+
+        card_layout.addLayout(right_col, 2)
+        return card
+
+    def create_scan_footer(self):
+        w = QWidget()
+        l = QHBoxLayout(w)
+        l.setContentsMargins(0, 10, 0, 0)
+        l.addWidget(self.lbl_verdict)
+        l.addStretch()
+
+        btn_lookup = QPushButton("Check Warranty")
+        btn_lookup.clicked.connect(self.on_lookup)
+        l.addWidget(btn_lookup)
+
+        btn_pdf = QPushButton("Open Invoice")
+        btn_pdf.setObjectName("Secondary")
+        btn_pdf.clicked.connect(self.open_invoice)
+        l.addWidget(btn_pdf)
+
+        btn_credit = QPushButton("Issue Credit Note")
+        btn_credit.setObjectName("Secondary")
+        btn_credit.clicked.connect(self.issue_credit_note)
+        l.addWidget(btn_credit)
+        return w
+
+    def load_data(self):
+        self.entry_code.setFocus()
+        self.entry_code.selectAll()
+
+    def on_lookup(self):
+        results = WarrantyService.lookup(self.entry_code.text())
+        self.render_results(results)
+        # Ready for the next scan
+        self.entry_code.selectAll()
+
+    def render_results(self, results):
+        if not results:
+            self.lbl_verdict.setText("No sale found")
+            self.lbl_verdict.setStyleSheet("font-size: 22px; font-weight: bold; color: #888;")
+        else:
+            first = results[0]
+            ok = first['state'] == "In Warranty"
+            text = first['state']
+            if first['days_left'] is not None:
+                text += f" · {first['days_left']} days left" if ok else f" · expired {first['expiry_date']}"
+            self.lbl_verdict.setText(text)
+            self.lbl_verdict.setStyleSheet(f"font-size: 22px; font-weight: bold; color: {'#2E7D32' if ok else '#C62828'};")
+
+        self.table_results.setRowCount(len(results))
+        for r, res in enumerate(results):
+            warranty = f"{res['state']} ({res['expiry_date']})" if res['expiry_date'] else res['state']
+            values = [res['serial_no'] or "-", res['product'], res['customer'], res['mobile'],
+                      res['invoice_no'], (res['sale_date'] or "")[:10], warranty]
+            for c, val in enumerate(values):
+                item = QTableWidgetItem(str(val) if val is not None else "")
+                if c == 6 and res['state'] != "In Warranty":
+                    item.setForeground(Qt.red)
+                self.table_results.setItem(r, c, item)
+
+    def selected_invoice(self):
+        row = self.table_results.currentRow()
+        if row < 0 and self.table_results.rowCount():
+            row = 0
+        item = self.table_results.item(row, 4) if row >= 0 else None
+        if not item or not item.text().upper().startswith("INV-"):
+            return None
+        return item.text()
+
+    def open_invoice(self):
+        invoice_no = self.selected_invoice()
+        if not invoice_no:
+            QMessageBox.warning(self, "Invoice", "Look up a sold unit or invoice first.")
+            return
+        try:
+            path = DocumentService.find(invoice_no)
+        except Exception as e:
+            QMessageBox.critical(self, "Invoice", str(e))
+            return
+        if not path:
+            QMessageBox.warning(self, "Invoice", f"No PDF on record for {invoice_no}.")
+            return
+        os.startfile(path)
+
+    def issue_credit_note(self):
+        invoice_no = self.selected_invoice()
+        if not invoice_no:
+            QMessageBox.warning(self, "Credit Note", "Look up a sold unit or invoice first.")
+            return
+        if CreditNoteDialog(invoice_no, self).exec():
+            self.on_lookup()
@@ -1,5 +1,7 @@
 import logging
 import sys
+from datetime import date
+from app.money import format_amount
 
 def setup_logging():
     logging.basicConfig(
@@ -12,4 +14,9 @@ def setup_logging():
     )
 
 def format_currency(amount: float) -> str:
-    return f"₹{amount:,.2f}"
+    return format_amount(amount)
+
+def month_bounds(year, month):
+    """First day of the month and first day of the next one, as ISO strings."""
+    nxt = (year + 1, 1) if month == 12 else (year, month + 1)
+    return date(year, month, 1).isoformat(), date(*nxt, 1).isoformat()
@@ -0,0 +1,30 @@
+import argparse
+from app.utils import setup_logging
+from app.services.archive_service import ArchiveService
+from app.services.document_service import DocumentService
+
+parser = argparse.ArgumentParser(description="Move closed fiscal years into data/archive_YYYY.db")
+parser.add_argument("--fy", type=int, action="append", help="fiscal year to archive by starting year, e.g. 2023 for FY 2023-24")
+parser.add_argument("--all-closed", action="store_true", help="archive every closed fiscal year still in app.db")
+parser.add_argument("--no-vacuum", action="store_true", help="skip VACUUM compaction afterwards")
+parser.add_argument("--pack-pdfs", type=int, metavar="DAYS", help="pack invoice PDFs older than DAYS into invoices/archive/YYYY-MM.zip")
+args = parser.parse_args()
+setup_logging()
+
+years = args.fy or []
+if args.all_closed:
+    years = ArchiveService.closed_fiscal_years()
+
+for fy in years:
+    invoices, items = ArchiveService.archive_fiscal_year(fy, compact=not args.no_vacuum)
+    print(f"FY {fy}-{(fy + 1) % 100:02d}: {invoices} invoices / {items} items archived")
+
+print("Partitions:")
+for fy, file_name, date_from, date_to, invoices, items, archived_at in ArchiveService.list_partitions():
+    print(f"  FY {fy}-{(fy + 1) % 100:02d}  {file_name}  {invoices} invoices, {items} items  (archived {archived_at})")
+
+if args.pack_pdfs is not None:
+    for month, count in DocumentService.pack_older_than(args.pack_pdfs).items():
+        print(f"PDFs {month}: {count} documents packed")
+    loose_count, loose_bytes, packed_count, packed_bytes = DocumentService.usage()
+    print(f"Documents: {loose_count} loose ({loose_bytes / 1e6:.1f} MB), {packed_count} packed ({packed_bytes / 1e6:.1f} MB)")
@@ -0,0 +1,10 @@
+"""
+Load generation and benchmarks for the billing stack.
+
+    python -m benchmarks seed --db bench/app.db --lines 100000
+    python -m benchmarks run --db bench/app.db --mix counter --out bench/results.json --baseline benchmarks/baseline.json
+
+Runs always target a scratch database, never data/app.db: the --db path is put in Config.DB_PATH
+(and SMART_BILLING_DB) before app.database is first imported. A run with no baseline to compare
+against exits non-zero; benchmarks/baseline.json is the default seeded scale, `run --mix all`.
+"""
@@ -0,0 +1,216 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from app.utils import setup_logging
+
+
+def _use_database(db_path):
+    """
+    Points the app's shared `db` (and invoice folder) at a scratch database. Config.DB_PATH is
+    switched before app.database is first imported, so its module-level `db` never opens
+    (or migrates) data/app.db; the environment carries it to spawned worker processes.
+    """
+    from app.config import Config
+
+    db_path = os.path.abspath(db_path)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    os.environ['SMART_BILLING_DB'] = Config.DB_PATH = db_path
+    from app.database import db, DatabaseManager
+
+    DatabaseManager(db_path)  # creates the schema
+    db.db_path = db_path
+    Config.INVOICE_DIR = tempfile.mkdtemp(prefix="bench_invoices_")
+    return db
+
+
+def cmd_seed(args):
+    from benchmarks.seed import seed_database
+    _use_database(args.db)
+    info = seed_database(args.db, lines=args.lines, years=args.years, seed=args.seed,
+                         products=args.products, customers=args.customers)
+    print(info)
+    return 0
+
+
+def cmd_run(args):
+    fresh = not os.path.exists(args.db)
+    _use_database(args.db)
+    # workloads binds app.database's `db`, so only after the scratch database is selected
+    from benchmarks import report as rep
+    from benchmarks.seed import seed_database
+    from benchmarks.workloads import Workload, MIXES, run_mix
+
+    seed_info = None
+    if fresh:
+        seed_info = seed_database(args.db, lines=args.lines, years=args.years, seed=args.seed)
+
+    mixes = list(MIXES) if args.mix == "all" else args.mix.split(",")
+    workload = Workload(seed=args.seed, pdf_dir=tempfile.mkdtemp(prefix="bench_pdf_"))
+    result = {'meta': rep.environment(), 'mixes': {}}
+    result['meta'].update({'seed': args.seed, 'ops': args.ops, 'rounds': args.rounds,
+                           'catalog': len(workload.catalog), 'customers': len(workload.customers)})
+    if seed_info:
+        result['meta']['seeded'] = seed_info
+
+    # Rounds go through every mix in turn, so one op's rounds are spread over the whole run
+    rounds = {mix: [] for mix in mixes}
+    for _ in range(args.rounds):
+        for mix in mixes:
+            rounds[mix].append(rep.summarize(*run_mix(workload, mix, ops=args.ops, warmup=args.warmup)))
+    for mix in mixes:
+        result['mixes'][mix] = rep.combine(rounds[mix], 'typical' if args.save_baseline else 'best')
+        logging.info(f"{mix}: {result['mixes'][mix]['throughput_ops_s']} ops/s")
+        for op, stats in result['mixes'][mix]['ops'].items():
+            print(f"  {mix:<10} {op:<16} n={stats['count']:<5} p50={stats['p50_ms']:>9.3f}ms "
+                  f"p95={stats['p95_ms']:>9.3f}ms p99={stats['p99_ms']:>9.3f}ms")
+
+    if args.out:
+        rep.write_json(result, args.out)
+        print(f"Results written to {args.out}")
+
+    if args.save_baseline:
+        rep.write_json(result, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline. Nothing was checked.")
+        return 2
+    baseline = rep.load_json(args.baseline)
+    unchecked = [mix for mix in result['mixes'] if mix not in baseline.get('mixes', {})]
+    if unchecked:
+        print(f"Not in the baseline, not checked: {', '.join(unchecked)}")
+    regressions = rep.compare(result, baseline, tolerance=args.tolerance, metric=args.metric,
+                              min_delta_ms=args.min_delta_ms)
+    if regressions:
+        print("REGRESSIONS:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"No regressions against {args.baseline} ({args.metric}, tolerance {args.tolerance:.0%}, "
+          f"floor {args.min_delta_ms:g} ms)")
+    return 0
+
+
+def cmd_contention(args):
+    from benchmarks import report as rep
+    from benchmarks.contention import run_contention
+
+    _use_database(args.db)
+    outcome = run_contention(args.db, terminals=args.terminals, sales=args.sales, products=args.products,
+                             stock=args.stock, seed=args.seed, think=args.think_ms / 1000)
+    result = {'meta': rep.environment(), 'mixes': {'contention': rep.summarize(outcome['samples'], outcome['wall'])},
+              'check': outcome['check']}
+    for op, stats in result['mixes']['contention']['ops'].items():
+        print(f"  {op:<10} n={stats['count']:<5} p50={stats['p50_ms']:>9.3f}ms p95={stats['p95_ms']:>9.3f}ms p99={stats['p99_ms']:>9.3f}ms")
+    print(f"  {outcome['check']}")
+    if args.out:
+        rep.write_json(result, args.out)
+    if not outcome['check']['consistent']:
+        print("OVERSELL DETECTED: units sold do not match stock consumed")
+        return 1
+    if not outcome['check']['exhausted']:
+        print("Stock was never exhausted or no hold was refused; lower --stock or raise --sales")
+        return 1
+    return 0
+
+
+def cmd_faults(args):
+    from app.config import Config
+    from benchmarks import report as rep
+    from benchmarks.faults import run_faults
+
+    _use_database(args.db)
+    results = run_faults(args.db, Config.INVOICE_DIR, stock=args.stock)
+    for r in results:
+        verdict = "ok" if not r['problems'] else "; ".join(r['problems'])
+        print(f"  crash at {r['point']:<12} journal {str(r['after_crash']):<10} -> {str(r['after_restart']):<8} "
+              f"recovery {r['recovery_s']:.3f}s  {verdict}")
+    if args.out:
+        rep.write_json({'meta': rep.environment(), 'faults': results}, args.out)
+    if any(r['problems'] for r in results):
+        print("INCONSISTENT STATE AFTER RECOVERY")
+        return 1
+    return 0
+
+
+def cmd_cart(args):
+    from benchmarks import report as rep
+    from benchmarks.cart import run_cart
+
+    _use_database(args.db)
+    samples, wall, info = run_cart(args.db, skus=args.skus, lines=args.lines, seed=args.seed)
+    result = {'meta': rep.environment(), 'mixes': {'cart': rep.summarize(samples, wall)}, 'cart': info}
+    for op, stats in result['mixes']['cart']['ops'].items():
+        print(f"  {op:<12} n={stats['count']:<5} p50={stats['p50_ms']:>9.3f}ms p95={stats['p95_ms']:>9.3f}ms p99={stats['p99_ms']:>9.3f}ms")
+    print(f"  {info}")
+    if args.out:
+        rep.write_json(result, args.out)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Billing stack benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_seed = sub.add_parser("seed", help="Create and fill a synthetic database")
+    p_seed.add_argument("--db", required=True)
+    p_seed.add_argument("--lines", type=int, default=10000, help="invoice lines to generate (10k - 10M)")
+    p_seed.add_argument("--years", type=int, default=3)
+    p_seed.add_argument("--seed", type=int, default=42)
+    p_seed.add_argument("--products", type=int)
+    p_seed.add_argument("--customers", type=int)
+    p_seed.set_defaults(func=cmd_seed)
+
+    p_run = sub.add_parser("run", help="Replay workload mixes and report latencies")
+    p_run.add_argument("--db", required=True, help="seeded automatically if it does not exist")
+    p_run.add_argument("--mix", default="counter", help="counter, search, dashboard, pdf, receipt, money, analytics, comma list or 'all'")
+    p_run.add_argument("--ops", type=int, default=500)
+    p_run.add_argument("--warmup", type=int, default=20)
+    p_run.add_argument("--rounds", type=int, default=3, help="repeat each mix; a check keeps every op's best round, a baseline its typical one")
+    p_run.add_argument("--lines", type=int, default=10000)
+    p_run.add_argument("--years", type=int, default=3)
+    p_run.add_argument("--seed", type=int, default=42)
+    p_run.add_argument("--out", help="write the JSON report here")
+    p_run.add_argument("--baseline", default=os.path.join(os.path.dirname(__file__), "baseline.json"))
+    p_run.add_argument("--tolerance", type=float, default=0.25, help="allowed growth of --metric before failing")
+    p_run.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p90_ms", "p95_ms", "p99_ms", "mean_ms"],
+                       help="percentile compared against the baseline; tails need a larger --ops to be stable")
+    p_run.add_argument("--min-delta-ms", type=float, default=3.0, help="growth below this many ms is never a regression")
+    p_run.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    p_run.set_defaults(func=cmd_run)
+
+    p_cont = sub.add_parser("contention", help="N terminals in parallel processes billing the same stock")
+    p_cont.add_argument("--db", required=True)
+    p_cont.add_argument("--terminals", type=int, default=4)
+    p_cont.add_argument("--sales", type=int, default=50, help="sales attempted per terminal")
+    p_cont.add_argument("--products", type=int, default=3)
+    p_cont.add_argument("--stock", type=int, default=20, help="opening stock per product; keep it below total demand")
+    p_cont.add_argument("--think-ms", type=float, default=10, help="longest pause between reserving and checking out")
+    p_cont.add_argument("--seed", type=int, default=42)
+    p_cont.add_argument("--out")
+    p_cont.set_defaults(func=cmd_contention)
+
+    p_faults = sub.add_parser("faults", help="Kill a checkout at each step, restart, and check nothing was lost")
+    p_faults.add_argument("--db", required=True)
+    p_faults.add_argument("--stock", type=int, default=10, help="opening stock of each scenario's product")
+    p_faults.add_argument("--out")
+    p_faults.set_defaults(func=cmd_faults)
+
+    p_cart = sub.add_parser("cart", help="Scan products into the billing screen until the cart is full")
+    p_cart.add_argument("--db", required=True)
+    p_cart.add_argument("--skus", type=int, default=100000, help="catalog size, topped up with generated products")
+    p_cart.add_argument("--lines", type=int, default=200, help="cart lines to build")
+    p_cart.add_argument("--seed", type=int, default=42)
+    p_cart.add_argument("--out")
+    p_cart.set_defaults(func=cmd_cart)
+
+    args = parser.parse_args(argv)
+    setup_logging()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
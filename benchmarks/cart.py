@@ -0,0 +1,84 @@
+import os
+import random
+import sqlite3
+import time
+from benchmarks.seed import _products
+
+# Share of scans that repeat a product already in the cart (merged into its line)
+REPEAT_SHARE = 0.2
+
+def _top_up_catalog(db_path, skus, seed):
+    """
+    Adds generated products until the active catalog has `skus`; returns the ids a scan can
+    take without a dialog (plenty of stock, no serial tracking).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        have = conn.execute("SELECT COUNT(*) FROM products WHERE is_active = 1").fetchone()[0]
+        start = conn.execute("SELECT COALESCE(MAX(id), 0) FROM products").fetchone()[0]
+        rows = [(start + n + 1, f"CART-{seed}-{start + n + 1:07d}", *row[2:])
+                for n, row in enumerate(_products(random.Random(seed), max(0, skus - have)))]
+        conn.executemany("""
+            INSERT INTO products (id, qr_code, category, brand_name, model_name, warranty_months, current_price, current_purchase_price,
+                                  capacity_ah, voltage, technology)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.executemany("INSERT INTO stock (product_id, quantity_available) VALUES (?, ?)",
+                         ((row[0], 10 ** 7) for row in rows))
+        conn.commit()
+        return {pid for pid, in conn.execute("""
+            SELECT s.product_id FROM stock s
+            WHERE s.quantity_available >= 10000
+              AND NOT EXISTS (SELECT 1 FROM stock_units u WHERE u.product_id = s.product_id)
+        """)}
+    finally:
+        conn.close()
+
+def run_cart(db_path, skus=100000, lines=200, seed=42):
+    """
+    Drives the real billing screen (offscreen) the way a scanner does: pick a product in the
+    combo, then add it, until the cart holds `lines` lines. Only products that cannot raise a
+    stock or serial dialog are scanned. Returns (samples, wall, info).
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from app.services.reservation_service import ReservationService
+    from app.ui.billing_screen import BillingScreen
+
+    scannable = _top_up_catalog(db_path, skus, seed)
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(seed)
+    samples = {'load_catalog': [], 'select': [], 'add_to_cart': []}
+
+    started = time.perf_counter()
+    screen = BillingScreen()
+    samples['load_catalog'].append(time.perf_counter() - started)
+    # Combo indexes of products that cannot raise a dialog; index 0 is the placeholder
+    pickable = [n + 1 for n, row in enumerate(screen.catalog_model.rows) if row.id in scannable]
+    if not pickable:
+        raise Exception("No product with enough unserialized stock to scan; pass a larger --skus.")
+    in_cart = []
+
+    wall_started = time.perf_counter()
+    while len(screen.cart) < lines:
+        repeat = in_cart and rng.random() < REPEAT_SHARE
+        index = rng.choice(in_cart) if repeat else rng.choice(pickable)
+        t0 = time.perf_counter()
+        screen.combo_product.setCurrentIndex(index)
+        t1 = time.perf_counter()
+        screen.entry_qty.setText("1")
+        screen.add_to_cart()
+        t2 = time.perf_counter()
+        samples['select'].append(t1 - t0)
+        samples['add_to_cart'].append(t2 - t1)
+        if not repeat:
+            in_cart.append(index)
+    wall = time.perf_counter() - wall_started
+
+    info = {'skus': len(screen.catalog), 'lines': len(screen.cart), 'scans': len(samples['add_to_cart']),
+            'units': sum(line.qty for line in screen.cart)}
+    screen.autosave_timer.stop()
+    ReservationService.release_cart(screen.cart_id)
+    screen.deleteLater()
+    app.processEvents()
+    return samples, wall, info
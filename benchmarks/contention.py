@@ -0,0 +1,120 @@
+import multiprocessing
+import random
+import sqlite3
+import time
+
+def _terminal(db_path, terminal_no, sales, product_ids, seed, think, start, results):
+    """
+    One simulated counter: reserve an item, hold it while the cashier finishes the bill
+    (up to `think` seconds), then check it out, `sales` times. Waits at `start` so every
+    terminal begins selling together.
+    """
+    from app.config import Config
+    from app.database import db
+    from app.services.invoice_service import InvoiceService
+    from app.services.reservation_service import ReservationService
+
+    db.db_path = db_path
+    Config.TERMINAL_ID = f"bench-{terminal_no}"
+    rng = random.Random(seed + terminal_no)
+    service = InvoiceService()
+    reserve_lat, checkout_lat = [], []
+    sold = rejected = held_out = failed = 0
+    clock = time.perf_counter
+    start.wait()
+
+    for n in range(sales):
+        cart_id = ReservationService.new_cart_id()
+        pid = rng.choice(product_ids)
+        qty = rng.randint(1, 2)
+        t0 = clock()
+        try:
+            ReservationService.reserve(cart_id, pid, qty)
+        except Exception:
+            rejected += 1
+            # Refused although the shelf had the units: another terminal's open hold won
+            conn = db.get_connection()
+            if conn.execute("SELECT quantity_available FROM stock WHERE product_id = ?", (pid,)).fetchone()[0] >= qty:
+                held_out += 1
+            conn.close()
+            continue
+        finally:
+            reserve_lat.append(clock() - t0)
+
+        # Other terminals keep reserving while this hold is open
+        time.sleep(rng.uniform(0, think))
+        t0 = clock()
+        try:
+            service.create_invoice(
+                {'name': f"Terminal {terminal_no}", 'mobile': f"8{terminal_no:03d}{n:06d}", 'address': ''},
+                [{'product_id': pid, 'product_name': f"P{pid}", 'qty': qty, 'selling_price': 1000.0, 'total': qty * 1000.0}],
+                {'amount': 0.0, 'description': ''}, render_pdf=False, cart_id=cart_id
+            )
+            sold += qty
+        except Exception:
+            failed += 1
+            ReservationService.release_cart(cart_id)
+        checkout_lat.append(clock() - t0)
+
+    results.put({'terminal': terminal_no, 'sold': sold, 'rejected': rejected, 'held_out': held_out, 'failed': failed,
+                 'reserve': reserve_lat, 'checkout': checkout_lat})
+
+
+def run_contention(db_path, terminals=4, sales=50, products=3, stock=20, seed=42, think=0.01):
+    """
+    Runs `terminals` processes billing against the same few products so they collide. The
+    defaults ask for several times the opening stock, so holds compete and the shelf runs dry.
+    Returns raw samples plus the checks: units sold must equal stock consumed, some
+    reservations must have been turned away, and the stock must end at exactly zero.
+    """
+    from app.database import DatabaseManager
+
+    DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM stock_reservations")
+    ids = []
+    for i in range(products):
+        cur = conn.execute("INSERT INTO products (qr_code, category, brand_name, model_name, warranty_months, current_price) "
+                           "VALUES (?, 'Battery', 'Contention', ?, 12, 1000)", (f"CONT-{time.time_ns()}-{i}", f"M{i}"))
+        ids.append(cur.lastrowid)
+        conn.execute("INSERT INTO stock (product_id, quantity_available) VALUES (?, ?)", (cur.lastrowid, stock))
+    conn.commit()
+
+    results = multiprocessing.Queue()
+    start = multiprocessing.Barrier(terminals)
+    procs = [multiprocessing.Process(target=_terminal, args=(db_path, t, sales, ids, seed, think, start, results))
+             for t in range(terminals)]
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    outputs = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - started
+
+    marks = ",".join("?" * len(ids))
+    remaining = conn.execute(f"SELECT SUM(quantity_available), MIN(quantity_available) FROM stock WHERE product_id IN ({marks})", ids).fetchone()
+    conn.close()
+
+    sold = sum(o['sold'] for o in outputs)
+    rejected = sum(o['rejected'] for o in outputs)
+    return {
+        'samples': {
+            'reserve': [v for o in outputs for v in o['reserve']],
+            'checkout': [v for o in outputs for v in o['checkout']],
+        },
+        'wall': wall,
+        'check': {
+            'terminals': terminals,
+            'initial_stock': stock * products,
+            'units_sold': sold,
+            'stock_left': remaining[0],
+            'min_stock': remaining[1],
+            'rejected_reservations': rejected,
+            'refused_by_holds': sum(o['held_out'] for o in outputs),
+            'failed_checkouts': sum(o['failed'] for o in outputs),
+            'consistent': remaining[1] >= 0 and sold + remaining[0] == stock * products,
+            # Without both, the oversell and hold-contention paths were never reached
+            'exhausted': rejected > 0 and remaining[0] == 0,
+        },
+    }
@@ -0,0 +1,184 @@
+import multiprocessing
+import os
+import sqlite3
+import time
+
+# Exit code of a simulated crash: os._exit skips every finally, commit and flush, like a kill
+CRASH_EXIT = 70
+
+# Where a sale is interrupted, in the order the checkout reaches them; None runs it to the end
+POINTS = ('transaction', 'commit', 'render', 'register', 'share', None)
+
+# Journal status each crash should leave behind, before the restart
+EXPECTED_AFTER_CRASH = {
+    'transaction': None,
+    'commit': 'committed',
+    'render': 'committed',
+    'register': 'committed',
+    'share': 'rendered',
+    None: 'shared',
+}
+
+def _crash(*args, **kwargs):
+    os._exit(CRASH_EXIT)
+
+def _install(point):
+    """Swaps in a crash at one step of the checkout."""
+    from app.services.pdf_service import PDFService
+    from app.services.document_service import DocumentService
+    from app.services.journal_service import JournalService
+
+    if point == 'transaction':
+        JournalService.commit = _crash
+    elif point == 'commit':
+        PDFService.generate_invoice_pdf = _crash
+    elif point == 'render':
+        render = PDFService.generate_invoice_pdf
+
+        def half_written(invoice_data, cart_items, old_battery, file_path):
+            render(invoice_data, cart_items, old_battery, file_path)
+            with open(file_path, 'r+b') as f:
+                f.truncate(os.path.getsize(file_path) // 2)
+            _crash()
+        PDFService.generate_invoice_pdf = half_written
+    elif point == 'register':
+        DocumentService.register = _crash
+
+class _CrashingTransport:
+    interactive = False
+
+    def send(self, mobile, message):
+        _crash()
+
+def _sale(db_path, invoice_dir, outbox_path, point, product_id, cart_id, mobile):
+    """One checkout in its own process, killed at `point`."""
+    from app.config import Config
+    from app.database import db
+    from app.services.cart_service import CartService
+    from app.services.invoice_service import InvoiceService
+    from app.services.reservation_service import ReservationService
+    from app.services.share_service import ShareService, FileTransport
+
+    db.db_path = db_path
+    Config.INVOICE_DIR = invoice_dir
+    Config.TERMINAL_ID = "faults"
+    item = {'product_id': product_id, 'product_name': f"Fault {point}", 'qty': 1, 'selling_price': 4500.0,
+            'total': 4500.0, 'serials': []}
+    ReservationService.reserve(cart_id, product_id, 1)
+    CartService.save(cart_id, {'mobile': mobile, 'name': f"Fault {point}", 'address': '', 'items': [item]})
+
+    _install(point)
+    InvoiceService().create_invoice({'name': f"Fault {point}", 'mobile': mobile, 'address': ''}, [item],
+                                    {'amount': 0.0, 'description': ''}, cart_id=cart_id, share=True)
+    transport = _CrashingTransport() if point == 'share' else FileTransport(outbox_path)
+    ShareService.process_batch(transport, min_interval=0)
+    os._exit(0)
+
+def _restart(outbox_path):
+    """What main() does on the next start: requeue half-sent messages, resume renders, drain the outbox."""
+    from app.services.journal_service import JournalService
+    from app.services.share_service import ShareService, FileTransport
+
+    ShareService.requeue_stale()
+    for future in JournalService.recover():
+        future.result()
+    ShareService.process_batch(FileTransport(outbox_path), min_interval=0)
+
+def _state(conn, mobile, cart_id, product_id):
+    row = conn.execute("""
+        SELECT i.invoice_no, j.status, d.path, d.sha256
+        FROM invoices i JOIN customers c ON c.id = i.customer_id
+        LEFT JOIN invoice_journal j ON j.invoice_no = i.invoice_no
+        LEFT JOIN invoice_documents d ON d.doc_no = i.invoice_no
+        WHERE c.mobile_number = ?
+    """, (mobile,)).fetchone()
+    invoice_no, status, path, sha = row or (None, None, None, None)
+    return {
+        'invoice_no': invoice_no,
+        'status': status,
+        'path': path,
+        'sha256': sha,
+        'stock': conn.execute("SELECT quantity_available FROM stock WHERE product_id = ?", (product_id,)).fetchone()[0],
+        'cart_saved': conn.execute("SELECT COUNT(*) FROM held_carts WHERE cart_id = ?", (cart_id,)).fetchone()[0],
+        'sent': conn.execute("SELECT COUNT(*) FROM share_outbox WHERE mobile = ? AND status = 'sent'", (mobile,)).fetchone()[0],
+    }
+
+def _check(point, crashed, after, opening_stock, outbox_path, mobile):
+    """Problems with the recovered state of one scenario; empty when consistent."""
+    from app.services.document_service import _sha256
+
+    problems = []
+    if crashed['status'] != EXPECTED_AFTER_CRASH[point]:
+        problems.append(f"journal {crashed['status']!r} after crash, expected {EXPECTED_AFTER_CRASH[point]!r}")
+    if point == 'transaction':
+        if after['invoice_no'] or after['stock'] != opening_stock:
+            problems.append("rolled-back sale left an invoice or took stock")
+        if not after['cart_saved']:
+            problems.append("draft cart lost")
+        return problems
+
+    if after['stock'] != opening_stock - 1:
+        problems.append(f"stock {after['stock']}, expected {opening_stock - 1}")
+    if after['cart_saved']:
+        problems.append("cart still saved after checkout")
+    if after['status'] != 'shared':
+        problems.append(f"journal {after['status']!r} after restart")
+    if not after['path'] or not os.path.exists(after['path']):
+        problems.append("PDF missing")
+    elif _sha256(after['path']) != after['sha256']:
+        problems.append("PDF does not match its registered hash")
+    elif os.path.exists(after['path'] + ".part"):
+        problems.append("partial render left behind")
+    sends = 0
+    if os.path.exists(outbox_path):
+        with open(outbox_path, encoding='utf-8') as f:
+            sends = sum(1 for line in f if f'"{mobile}"' in line)
+    if after['sent'] != 1 or sends != 1:
+        problems.append(f"message sent {sends} time(s)")
+    return problems
+
+def run_faults(db_path, invoice_dir, stock=10):
+    """
+    Runs one checkout per crash point in a child process that dies there, then the startup
+    recovery, and checks stock, journal, PDF and outbox. Returns one result dict per point.
+    """
+    from app.config import Config
+    from app.database import DatabaseManager
+    from app.services.reservation_service import ReservationService
+
+    DatabaseManager(db_path)
+    Config.TERMINAL_ID = "faults"
+    outbox_path = os.path.join(invoice_dir, "faults_outbox.jsonl")
+    conn = sqlite3.connect(db_path)
+    results = []
+    try:
+        for n, point in enumerate(POINTS):
+            cur = conn.execute("INSERT INTO products (qr_code, category, brand_name, model_name, warranty_months, current_price) "
+                               "VALUES (?, 'Battery', 'Faults', ?, 12, 4500)", (f"FAULT-{time.time_ns()}-{n}", str(point)))
+            product_id = cur.lastrowid
+            conn.execute("INSERT INTO stock (product_id, quantity_available) VALUES (?, ?)", (product_id, stock))
+            conn.commit()
+            cart_id = ReservationService.new_cart_id()
+            mobile = f"7{time.time_ns() % 10 ** 9:09d}"
+
+            proc = multiprocessing.Process(target=_sale, args=(db_path, invoice_dir, outbox_path, point,
+                                                               product_id, cart_id, mobile))
+            proc.start()
+            proc.join()
+            crashed = _state(conn, mobile, cart_id, product_id)
+            started = time.perf_counter()
+            _restart(outbox_path)
+            recovery = time.perf_counter() - started
+            after = _state(conn, mobile, cart_id, product_id)
+
+            problems = _check(point, crashed, after, stock, outbox_path, mobile)
+            expected_exit = 0 if point is None else CRASH_EXIT
+            if proc.exitcode != expected_exit:
+                problems.insert(0, f"exit code {proc.exitcode}, expected {expected_exit}")
+            results.append({'point': point or 'none', 'invoice_no': after['invoice_no'],
+                            'after_crash': crashed['status'], 'after_restart': after['status'],
+                            'recovery_s': round(recovery, 3), 'problems': problems})
+            ReservationService.release_cart(cart_id)
+    finally:
+        conn.close()
+    return results
@@ -0,0 +1,99 @@
+import json
+import math
+import platform
+import sqlite3
+import time
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, wall):
+    """Turns raw latencies (seconds) into per-op percentiles (ms) and throughput."""
+    ops = {}
+    total = 0
+    for name, values in samples.items():
+        if not values:
+            continue
+        values = sorted(values)
+        total += len(values)
+        stats = {'count': len(values)}
+        for pct in PERCENTILES:
+            stats[f'p{pct}_ms'] = round(percentile(values, pct) * 1000, 3)
+        stats['max_ms'] = round(values[-1] * 1000, 3)
+        stats['mean_ms'] = round(sum(values) / len(values) * 1000, 3)
+        stats['throughput_ops_s'] = round(len(values) / sum(values), 1) if sum(values) else 0.0
+        ops[name] = stats
+    return {
+        'wall_s': round(wall, 3),
+        'throughput_ops_s': round(total / wall, 1) if wall else 0.0,
+        'ops': ops,
+    }
+
+
+def combine(rounds, pick='best'):
+    """
+    Combines summaries of repeated rounds of one mix. Each op keeps one whole round's stats,
+    ranked by its median: 'best' is the fastest round (timeit's best-of-N, for checks) and
+    'typical' the middle one (for baselines). A check then fails only when every round was
+    slower than a typical baseline round, not when a stretch of CPU contention from outside
+    the process slowed a few. Wall time and throughput come from the round picked the same way.
+    """
+    def chosen(items, key):
+        items = sorted(items, key=key)
+        return items[0] if pick == 'best' else items[(len(items) - 1) // 2]
+
+    walls = chosen(rounds, lambda r: r['wall_s'])
+    names = {name for summary in rounds for name in summary['ops']}
+    ops = {name: chosen([r['ops'][name] for r in rounds if name in r['ops']], lambda s: s['p50_ms'])
+           for name in sorted(names)}
+    return {'wall_s': walls['wall_s'], 'throughput_ops_s': walls['throughput_ops_s'], 'rounds': len(rounds), 'ops': ops}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def write_json(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=4)
+
+
+def load_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare(report, baseline, tolerance=0.25, metric='p50_ms', min_delta_ms=3.0):
+    """
+    Returns a list of regression messages: any op whose `metric` grew by more than
+    `tolerance` (fraction) over the baseline. The median is the default because tail
+    percentiles of a few hundred samples swing run to run on the same machine; deltas under
+    `min_delta_ms` are scheduler noise and ignored.
+    """
+    regressions = []
+    for mix_name, mix in report.get('mixes', {}).items():
+        base_mix = baseline.get('mixes', {}).get(mix_name)
+        if not base_mix:
+            continue
+        for op, stats in mix['ops'].items():
+            base = base_mix['ops'].get(op)
+            if not base or metric not in base:
+                continue
+            old, new = base[metric], stats[metric]
+            if new - old > min_delta_ms and new > old * (1 + tolerance):
+                regressions.append(f"{mix_name}/{op}: {metric} {old:.3f} -> {new:.3f} ms "
+                                   f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
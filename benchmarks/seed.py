@@ -0,0 +1,154 @@
+import random
+import time
+import logging
+from datetime import datetime, timedelta
+from app.attributes import TECHNOLOGIES
+
+CATEGORIES = ["Battery", "Battery", "Battery", "Inverter", "Solar Panel", "Cable", "Other"]
+BRANDS = ["Exide", "Amaron", "Luminous", "Microtek", "SF Sonic", "Okaya", "Livguard", "Su-Kam", "Tata Green", "Base"]
+MODEL_PREFIXES = ["Mileage", "Pro", "Inva", "Tubular", "Hi-Life", "Xpress", "Eco", "Power", "Matrix", "Go"]
+WARRANTY_CHOICES = [6, 12, 18, 24, 36, 48, 60]
+FIRST_NAMES = ["Ramesh", "Suresh", "Anita", "Priya", "Vijay", "Kiran", "Sunita", "Arjun", "Meena", "Rahul"]
+LAST_NAMES = ["Sharma", "Patel", "Singh", "Kumar", "Reddy", "Nair", "Gupta", "Das", "Yadav", "Joshi"]
+CITIES = ["Pune", "Nashik", "Nagpur", "Indore", "Jaipur", "Surat", "Lucknow", "Bhopal"]
+
+BATCH_SIZE = 20000
+
+
+def default_sizes(lines):
+    """Catalog and customer base that grow with the invoice volume, like a real shop's would."""
+    return {
+        'products': max(200, min(20000, lines // 50)),
+        'customers': max(100, lines // 20),
+    }
+
+
+def _batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _products(rng, count):
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        brand = rng.choice(BRANDS)
+        capacity = rng.randint(35, 220)
+        model = f"{rng.choice(MODEL_PREFIXES)} {capacity}Ah-{i}"
+        price = float(rng.randrange(1500, 45000, 50))
+        battery = category == "Battery"
+        yield (i + 1, f"BENCH-{i + 1:07d}", category, brand, model,
+               rng.choice(WARRANTY_CHOICES), price, round(price * 0.8, 2),
+               float(capacity) if battery else None, 12.0 if battery else None,
+               TECHNOLOGIES[i % len(TECHNOLOGIES)] if battery else None)
+
+
+def _customers(rng, count):
+    for i in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield (i + 1, name, f"9{i:09d}", f"{rng.randint(1, 400)}, {rng.choice(CITIES)}")
+
+
+def _invoices(rng, lines, years, customer_count, prices):
+    """Yields (invoice_row, [item_rows]) in date order until `lines` invoice_items have been produced."""
+    end = datetime.now().replace(microsecond=0) - timedelta(days=1)
+    start = end - timedelta(days=365 * years)
+    avg_items = 2
+    span = (end - start).total_seconds()
+    step = span / max(1, lines // avg_items)
+    product_count = len(prices)
+    produced = 0
+    seq = 0
+    while produced < lines:
+        seq += 1
+        ts = start + timedelta(seconds=min(span, seq * step + rng.uniform(0, step)))
+        invoice_no = f"INV-{ts:%Y%m%d}-S{seq:07d}"
+        n_items = min(rng.randint(1, 3), lines - produced)
+        items = []
+        total = 0.0
+        for _ in range(n_items):
+            pid = rng.randint(1, product_count)
+            qty = 1 if rng.random() < 0.85 else 2
+            price = prices[pid - 1]
+            items.append((invoice_no, pid, qty, price, qty * price))
+            total += qty * price
+        old_val = float(rng.choice([0, 0, 0, 500, 800, 1200])) if total > 2000 else 0.0
+        desc = "Old battery exchange" if old_val else ""
+        invoice = (invoice_no, ts.strftime("%Y-%m-%d %H:%M:%S"), rng.randint(1, customer_count),
+                   total, old_val, desc, total - old_val)
+        produced += n_items
+        yield invoice, items
+
+
+def seed_database(db_path, lines=10000, years=3, seed=42, products=None, customers=None):
+    """
+    Fills an empty database (schema already created by DatabaseManager) with a synthetic
+    catalog, customer base and `lines` invoice lines spread over `years`.
+    The same seed always produces the same data.
+    """
+    import sqlite3
+
+    rng = random.Random(seed)
+    sizes = default_sizes(lines)
+    product_count = products or sizes['products']
+    customer_count = customers or sizes['customers']
+
+    conn = sqlite3.connect(db_path)
+    # Bulk-load settings; only ever used on scratch benchmark databases
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT COUNT(*) FROM invoices")
+    if cursor.fetchone()[0]:
+        conn.close()
+        raise Exception(f"{db_path} already has invoices; seed into a fresh database.")
+
+    started = time.perf_counter()
+    product_rows = list(_products(rng, product_count))
+    cursor.executemany("""
+        INSERT INTO products (id, qr_code, category, brand_name, model_name, warranty_months, current_price, current_purchase_price,
+                              capacity_ah, voltage, technology)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, product_rows)
+    # Deep stock so the billing mix never fails on availability
+    cursor.executemany("INSERT INTO stock (product_id, quantity_available) VALUES (?, ?)",
+                       ((row[0], 10 ** 7) for row in product_rows))
+    for batch in _batched(_customers(rng, customer_count)):
+        cursor.executemany("INSERT INTO customers (id, full_name, mobile_number, address) VALUES (?, ?, ?, ?)", batch)
+
+    prices = [row[6] for row in product_rows]
+    invoice_count = 0
+    for batch in _batched(_invoices(rng, lines, years, customer_count, prices), BATCH_SIZE // 2):
+        cursor.executemany("""
+            INSERT INTO invoices (invoice_no, date, customer_id, total_amount, old_battery_value, old_battery_description, final_amount)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (inv for inv, _ in batch))
+        cursor.executemany("""
+            INSERT INTO invoice_items (invoice_no, product_id, quantity, unit_price, total_price)
+            VALUES (?, ?, ?, ?, ?)
+        """, (item for _, items in batch for item in items))
+        invoice_count += len(batch)
+        conn.commit()
+    # Cost snapshots as checkout would have stamped them
+    cursor.execute("UPDATE invoice_items SET unit_cost = (SELECT current_purchase_price FROM products WHERE id = product_id)")
+
+    conn.commit()
+    conn.close()
+    elapsed = time.perf_counter() - started
+    logging.info(f"Seeded {product_count} products, {customer_count} customers, "
+                 f"{invoice_count} invoices / {lines} lines in {elapsed:.1f}s")
+    return {
+        'products': product_count,
+        'customers': customer_count,
+        'invoices': invoice_count,
+        'lines': lines,
+        'years': years,
+        'seed': seed,
+        'seconds': round(elapsed, 2),
+    }
@@ -0,0 +1,193 @@
+import os
+import random
+import time
+from app import queries
+from app.attributes import normalize
+from app.database import db
+
+# Relative weights of each operation in a mix
+MIXES = {
+    # A busy counter: mostly lookups while bills are being rung up
+    "counter": {"billing": 3, "product_list": 1, "customer_lookup": 3, "stock_search": 2, "dashboard": 1},
+    "search": {"stock_search": 4, "customer_search": 4, "product_list": 2, "facet_filter": 2},
+    "dashboard": {"dashboard": 1},
+    "pdf": {"pdf": 1},
+    "receipt": {"receipt": 1},
+    # Pure-Python money path: a long cart being rung up, and a report's worth of amounts
+    "money": {"cart_totals": 1, "report_format": 1},
+    # Analytics screen: every chart reads the cubes, never the invoice tables
+    "analytics": {"analytics": 3, "margins": 1},
+}
+
+
+class Workload:
+    """Replays the same calls the screens and services make, against whatever `db` points at."""
+
+    def __init__(self, seed=42, pdf_dir=None):
+        self.rng = random.Random(seed)
+        self.pdf_dir = pdf_dir
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, brand_name, model_name, current_price, qr_code FROM products WHERE is_active = 1")
+        self.catalog = cursor.fetchall()
+        cursor.execute("SELECT full_name, mobile_number, address FROM customers")
+        self.customers = cursor.fetchall()
+        conn.close()
+        if not self.catalog or not self.customers:
+            raise Exception("Benchmark database is empty; run `python -m benchmarks seed` first.")
+        # Same startup step as main.py, so a freshly seeded database has its cubes
+        from app.services.stats_service import StatsService
+        if StatsService.needs_rebuild():
+            StatsService.rebuild()
+        self._invoice_service = None
+
+    def _cart(self):
+        cart = []
+        for _ in range(self.rng.randint(1, 3)):
+            p = self.rng.choice(self.catalog)
+            qty = 1 if self.rng.random() < 0.85 else 2
+            cart.append({
+                'product_id': p[0], 'product_name': f"{p[1]} {p[2]}",
+                'qty': qty, 'selling_price': p[3], 'total': qty * p[3]
+            })
+        return cart
+
+    def _search_term(self):
+        p = self.rng.choice(self.catalog)
+        # Mix of partial names and full QR scans, as typed at the counter
+        return self.rng.choice([p[1][:3], p[2].split()[0], p[4]])
+
+    # --- Operations ---
+
+    def op_billing(self):
+        if self._invoice_service is None:
+            from app.services.invoice_service import InvoiceService
+            self._invoice_service = InvoiceService()
+        name, mobile, address = self.rng.choice(self.customers)
+        cart = self._cart()
+        total = sum(i['total'] for i in cart)
+        old_val = 500.0 if total > 5000 and self.rng.random() < 0.3 else 0.0
+        self._invoice_service.create_invoice(
+            {'name': name, 'mobile': mobile, 'address': address},
+            cart, {'amount': old_val, 'description': 'Old battery' if old_val else ''},
+            render_pdf=False
+        )
+
+    def op_pdf(self):
+        from app.services.pdf_service import PDFService
+        name, mobile, address = self.rng.choice(self.customers)
+        cart = self._cart()
+        total = sum(i['total'] for i in cart)
+        inv = {
+            'invoice_no': f"INV-BENCH-{self.rng.randint(0, 10 ** 9)}",
+            'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'customer_name': name, 'customer_mobile': mobile, 'customer_address': address,
+            'total': total, 'old_val': 0.0, 'final': total
+        }
+        path = os.path.join(self.pdf_dir, "bench_invoice.pdf")
+        PDFService.generate_invoice_pdf(inv, cart, {'amount': 0.0, 'description': ''}, path)
+
+    def op_receipt(self):
+        from app.services.receipt_service import ReceiptService
+        name, mobile, address = self.rng.choice(self.customers)
+        cart = self._cart()
+        total = sum(i['total'] for i in cart)
+        inv = {
+            'invoice_no': f"INV-BENCH-{self.rng.randint(0, 10 ** 9)}",
+            'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'customer_name': name, 'customer_mobile': mobile, 'customer_address': address,
+            'total': total, 'old_val': 0.0, 'final': total
+        }
+        # File sink stands in for the printer device
+        ReceiptService.print_receipt(inv, cart, {'amount': 0.0, 'description': ''},
+                                     device=os.path.join(self.pdf_dir, "bench_receipt.bin"))
+
+    def op_cart_totals(self):
+        from app.money import CartTotals, format_inr
+        totals = CartTotals()
+        for _ in range(300):
+            _, _, _, price, _ = self.rng.choice(self.catalog)
+            totals.add(self.rng.randint(1, 4), price)
+            format_inr(totals.grand_total)
+        totals.set_deduction(self.rng.randint(0, 2000))
+        format_inr(totals.grand_total)
+
+    def op_report_format(self):
+        from app.money import format_amount
+        for _ in range(10000):
+            format_amount(self.rng.choice(self.catalog)[3] * self.rng.randint(1, 4))
+
+    def op_product_list(self):
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.PRODUCT_LIST)
+        cursor.fetchall()
+
+    def op_facet_filter(self):
+        # Billing filters: pick a brand, then one of its capacities, as the cashier would
+        from app.services.product_service import ProductService
+        p = self.rng.choice(self.catalog)
+        facets = ProductService.facets(brand_name=p[1])
+        capacity = self.rng.choice(facets['capacity_ah'])[0] if facets['capacity_ah'] else None
+        ProductService.product_list(brand_name=p[1], capacity_ah=capacity)
+
+    def op_customer_lookup(self):
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.CUSTOMER_BY_MOBILE, (self.rng.choice(self.customers)[1],))
+        cursor.fetchone()
+
+    def op_customer_search(self):
+        term = self.rng.choice(self.customers)[0].split()[0][:4]
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.CUSTOMER_SEARCH, (f"%{term}%", f"%{term}%"))
+        cursor.fetchall()
+
+    def op_stock_search(self):
+        term = self._search_term()
+        cursor = db.get_connection().cursor()
+        cursor.execute(queries.STOCK_SEARCH, (f"%{normalize(term)}%",))
+        cursor.fetchall()
+
+    def op_dashboard(self):
+        cursor = db.get_connection().cursor()
+        for sql in (queries.DASHBOARD_TOTAL_INVOICES, queries.DASHBOARD_TODAY_SALES,
+                    queries.DASHBOARD_TODAY_COUNT, queries.DASHBOARD_LOW_STOCK,
+                    queries.DASHBOARD_TOTAL_PRODUCTS):
+            cursor.execute(sql)
+            cursor.fetchone()
+        cursor.execute(queries.DASHBOARD_RECENT_INVOICES)
+        cursor.fetchall()
+
+    def op_analytics(self):
+        from app.services.analytics_service import AnalyticsService, GRAINS
+        for grain in GRAINS:
+            AnalyticsService.revenue(grain)
+        AnalyticsService.mix('brand')
+        AnalyticsService.mix('category')
+        AnalyticsService.exchange_trend()
+        AnalyticsService.top_customers()
+
+    def op_margins(self):
+        from app.services.cost_service import CostService
+        today = time.strftime("%Y-%m-%d")
+        CostService.margins(f"{int(today[:4]) - 1}{today[4:]}", today)
+
+
+def run_mix(workload, mix_name, ops=500, warmup=20):
+    """Runs `ops` weighted operations; returns {op_name: [latency_seconds, ...]} and wall time."""
+    weights = MIXES[mix_name]
+    names = list(weights)
+    funcs = {name: getattr(workload, f"op_{name}") for name in names}
+    picks = workload.rng.choices(names, weights=[weights[n] for n in names], k=warmup + ops)
+
+    for name in picks[:warmup]:
+        funcs[name]()
+
+    samples = {name: [] for name in names}
+    clock = time.perf_counter
+    wall_start = clock()
+    for name in picks[warmup:]:
+        t0 = clock()
+        funcs[name]()
+        samples[name].append(clock() - t0)
+    wall = clock() - wall_start
+    return samples, wall
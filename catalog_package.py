@@ -0,0 +1,24 @@
+import argparse
+from app.utils import setup_logging
+from app.services.catalog_service import CatalogService
+
+parser = argparse.ArgumentParser(description="Build or apply signed catalog packages (products and prices for every terminal)")
+sub = parser.add_subparsers(dest="command", required=True)
+p_build = sub.add_parser("build", help="package this database's catalog")
+p_build.add_argument("--out", help="package path (default data/sync/catalog_v<version>.sbc)")
+p_build.add_argument("--version", type=int, help="defaults to the current time as YYYYMMDDHHMM")
+p_apply = sub.add_parser("apply", help="apply a package: only differing products, in one transaction")
+p_apply.add_argument("path")
+p_apply.add_argument("--dry-run", action="store_true", help="report what would change")
+p_apply.add_argument("--force", action="store_true", help="apply even if not newer than the current version")
+args = parser.parse_args()
+setup_logging()
+
+if args.command == "build":
+    path, version, count = CatalogService.build_package(args.out, args.version)
+    print(f"Catalog v{version}: {count} products -> {path}")
+else:
+    result = CatalogService.apply_package(args.path, force=args.force, dry_run=args.dry_run)
+    prefix = "Would apply" if args.dry_run else "Applied"
+    print(f"{prefix} catalog v{result['version']}: {result['new']} new, {result['changed']} changed "
+          f"({result['prices']} price changes), {result['unchanged']} unchanged")
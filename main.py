@@ -2,10 +2,33 @@ import sys
 from PySide6.QtWidgets import QApplication
 from app.ui.main_window import MainWindow
 from app.utils import setup_logging
+from app.config import Config
 from app.database import db # Initializes DB on import
+from app.instrumentation import profiler
+from app.services.reservation_service import ReservationService
+from app.services.cart_service import CartService
+from app.services.customer_service import CustomerService
+from app.services.stats_service import StatsService
+from app.services.share_service import ShareService
+from app.services.forecast_service import ForecastService
+from app.services.sync_service import SyncService
+from app.services.journal_service import JournalService
 
 def main():
     setup_logging()
+    profiler.configure(Config.load_settings())
+    ReservationService.purge_expired()
+    CartService.purge_stale()
+    if CustomerService.needs_rebuild():
+        CustomerService.rebuild_history()
+    if StatsService.needs_rebuild():
+        StatsService.rebuild()
+    if ForecastService.needs_rebuild():
+        ForecastService.refresh()
+    if SyncService.needs_seed():
+        SyncService.seed()
+    ShareService.start_worker()
+    JournalService.recover()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -0,0 +1,47 @@
+import argparse
+from app.utils import setup_logging
+from app.config import Config
+from app.services.sync_service import SyncService
+
+parser = argparse.ArgumentParser(description="Replicate catalog, customers and stock levels between shop branches")
+sub = parser.add_subparsers(dest="command", required=True)
+p_init = sub.add_parser("init", help="give this database a new branch name and a fresh change log (run on a copied app.db)")
+p_init.add_argument("name")
+p_export = sub.add_parser("export", help="write a batch file of changes the other branch has not acknowledged")
+p_export.add_argument("--to", required=True, help="the other branch's name")
+p_export.add_argument("--out", help=f"output folder (default {Config.SYNC_DIR})")
+p_import = sub.add_parser("import", help="apply batch files from another branch")
+p_import.add_argument("paths", nargs="+")
+p_serve = sub.add_parser("serve", help="answer sync requests from other branches on the LAN/VPN")
+p_serve.add_argument("--host", default="127.0.0.1",
+                     help="address to listen on; this machine only unless given (e.g. the LAN/VPN address)")
+p_serve.add_argument("--port", type=int, default=Config.SYNC_PORT)
+p_pull = sub.add_parser("sync", help="two-way sync with a branch running `serve`")
+p_pull.add_argument("host")
+p_pull.add_argument("--port", type=int, default=Config.SYNC_PORT)
+sub.add_parser("status", help="show this branch and its peers")
+args = parser.parse_args()
+setup_logging()
+
+if args.command == "init":
+    SyncService.init_branch(args.name)
+elif SyncService.needs_seed():
+    SyncService.seed()
+
+if args.command == "export":
+    path, count = SyncService.export_batch(args.to, args.out)
+    print(f"{count} changes -> {path}")
+elif args.command == "import":
+    for path in args.paths:
+        stats = SyncService.import_batch(path)
+        print(f"{path}: {stats['applied']} applied, {stats['duplicates']} already had, {stats['superseded']} superseded")
+elif args.command == "serve":
+    SyncService.serve(args.host, args.port)
+elif args.command == "sync":
+    received, sent = SyncService.sync_with(args.host, args.port)
+    print(f"Received: {received['applied']} applied, {received['duplicates']} already had, {received['superseded']} superseded")
+    print(f"Sent: {sent['applied']} applied, {sent['duplicates']} already had, {sent['superseded']} superseded")
+
+print(f"Branch: {SyncService.branch_id()}")
+for peer_id, sent_seq, received_seq, last_sync, pending in SyncService.list_peers():
+    print(f"  {peer_id:<12} last sync {last_sync or '-'}  {pending} change(s) not yet acknowledged")
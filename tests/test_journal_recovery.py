@@ -0,0 +1,96 @@
+"""
+Crash recovery of a checkout against a scratch database: a child process runs the sale and is
+killed at each step (benchmarks.faults), then the startup pass runs here and the invoice, stock,
+PDF and outbox must come out as if nothing had happened.
+"""
+import multiprocessing
+import os
+import sqlite3
+import time
+
+import pytest
+
+from benchmarks.faults import CRASH_EXIT, EXPECTED_AFTER_CRASH, POINTS, _restart, _sale, _state
+
+OPENING_STOCK = 5
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    """A fresh database and invoice folder; app.database is pointed at it before first use."""
+    db_path = str(tmp_path / "app.db")
+    monkeypatch.setenv("SMART_BILLING_DB", db_path)
+    from app.config import Config
+    monkeypatch.setattr(Config, "DB_PATH", db_path)
+    monkeypatch.setattr(Config, "INVOICE_DIR", str(tmp_path / "invoices"))
+    monkeypatch.setattr(Config, "TERMINAL_ID", "faults")
+    from app.database import DatabaseManager, db
+    monkeypatch.setattr(db, "db_path", db_path)
+    DatabaseManager(db_path)
+    os.makedirs(Config.INVOICE_DIR, exist_ok=True)
+    return db_path, Config.INVOICE_DIR
+
+
+def _product(conn, name):
+    cur = conn.execute("INSERT INTO products (qr_code, category, brand_name, model_name, warranty_months, current_price) "
+                       "VALUES (?, 'Battery', 'Faults', ?, 12, 4500)", (f"TEST-{time.time_ns()}", name))
+    conn.execute("INSERT INTO stock (product_id, quantity_available) VALUES (?, ?)", (cur.lastrowid, OPENING_STOCK))
+    conn.commit()
+    return cur.lastrowid
+
+
+@pytest.mark.parametrize("point", POINTS, ids=lambda p: p or "none")
+def test_checkout_recovers_from_a_crash(scratch, point):
+    from app.services.document_service import _sha256
+    from app.services.reservation_service import ReservationService
+
+    db_path, invoice_dir = scratch
+    outbox_path = os.path.join(invoice_dir, "outbox.jsonl")
+    conn = sqlite3.connect(db_path)
+    try:
+        product_id = _product(conn, str(point))
+        cart_id = ReservationService.new_cart_id()
+        mobile = "7000000001"
+
+        proc = multiprocessing.Process(target=_sale, args=(db_path, invoice_dir, outbox_path, point,
+                                                           product_id, cart_id, mobile))
+        proc.start()
+        proc.join()
+        assert proc.exitcode == (0 if point is None else CRASH_EXIT)
+        assert _state(conn, mobile, cart_id, product_id)['status'] == EXPECTED_AFTER_CRASH[point]
+
+        _restart(outbox_path)
+        after = _state(conn, mobile, cart_id, product_id)
+    finally:
+        conn.close()
+
+    if point == 'transaction':
+        assert after['invoice_no'] is None
+        assert after['stock'] == OPENING_STOCK
+        assert after['cart_saved'] == 1
+        return
+    assert after['invoice_no']
+    assert after['stock'] == OPENING_STOCK - 1
+    assert after['cart_saved'] == 0
+    assert after['status'] == 'shared'
+    assert os.path.exists(after['path'])
+    assert _sha256(after['path']) == after['sha256']
+    assert not os.path.exists(after['path'] + ".part")
+    assert after['sent'] == 1
+
+
+def test_recovery_leaves_other_terminals_rows_alone(scratch):
+    from app.database import db
+    from app.services.journal_service import JournalService
+
+    conn = db.get_connection()
+    conn.executemany("INSERT INTO invoice_journal (invoice_no, status, payload, terminal_id, updated_at) "
+                     "VALUES (?, 'committed', '{}', ?, ?)",
+                     [("INV-OWN", "faults", "2026-01-01 10:00:00"), ("INV-OTHER", "till-2", "2026-01-01 10:01:00"),
+                      ("INV-LEGACY", None, "2026-01-01 10:02:00")])
+    conn.commit()
+
+    assert JournalService.pending() == ["INV-OWN", "INV-LEGACY"]
+    owners = dict(conn.execute("SELECT invoice_no, terminal_id FROM invoice_journal").fetchall())
+    conn.close()
+    assert owners == {"INV-OWN": "faults", "INV-OTHER": "till-2", "INV-LEGACY": "faults"}
@@ -0,0 +1,121 @@
+"""
+Property checks for app.money over seeded random inputs: every case is reproducible from SEED,
+and each property is tried on a few thousand values including the edges (zero, negatives,
+half-paisa ties, crore-sized amounts).
+"""
+import random
+import re
+from decimal import Decimal
+
+import pytest
+
+from app.money import CartTotals, allocate, from_paise, format_inr, line_total, split, to_paise
+
+SEED = 20240401
+CASES = 3000
+
+
+@pytest.fixture
+def rng():
+    return random.Random(SEED)
+
+
+def _paise_values(rng, n=CASES):
+    edges = [0, 1, -1, 99, 100, 101, -100, 10 ** 7, 10 ** 9 + 7, -(10 ** 11) - 55]
+    return edges + [rng.randint(-(10 ** 12), 10 ** 12) for _ in range(n)]
+
+
+def _reference_inr(paise, symbol=True):
+    """Indian grouping the slow, obvious way: last three digits, then pairs, by regex."""
+    sign = "-" if paise < 0 else ""
+    rupees, p = divmod(abs(paise), 100)
+    grouped = re.sub(r"(\d)(?=(\d\d)+\d(?!\d))", r"\1,", str(rupees))
+    return f"{sign}{'₹' if symbol else ''}{grouped}.{p:02d}"
+
+
+def test_paise_round_trip(rng):
+    for paise in _paise_values(rng):
+        assert to_paise(from_paise(paise)) == paise
+        assert to_paise(str(Decimal(paise) / 100)) == paise
+        assert to_paise(Decimal(paise) / 100) == paise
+
+
+def test_to_paise_rounds_half_up_on_the_decimal_value(rng):
+    for _ in range(CASES):
+        rupees = rng.randint(0, 10 ** 6)
+        tenths_of_paisa = rng.randint(0, 999)
+        text = f"{rupees}.{tenths_of_paisa:03d}"
+        expected = rupees * 100 + tenths_of_paisa // 10 + (1 if tenths_of_paisa % 10 >= 5 else 0)
+        assert to_paise(text) == expected
+        # Floats go through repr, so 2.675 is 268 paise, not the binary 2.67499...
+        assert to_paise(float(text)) == expected
+    assert to_paise(7) == 700
+
+
+def test_split_sums_back_and_is_even(rng):
+    for paise in _paise_values(rng):
+        parts = rng.randint(1, 40)
+        shares = split(paise, parts)
+        assert len(shares) == parts
+        assert sum(shares) == paise
+        assert max(shares) - min(shares) <= 1
+
+
+def test_cart_totals_match_a_fresh_sum(rng):
+    totals = CartTotals()
+    lines = {}
+    for _ in range(CASES):
+        action = rng.random()
+        if action < 0.5 or not lines:
+            qty, price = rng.randint(1, 20), round(rng.uniform(0, 50000), rng.choice([0, 1, 2, 3]))
+            key, paise = totals.add(qty, price)
+            assert paise == line_total(qty, price)
+            lines[key] = (qty, price)
+        elif action < 0.8:
+            key = rng.choice(list(lines))
+            qty, price = rng.randint(1, 20), round(rng.uniform(0, 50000), 2)
+            totals.update(key, qty, price)
+            lines[key] = (qty, price)
+        else:
+            key = rng.choice(list(lines))
+            totals.remove(key)
+            del lines[key]
+        deduction = round(rng.uniform(0, 5000), 2)
+        totals.set_deduction(deduction)
+        fresh = sum(line_total(qty, price) for qty, price in lines.values())
+        assert totals.subtotal == fresh
+        assert totals.grand_total == fresh - to_paise(deduction)
+        assert len(totals) == len(lines)
+    totals.clear()
+    assert (totals.subtotal, totals.deduction, len(totals)) == (0, 0, 0)
+
+
+def test_format_inr_matches_reference_grouping(rng):
+    for paise in _paise_values(rng):
+        assert format_inr(paise) == _reference_inr(paise)
+        assert format_inr(paise, symbol=False) == _reference_inr(paise, symbol=False)
+
+
+@pytest.mark.parametrize("paise, text", [
+    (0, "₹0.00"),
+    (-5, "-₹0.05"),
+    (99999, "₹999.99"),
+    (100000, "₹1,000.00"),
+    (12345678, "₹1,23,456.78"),
+    (1000000000, "₹1,00,00,000.00"),      # one crore
+    (-123456789012, "-₹1,23,45,67,890.12"),
+])
+def test_format_inr_known_values(paise, text):
+    assert format_inr(paise) == text
+
+
+def test_allocate_adds_back_up_in_proportion(rng):
+    for _ in range(CASES):
+        weights = [rng.randint(0, 5_000_00) for _ in range(rng.randint(1, 6))]
+        amount = rng.randint(0, sum(weights) or 100)
+        parts = allocate(amount, weights)
+        assert sum(parts) == amount
+        total = sum(weights)
+        for part, w in zip(parts, weights):
+            exact = amount * w / total if total else amount / len(weights)
+            assert abs(part - exact) < 1